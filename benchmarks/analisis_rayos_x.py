@@ -0,0 +1,76 @@
+"""Benchmark del análisis de radiografías: imágenes por segundo por núcleo.
+
+Genera panorámicas sintéticas (PNG en escala de grises con zonas radiolúcidas),
+las ingresa con ``AnalizadorRayosX`` y mide el análisis con distintos tamaños
+del pool de procesos; al final repite una imagen para medir el acierto de caché.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.analisis_rayos_x --imagenes 32 --procesos 1 2 4 --ancho 2400 --alto 1200
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from sgc.archivo_imagenes import ArchivoImagenes
+from sgc.persistencia import BaseDatos
+from sgc.rayos_x import AnalizadorRayosX
+
+
+def panoramica_sintetica(ancho, alto, semilla):
+    """Fondo de hueso con ruido, arco de piezas claras y algunas manchas oscuras."""
+    azar = np.random.default_rng(semilla)
+    y, x = np.mgrid[0:alto, 0:ancho].astype(np.float32)
+    imagen = 0.35 + 0.05 * azar.standard_normal((alto, ancho), dtype=np.float32)
+    for mitad in (0.3, 0.7):
+        imagen += 0.35 * (np.sin(x / ancho * np.pi * 16) > 0) * (np.abs(y / alto - mitad) < 0.15)
+    for _ in range(azar.integers(0, 4)):
+        cx, cy, r = azar.uniform(0, ancho), azar.uniform(0, alto), azar.uniform(20, 60)
+        imagen -= 0.5 * (((x - cx) ** 2 + (y - cy) ** 2) < r ** 2)
+    buffer = io.BytesIO()
+    Image.fromarray((np.clip(imagen, 0, 1) * 255).astype(np.uint8)).save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def correr(carpeta, imagenes, procesos, ancho, alto):
+    base_datos = BaseDatos(os.path.join(carpeta, f'bench_{procesos}.db'))
+    analizador = AnalizadorRayosX(base_datos, ArchivoImagenes(base_datos, os.path.join(carpeta, f'img_{procesos}')), procesos)
+    hashes = [analizador.ingresar(panoramica_sintetica(ancho, alto, i), analizar=False) for i in range(imagenes)]
+    analizador.analizar(hashes[0]).result() # Arranque de los procesos fuera de la medición
+    t0 = time.perf_counter()
+    for futuro in [analizador.analizar(h) for h in hashes[1:]]:
+        futuro.result()
+    total = time.perf_counter() - t0
+    while any(analizador.en_proceso(h) for h in hashes):
+        time.sleep(0.01)
+    t0 = time.perf_counter()
+    analizador.analizar(hashes[-1]).result()
+    cache_ms = (time.perf_counter() - t0) * 1000
+    analizador.cerrar()
+    img_por_s = (imagenes - 1) / total
+    return {'img_por_s': img_por_s, 'img_por_s_nucleo': img_por_s / procesos, 'cache_ms': cache_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--imagenes', type=int, default=32)
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--ancho', type=int, default=2400)
+    parser.add_argument('--alto', type=int, default=1200)
+    args = parser.parse_args()
+
+    print(f"Núcleos disponibles: {os.cpu_count()}")
+    print(f"{'procesos':>9}{'img/s':>9}{'img/s por núcleo':>18}{'acierto caché ms':>18}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for procesos in args.procesos:
+            r = correr(carpeta, args.imagenes, procesos, args.ancho, args.alto)
+            print(f"{procesos:>9}{r['img_por_s']:>9.1f}{r['img_por_s_nucleo']:>18.1f}{r['cache_ms']:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark del archivo de imágenes: abrir un paciente con muchas radiografías.
+
+Archiva N panorámicas sintéticas (con su miniatura) para un mismo paciente y
+compara la memoria y el tiempo de abrir su galería (índice + miniaturas de la
+página visible por ``mmap``) contra leer todos los originales.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.archivo_imagenes --radiografias 200 --por-pagina 12
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.analisis_rayos_x import panoramica_sintetica
+from sgc.archivo_imagenes import ArchivoImagenes
+from sgc.persistencia import BaseDatos
+from sgc.rayos_x import miniatura
+
+
+def medir(funcion):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    funcion()
+    total = time.perf_counter() - t0
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total * 1000, pico / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--radiografias', type=int, default=200)
+    parser.add_argument('--por-pagina', type=int, default=12)
+    parser.add_argument('--ancho', type=int, default=2400)
+    parser.add_argument('--alto', type=int, default=1200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = ArchivoImagenes(BaseDatos(os.path.join(carpeta, 'bench.db')), os.path.join(carpeta, 'img'))
+        t0 = time.perf_counter()
+        for i in range(args.radiografias):
+            datos = panoramica_sintetica(args.ancho, args.alto, i).getvalue()
+            hash_imagen = archivo.agregar_bytes(datos)
+            imagen = np.asarray(Image.open(io.BytesIO(datos)), dtype=np.float32) / 255.0
+            png = io.BytesIO()
+            Image.fromarray((miniatura(imagen) * 255).astype(np.uint8)).save(png, format='PNG')
+            archivo.asignar_miniatura(hash_imagen, archivo.agregar_bytes(png.getvalue()))
+            archivo.vincular('P001', hash_imagen)
+        archivado = time.perf_counter() - t0
+        tamano = sum(os.path.getsize(os.path.join(carpeta, 'img', f)) for f in os.listdir(os.path.join(carpeta, 'img')))
+        print(f"Archivadas {args.radiografias} radiografías en {archivado:.1f} s ({tamano / 2**20:.1f} MiB en packs)")
+
+        def abrir_galeria():
+            archivo.contar_paciente('P001')
+            for imagen in archivo.pagina_paciente('P001', 1, args.por_pagina):
+                archivo.leer(imagen['miniatura'])
+
+        def leer_originales():
+            originales = [archivo.leer(imagen['hash']) for imagen in archivo.pagina_paciente('P001', 1, args.radiografias)]
+            return originales
+
+        print(f"{'operación':<34}{'ms':>9}{'pico MiB':>10}")
+        for nombre, funcion in [("galería (1 página de miniaturas)", abrir_galeria), ("leer todos los originales", leer_originales)]:
+            ms, pico = medir(funcion)
+            print(f"{nombre:<34}{ms:>9.1f}{pico:>10.2f}")
+        archivo.cerrar()
+
+
+if __name__ == '__main__':
+    main()
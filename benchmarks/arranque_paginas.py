@@ -0,0 +1,100 @@
+"""Benchmark de arranque: tiempo hasta el primer render según la página de entrada.
+
+Cada medición corre en un proceso nuevo (módulos y cachés de Streamlit
+limpios) que abre el demo con ``?pagina=<módulo>`` y cronometra el primer
+``AppTest.run()``: importación de la página, carga del almacén desde SQLite y
+render. Streamlit ya está importado antes de empezar a medir, igual que en un
+servidor en marcha. También se reporta qué dependencias pesadas quedaron
+cargadas. Una primera corrida sin medir siembra la base de datos temporal.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.arranque_paginas --repeticiones 5
+    python -m benchmarks.arranque_paginas --pacientes 100000 --json arranque.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pkgutil
+import statistics
+import sys
+import tempfile
+import time
+
+DEMO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo.py')
+PESADAS = ['pandas', 'streamlit_calendar', 'sgc.rayos_x', 'sgc.inventario']
+
+
+def _primer_render(pagina, timeout, cola):
+    """Primer rerun del demo entrando por ``pagina``; corre en un proceso hijo."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(DEMO, default_timeout=timeout)
+    if pagina:
+        at.query_params['pagina'] = pagina
+    t0 = time.perf_counter()
+    at.run()
+    cola.put({
+        'segundos': time.perf_counter() - t0,
+        'cargadas': [m for m in PESADAS if m in sys.modules],
+        'error': at.exception[0].message if at.exception else None,
+    })
+
+
+def _en_proceso(pagina, timeout):
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_primer_render, args=(pagina, timeout, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=3, help="Procesos nuevos por página")
+    parser.add_argument('--pacientes', type=int, default=0, help="Poblar con datos sintéticos (0: semilla del demo)")
+    parser.add_argument('--citas-por-paciente', type=float, default=3.0)
+    parser.add_argument('--timeout', type=float, default=600, help="Segundos máximos por rerun")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    import paginas
+    entradas = [m.name for m in pkgutil.iter_modules(paginas.__path__) if m.name != 'comun']
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'sgc.db')
+        if args.pacientes:
+            from sgc.persistencia import BaseDatos
+            from sgc.sintetico import poblar
+
+            base_datos = BaseDatos(ruta)
+            poblar(base_datos, args.pacientes, int(args.pacientes * args.citas_por_paciente))
+            base_datos.pool.cerrar()
+        # Los procesos hijos leen la ruta al importar sgc.persistencia
+        os.environ['SGC_DB'] = ruta
+        os.environ['SGC_IMAGENES'] = os.path.join(carpeta, 'imagenes')
+        os.environ['SGC_AUDITORIA'] = os.path.join(carpeta, 'auditoria')
+        _en_proceso(None, args.timeout) # Siembra (si hace falta) y calienta la caché de disco
+
+        print(f"{'página de entrada':<22}{'mediana ms':>12}{'mín ms':>10}{'máx ms':>10}  dependencias pesadas")
+        for pagina in entradas:
+            corridas = [_en_proceso(pagina, args.timeout) for _ in range(args.repeticiones)]
+            tiempos = [c['segundos'] * 1000 for c in corridas]
+            fila = {
+                'pagina': pagina, 'mediana_ms': statistics.median(tiempos), 'min_ms': min(tiempos),
+                'max_ms': max(tiempos), 'cargadas': corridas[-1]['cargadas'], 'error': corridas[-1]['error'],
+            }
+            print(f"{pagina:<22}{fila['mediana_ms']:>12.0f}{fila['min_ms']:>10.0f}{fila['max_ms']:>10.0f}  "
+                  + (', '.join(fila['cargadas']) or '-') + (f"  ERROR: {fila['error']}" if fila['error'] else ""))
+            resultados.append(fila)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark de la bitácora de auditoría (``sgc.auditoria``): group commit y verificación.
+
+N hilos (sesiones de Streamlit) registran acciones a la vez en una carpeta
+temporal y se mide:
+
+- latencia de ``registrar`` vista por la sesión (solo encola) y registros
+  durables por segundo, con group commit contra un ``fsync`` por registro
+- verificación de la cadena completa (MB/s) contra leer los mismos segmentos
+  sin hacer nada con los bytes
+- consulta ARCO de los registros de un paciente por el índice
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.auditoria --sesiones 8 --registros 20000
+    python -m benchmarks.auditoria --registros 200000 --sin-individual --extra 2000000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from sgc.auditoria import BitacoraAuditoria
+
+ACCIONES = ('consulta_expediente', 'cita_agendada', 'alta_paciente', 'factura_sincronizada')
+
+
+def _carga(bitacora, sesiones, registros, pacientes, semilla):
+    """``registros`` repartidos entre ``sesiones`` hilos. Devuelve (segundos hasta durable, latencias µs)."""
+    azar = np.random.default_rng(semilla)
+    ids = [f"P{p:03d}" for p in ((pacientes * azar.random(registros) ** 2).astype(np.int64) + 1).tolist()]
+    latencias = [[] for _ in range(sesiones)]
+
+    def _sesion(i):
+        for k, id_paciente in enumerate(ids[i::sesiones]):
+            t0 = time.perf_counter()
+            bitacora.registrar(ACCIONES[k % len(ACCIONES)], id_paciente, 'Recepción', Doctor='Dr. Salas', Hora='10:00')
+            latencias[i].append(time.perf_counter() - t0)
+
+    hilos = [threading.Thread(target=_sesion, args=(i,)) for i in range(sesiones)]
+    t0 = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    bitacora.vaciar()
+    return time.perf_counter() - t0, np.concatenate([np.array(l) for l in latencias]) * 1e6
+
+
+def _leer(carpeta):
+    """Segundos en leer todos los segmentos por bloques de 1 MB."""
+    t0 = time.perf_counter()
+    for nombre in sorted(os.listdir(carpeta)):
+        if nombre.startswith('seg-'):
+            with open(os.path.join(carpeta, nombre), 'rb', buffering=0) as f:
+                while f.read(1 << 20):
+                    pass
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sesiones', type=int, default=8)
+    parser.add_argument('--registros', type=int, default=20_000)
+    parser.add_argument('--pacientes', type=int, default=10_000)
+    parser.add_argument('--extra', type=int, default=500_000, help="Registros por lote agregados antes de verificar")
+    parser.add_argument('--sin-individual', action='store_true', help="Omitir la corrida con un fsync por registro")
+    args = parser.parse_args()
+
+    print(f"{args.registros:,} registros desde {args.sesiones} sesiones")
+    print(f"{'modo':<18}{'durables/s':>12}{'grupos':>10}{'p50 µs':>10}{'p99 µs':>10}")
+    modos = [('group commit', True)] + ([] if args.sin_individual else [('fsync por registro', False)])
+    for nombre, agrupar in modos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            bitacora = BitacoraAuditoria(carpeta, agrupar=agrupar)
+            segundos, latencias = _carga(bitacora, args.sesiones, args.registros, args.pacientes, 7)
+            print(f"{nombre:<18}{args.registros / segundos:>12,.0f}{bitacora.estadisticas['grupos']:>10,}"
+                  f"{np.percentile(latencias, 50):>10.1f}{np.percentile(latencias, 99):>10.1f}")
+            bitacora.cerrar()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        bitacora = BitacoraAuditoria(carpeta)
+        _carga(bitacora, args.sesiones, args.registros, args.pacientes, 7)
+        t0 = time.perf_counter()
+        for inicio in range(0, args.extra, 50_000): # Como una importación masiva
+            bitacora.registrar_lote([
+                ('cita_agendada', f"P{(inicio + k) % args.pacientes + 1:03d}", 'Importación', {'Doctor': 'Dra. Vega', 'Hora': '12:00'})
+                for k in range(min(50_000, args.extra - inicio))
+            ])
+        bitacora.vaciar()
+        print(f"\n+{args.extra:,} registros por lote: {args.extra / (time.perf_counter() - t0):,.0f} registros/s")
+
+        resumen = bitacora.verificar()
+        assert resumen['error'] is None, resumen['error']
+        lectura = _leer(carpeta)
+        megas = resumen['bytes'] / 1e6
+        print(f"verificar {resumen['registros']:,} registros ({megas:,.1f} MB): {resumen['segundos'] * 1000:,.0f} ms, "
+              f"{megas / resumen['segundos']:,.0f} MB/s (lectura sola: {megas / lectura:,.0f} MB/s)")
+
+        t0 = time.perf_counter()
+        consultas = [f"P{p:03d}" for p in range(1, 201)]
+        encontrados = sum(len(bitacora.registros_paciente(p, 50)) for p in consultas)
+        print(f"ARCO: {(time.perf_counter() - t0) * 1000 / len(consultas):.2f} ms por paciente "
+              f"({encontrados / len(consultas):.0f} registros en promedio)")
+        bitacora.cerrar()
+
+
+if __name__ == '__main__':
+    main()
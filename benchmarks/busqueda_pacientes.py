@@ -0,0 +1,57 @@
+"""Benchmark del typeahead de pacientes (``sgc.busqueda``) con datos sintéticos.
+
+Carga N pacientes de ``sgc.sintetico`` en un almacén en memoria, mide la
+primera búsqueda (que indexa todas las filas) y luego el tiempo por consulta
+de una mezcla de prefijos, subcadenas, IDs y teléfonos. Al final registra un
+lote más de pacientes y mide la búsqueda que solo indexa esas filas nuevas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.busqueda_pacientes --pacientes 50000 1000000
+    python -m benchmarks.busqueda_pacientes --pacientes 200000 --repeticiones 200
+"""
+import argparse
+import datetime
+import time
+
+from sgc import sintetico
+from sgc.almacen import AlmacenClinica
+
+CONSULTAS = ['a', 'an', 'ana', 'ana gar', 'garcía', 'hernan', 'rez', 'luis rez', 'sofia diaz',
+             'P0123', 'P12345', '5512', 'zzz']
+
+
+def _ms(funcion, repeticiones):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - t0) * 1000 / repeticiones, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, nargs='+', default=[50_000])
+    parser.add_argument('--repeticiones', type=int, default=100, help="Búsquedas por consulta")
+    parser.add_argument('--nuevos', type=int, default=1_000, help="Pacientes del lote incremental")
+    args = parser.parse_args()
+
+    hoy = datetime.date.today()
+    for n in args.pacientes:
+        almacen = AlmacenClinica(capacidad=n + args.nuevos)
+        for filas in sintetico.pacientes(n, hoy):
+            almacen.registrar_pacientes(filas)
+        indexar, _ = _ms(lambda: almacen.busqueda.buscar('x'), 1)
+        print(f"\n{n:,} pacientes · índice inicial {indexar:,.0f} ms")
+        print(f"  {'consulta':<14}{'ms':>8}{'resultados':>12}  primero")
+        for consulta in CONSULTAS:
+            ms, resultados = _ms(lambda: almacen.busqueda.buscar(consulta), args.repeticiones)
+            print(f"  {consulta!r:<14}{ms:>8.3f}{len(resultados):>12}  {resultados[0]['Nombre'] if resultados else '-'}")
+
+        # Lote nuevo: la siguiente búsqueda indexa solo esas filas
+        nuevos = [dict(fila, ID=None) for fila in next(sintetico.pacientes(args.nuevos, hoy, semilla=n))]
+        almacen.registrar_pacientes(nuevos)
+        incremental, _ = _ms(lambda: almacen.busqueda.buscar('ana'), 1)
+        print(f"  +{args.nuevos:,} pacientes: primera búsqueda {incremental:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark de importación/exportación masiva (``sgc.carga_masiva``) con datos sintéticos.
+
+Escribe un archivo de migración con ``sgc.sintetico`` (pacientes y citas, más
+un porcentaje de filas defectuosas), lo importa a un almacén sobre una base
+SQLite temporal y lo vuelve a exportar. Reporta tiempo, filas por segundo y
+memoria de Python (``tracemalloc``) de cada fase: el pico, lo que queda
+retenido al terminar (las filas nuevas del almacén) y el tamaño del archivo.
+Con lectura por lotes, pico - retenida depende del lote y no del archivo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga_masiva --pacientes 500000 --citas 500000
+    python -m benchmarks.carga_masiva --pacientes 100000 --formato parquet --lote 20000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from sgc import carga_masiva, sintetico
+from sgc.almacen import AlmacenClinica
+from sgc.persistencia import BaseDatos
+
+
+def _escribir(ruta, lotes, formato, defectuosas):
+    """Escribe los lotes de ``sgc.sintetico`` como un archivo de migración, dañando algunas filas."""
+    if formato == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        escritor = None
+    for i, filas in enumerate(lotes):
+        df = pd.DataFrame(filas)
+        danadas = df.sample(frac=defectuosas, random_state=i).index
+        columna = 'Fecha' if 'Fecha' in df else 'Fecha_Registro'
+        df[columna] = df[columna].astype(str)
+        df.loc[danadas, columna] = 'no es fecha'
+        if formato == 'csv':
+            df.to_csv(ruta, mode='a', header=i == 0, index=False)
+        else:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            escritor = escritor or pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla)
+    if formato == 'parquet' and escritor is not None:
+        escritor.close()
+
+
+def _medir(funcion, memoria):
+    """``(resultado, segundos, pico MB, retenida MB)``; la diferencia pico - retenida es lo transitorio."""
+    if memoria:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - t0
+    if not memoria:
+        return resultado, segundos, None, None
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico / 2**20, retenida / 2**20
+
+
+def _mb(valor):
+    return f"{'-':>10}" if valor is None else f"{valor:>10.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=500_000)
+    parser.add_argument('--citas', type=int, default=500_000)
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--lote', type=int, default=carga_masiva.LOTE)
+    parser.add_argument('--defectuosas', type=float, default=0.01, help="Fracción de filas con fecha inválida")
+    parser.add_argument('--sin-memoria', action='store_true', help="Sin tracemalloc (los tiempos salen ~3x más rápidos)")
+    args = parser.parse_args()
+
+    hoy = datetime.date.today()
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivos = {}
+        for tipo, lotes in (('pacientes', sintetico.pacientes(args.pacientes, hoy)),
+                            ('citas', sintetico.citas(args.citas, args.pacientes, hoy))):
+            archivos[tipo] = os.path.join(carpeta, f"{tipo}.{args.formato}")
+            _escribir(archivos[tipo], lotes, args.formato, args.defectuosas)
+
+        # Base vacía: los pacientes conservan el ID de origen y las citas lo referencian
+        almacen = AlmacenClinica(BaseDatos(os.path.join(carpeta, 'sgc.db')))
+        print(f"{'fase':<26}{'filas':>10}{'rechazadas':>12}{'s':>8}{'filas/s':>10}{'pico MB':>10}{'retenida':>10}{'archivo MB':>12}")
+        for tipo in ('pacientes', 'citas'):
+            resumen, segundos, pico, retenida = _medir(lambda: carga_masiva.importar(
+                almacen, tipo, archivos[tipo], args.formato, args.lote, hoy), not args.sin_memoria)
+            tamano = os.path.getsize(archivos[tipo]) / 2**20
+            print(f"{'importar ' + tipo:<26}{resumen['leidas']:>10,}{resumen['rechazadas']:>12,}{segundos:>8.1f}"
+                  f"{resumen['leidas'] / segundos:>10,.0f}{_mb(pico)}{_mb(retenida)}{tamano:>12.1f}")
+
+        for tipo, tabla in (('pacientes', almacen.pacientes), ('citas', almacen.citas)):
+            tabla.vista() # La vista ya existe cuando la página ofrece la descarga
+            for formato, exportador in (('csv', carga_masiva.exportar_csv), ('parquet', carga_masiva.exportar_parquet)):
+                tamano, segundos, pico, retenida = _medir(
+                    lambda: sum(len(parte) for parte in exportador(tabla, args.lote)), not args.sin_memoria)
+                print(f"{f'exportar {tipo} {formato}':<26}{len(tabla):>10,}{'-':>12}{segundos:>8.1f}"
+                      f"{len(tabla) / segundos:>10,.0f}{_mb(pico)}{_mb(retenida)}{tamano / 2**20:>12.1f}")
+        almacen.base_datos.pool.cerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark del motor de disponibilidad (``sgc.disponibilidad``) con agendas densas.
+
+Llena un año de agenda para N doctores (cada hora de la jornada ocupada con
+probabilidad ``--ocupacion``), lo carga como suscriptor igual que el almacén
+y mide:
+
+- carga: citas por segundo al anexarlas
+- validación de una cita nueva (empalme o no) por segundo
+- "próximos n horarios" de un doctor y de cualquier doctor, para citas de 1 h
+  y de ``--horas-largas`` h (rachas libres raras en una agenda densa),
+  contra un recorrido día por día de las mismas máscaras sin el árbol
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.disponibilidad_agenda --doctores 20 --dias 365 --ocupacion 0.95
+    python -m benchmarks.disponibilidad_agenda --consultas 5000 --horas-largas 4
+"""
+import argparse
+import datetime
+import random
+import time
+
+import numpy as np
+
+from sgc import disponibilidad
+from sgc.almacen import ESQUEMA_CITAS, TablaColumnar
+from sgc.disponibilidad import MotorDisponibilidad
+
+
+class _AgendaLineal(disponibilidad._AgendaDoctor):
+    """Misma agenda sin usar el árbol: revisa un día tras otro."""
+
+    def primer_dia(self, desde, celdas):
+        return desde
+
+
+def _citas(doctores, dias, ocupacion, inicio, semilla):
+    """Una cita por hora ocupada, con doctores y días en orden aleatorio (como llegan las reservas)."""
+    azar = np.random.default_rng(semilla)
+    horas = np.arange(disponibilidad.APERTURA.hour, disponibilidad.CIERRE.hour)
+    doctor, dia, hora = np.meshgrid(np.arange(len(doctores)), np.arange(dias), horas, indexing='ij')
+    ocupadas = azar.random(doctor.shape) < ocupacion
+    orden = azar.permutation(int(ocupadas.sum()))
+    fechas = [inicio + datetime.timedelta(days=d) for d in range(dias)]
+    return [
+        {'ID Paciente': 'P001', 'Doctor': doctores[d], 'Fecha': fechas[f], 'Hora': f"{h:02d}:00",
+         'Estado': 'Confirmada', 'Servicio': 'Valoración', 'Costo_Cita': 800}
+        for d, f, h in zip(doctor[ocupadas][orden].tolist(), dia[ocupadas][orden].tolist(), hora[ocupadas][orden].tolist())
+    ]
+
+
+def _por_segundo(funcion, argumentos):
+    t0 = time.perf_counter()
+    for args in argumentos:
+        funcion(*args)
+    segundos = time.perf_counter() - t0
+    return len(argumentos) / segundos, segundos * 1e6 / len(argumentos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--doctores', type=int, default=20)
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--ocupacion', type=float, default=0.95, help="Probabilidad de que cada hora esté ocupada")
+    parser.add_argument('--consultas', type=int, default=2_000)
+    parser.add_argument('--opciones', type=int, default=3, help="Horarios por consulta")
+    parser.add_argument('--horas-largas', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args()
+
+    doctores = [f"Dr. {i:02d}" for i in range(args.doctores)]
+    inicio = datetime.date(2026, 1, 5)
+    citas = _citas(doctores, args.dias, args.ocupacion, inicio, args.semilla)
+    tabla = TablaColumnar(ESQUEMA_CITAS, len(citas))
+    tabla.extender(citas)
+
+    motor = MotorDisponibilidad(doctores)
+    t0 = time.perf_counter()
+    motor.al_agendar_citas(tabla, 0, len(tabla))
+    carga = time.perf_counter() - t0
+    lineal = MotorDisponibilidad()
+    lineal._agendas = {doctor: _AgendaLineal() for doctor in doctores}
+    lineal.al_agendar_citas(tabla, 0, len(tabla))
+    print(f"{args.doctores} doctores x {args.dias} días, {len(citas):,} citas ({args.ocupacion:.0%} de las horas): "
+          f"carga {carga:.2f} s ({len(citas) / carga:,.0f} citas/s)")
+
+    azar = random.Random(args.semilla)
+    desdes = [datetime.datetime.combine(inicio + datetime.timedelta(days=azar.randrange(args.dias)),
+                                        datetime.time(azar.randrange(disponibilidad.APERTURA.hour, disponibilidad.CIERRE.hour), 15 * azar.randrange(4)))
+              for _ in range(args.consultas)]
+    quien = [azar.choice(doctores) for _ in desdes]
+    ahora = datetime.datetime.combine(inicio, datetime.time()) # La anticipación se mide desde el inicio de la agenda
+
+    validar = [({'Doctor': d, 'Fecha': desde.date(), 'Hora': f"{desde:%H:%M}"},) for d, desde in zip(quien, desdes)]
+
+    def _validar(cita):
+        try:
+            motor.validar(cita)
+        except disponibilidad.ConflictoAgenda:
+            pass
+
+    por_s, us = _por_segundo(_validar, validar)
+    print(f"\n{'validar cita':<34}{por_s:>12,.0f}/s{us:>10.1f} µs")
+
+    print(f"\n{'consulta':<34}{'árbol µs':>12}{'lineal µs':>12}{'x':>8}")
+    for horas in (1, args.horas_largas):
+        duracion = datetime.timedelta(hours=horas)
+        for etiqueta, por_doctor in (("un doctor", True), ("cualquier doctor", False)):
+            consultas = [(args.opciones, desde, d if por_doctor else None, duracion, ahora) for d, desde in zip(quien, desdes)]
+            assert all(motor.proximos(*c) == lineal.proximos(*c) for c in consultas[:50])
+            _, us_arbol = _por_segundo(motor.proximos, consultas)
+            _, us_lineal = _por_segundo(lineal.proximos, consultas)
+            print(f"{f'próximos {args.opciones}, {horas} h, {etiqueta}':<34}{us_arbol:>12.1f}{us_lineal:>12.1f}{us_lineal / us_arbol:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
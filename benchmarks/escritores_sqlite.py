@@ -0,0 +1,93 @@
+"""Benchmark de escritores concurrentes sobre el almacén SQLite (WAL).
+
+Simula varias recepciones agendando citas al mismo tiempo, con hilos de un
+mismo servidor y/o procesos independientes sobre el mismo archivo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.escritores_sqlite --escritores 8 --citas 2000 --lote 1 50
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from sgc.persistencia import BaseDatos
+
+
+def _citas(escritor, n):
+    hoy = datetime.date.today()
+    return [
+        {'ID Paciente': f"P{escritor:03d}", 'Doctor': 'Dr. Salas' if i % 2 else 'Dra. Vega',
+         'Fecha': hoy + datetime.timedelta(days=i % 90), 'Hora': f"{8 + i % 12:02d}:00",
+         'Estado': 'Confirmada', 'Servicio': 'Valoración', 'Costo_Cita': 800}
+        for i in range(n)
+    ]
+
+
+def _escribir(base_datos, escritor, n, lote, latencias):
+    citas = _citas(escritor, n)
+    for i in range(0, n, lote):
+        t0 = time.perf_counter()
+        base_datos.insertar_citas(citas[i:i + lote])
+        latencias.append(time.perf_counter() - t0)
+
+
+def _proceso(ruta, escritor, n, lote, cola):
+    latencias = []
+    _escribir(BaseDatos(ruta, tamano_pool=1), escritor, n, lote, latencias)
+    cola.put(latencias)
+
+
+def correr(ruta, escritores, n, lote, modo):
+    latencias = []
+    t0 = time.perf_counter()
+    if modo == 'hilos':
+        base_datos = BaseDatos(ruta, tamano_pool=escritores)
+        hilos = [threading.Thread(target=_escribir, args=(base_datos, e, n, lote, latencias)) for e in range(escritores)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    else:
+        BaseDatos(ruta, tamano_pool=1) # Crea el esquema antes de arrancar los procesos
+        cola = multiprocessing.Queue()
+        procesos = [multiprocessing.Process(target=_proceso, args=(ruta, e, n, lote, cola)) for e in range(escritores)]
+        for proceso in procesos:
+            proceso.start()
+        for _ in procesos:
+            latencias.extend(cola.get())
+        for proceso in procesos:
+            proceso.join()
+    total = time.perf_counter() - t0
+    latencias_ms = np.array(latencias) * 1000
+    return {
+        'filas_por_s': escritores * n / total,
+        'p50_ms': float(np.percentile(latencias_ms, 50)),
+        'p99_ms': float(np.percentile(latencias_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escritores', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--citas', type=int, default=2000, help="Citas por escritor")
+    parser.add_argument('--lote', type=int, nargs='+', default=[1, 50])
+    parser.add_argument('--modo', choices=['hilos', 'procesos'], nargs='+', default=['hilos', 'procesos'])
+    args = parser.parse_args()
+
+    print(f"{'modo':<10}{'escritores':>11}{'lote':>6}{'filas/s':>12}{'p50 ms':>9}{'p99 ms':>9}")
+    for modo in args.modo:
+        for escritores in args.escritores:
+            for lote in args.lote:
+                with tempfile.TemporaryDirectory() as carpeta:
+                    r = correr(os.path.join(carpeta, 'bench.db'), escritores, args.citas, lote, modo)
+                print(f"{modo:<10}{escritores:>11}{lote:>6}{r['filas_por_s']:>12,.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
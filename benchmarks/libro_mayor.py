@@ -0,0 +1,98 @@
+"""Benchmark del libro mayor (``sgc.libro_mayor``) con datos sintéticos.
+
+Anexa N pacientes y sus citas de ``sgc.sintetico`` al libro por lotes, como
+lo haría el almacén, y mide:
+
+- carga: asientos por segundo
+- totales por rango de fechas aleatorio, de la clínica y de un paciente
+  (elegido con el mismo sesgo que las citas), contra sumar con NumPy una
+  máscara sobre todos los asientos; ambos resultados deben ser idénticos
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.libro_mayor --pacientes 100000 --citas-por-paciente 3
+    python -m benchmarks.libro_mayor --pacientes 500000 --consultas 500
+"""
+import argparse
+import datetime
+import random
+import time
+
+import numpy as np
+
+from sgc import sintetico
+from sgc.almacen import ESQUEMA_CITAS, ESQUEMA_PACIENTES, TablaColumnar
+from sgc.kpis import dia_ordinal
+from sgc.libro_mayor import CUENTAS, INGRESO, LibroMayor
+
+
+def _cargar(libro, tabla, lotes, al_anexar):
+    """Anexa los lotes a ``tabla`` y avisa al libro. Devuelve los segundos dentro del libro."""
+    segundos = 0.0
+    for filas in lotes:
+        inicio = len(tabla)
+        tabla.extender(filas)
+        t0 = time.perf_counter()
+        al_anexar(tabla, inicio, len(tabla))
+        segundos += time.perf_counter() - t0
+    return segundos
+
+
+def _escaneo(dias, centavos, cuentas, pacientes, cuenta, desde, hasta, paciente=None):
+    """El mismo total recorriendo todos los asientos."""
+    mascara = (cuentas == cuenta) & (dias >= desde) & (dias <= hasta)
+    if paciente is not None:
+        mascara &= pacientes == paciente
+    return int(centavos[mascara].sum())
+
+
+def _us(funcion, consultas):
+    t0 = time.perf_counter()
+    resultados = [funcion(*c) for c in consultas]
+    return (time.perf_counter() - t0) * 1e6 / len(consultas), resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=100_000)
+    parser.add_argument('--citas-por-paciente', type=float, default=3.0)
+    parser.add_argument('--consultas', type=int, default=1_000, help="Rangos aleatorios por tipo de consulta")
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args()
+
+    hoy = datetime.date.today()
+    n_citas = int(args.pacientes * args.citas_por_paciente)
+    libro = LibroMayor()
+    segundos = _cargar(libro, TablaColumnar(ESQUEMA_PACIENTES, args.pacientes),
+                       sintetico.pacientes(args.pacientes, hoy), libro.al_registrar_pacientes)
+    segundos += _cargar(libro, TablaColumnar(ESQUEMA_CITAS, n_citas),
+                        sintetico.citas(n_citas, args.pacientes, hoy), libro.al_agendar_citas)
+    print(f"{args.pacientes:,} pacientes, {n_citas:,} citas: {len(libro):,} asientos en {segundos:.2f} s "
+          f"({len(libro) / segundos:,.0f} asientos/s)")
+    for cuenta, nombre in CUENTAS.items():
+        print(f"  {nombre:<10}${libro.total(cuenta) / 100:>20,.2f}")
+
+    dias = np.frombuffer(libro.dias, dtype=np.int64)
+    centavos = np.frombuffer(libro.centavos, dtype=np.int64)
+    cuentas = np.frombuffer(libro.cuentas, dtype=np.int8)
+    pacientes = np.asarray(libro.pacientes, dtype=object)
+
+    azar = random.Random(args.semilla)
+    primero, ultimo = int(dias.min()), int(dias.max())
+    rangos = [sorted((azar.randint(primero, ultimo), azar.randint(primero, ultimo))) for _ in range(args.consultas)]
+    ids = [f"P{int(args.pacientes * azar.random() ** 2) + 1:03d}" for _ in rangos]
+    epoca = datetime.date(1970, 1, 1)
+    print(f"\n{'consulta':<26}{'libro µs':>12}{'escaneo µs':>14}{'x':>8}")
+    for etiqueta, por_paciente in (("clínica", False), ("paciente", True)):
+        consultas = [(INGRESO, epoca + datetime.timedelta(days=d), epoca + datetime.timedelta(days=h), p if por_paciente else None)
+                     for (d, h), p in zip(rangos, ids)]
+        us_libro, resultados = _us(libro.total, consultas)
+        us_escaneo, esperados = _us(
+            lambda cuenta, desde, hasta, paciente: _escaneo(dias, centavos, cuentas, pacientes, cuenta,
+                                                           dia_ordinal(desde), dia_ordinal(hasta), paciente),
+            consultas)
+        assert resultados == esperados
+        print(f"{f'ingreso por rango, {etiqueta}':<26}{us_libro:>12.1f}{us_escaneo:>14.1f}{us_escaneo / us_libro:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark de la cola de notificaciones contra el simulador local de WhatsApp.
+
+Mide mensajes por segundo y latencia (encolado -> entregado) con distintos
+números de trabajadores, incluyendo fallos simulados que fuerzan reintentos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.notificaciones_whatsapp --mensajes 1000 --trabajadores 1 8 32
+"""
+import argparse
+import time
+
+import numpy as np
+
+from sgc.notificaciones import ENTREGADO, FALLIDO, ColaNotificaciones, PasarelaHTTP
+from sgc.stub_whatsapp import ServidorWhatsAppSimulado
+
+
+def correr(mensajes, trabajadores, latencia, tasa_fallo):
+    servidor = ServidorWhatsAppSimulado(latencia=latencia, tasa_fallo=tasa_fallo).iniciar_en_hilo()
+    cola = ColaNotificaciones(PasarelaHTTP(servidor.url), trabajadores=trabajadores, espera_base=0.01,
+                              retener=mensajes)
+    t0 = time.perf_counter()
+    ids = [cola.encolar(f"55{i:08d}", f"Confirmación de cita #{i}") for i in range(mensajes)]
+    encolado = time.perf_counter() - t0
+    while cola.pendientes():
+        time.sleep(0.01)
+    total = time.perf_counter() - t0
+    estados = [cola.estado(i) for i in ids]
+    servidor.shutdown()
+    latencias = np.array([e['Entregado'] - e['Creado'] for e in estados if e['Estado'] == ENTREGADO]) * 1000
+    return {
+        'encolar_us': encolado / mensajes * 1e6,
+        'msg_por_s': mensajes / total,
+        'p50_ms': float(np.percentile(latencias, 50)),
+        'p99_ms': float(np.percentile(latencias, 99)),
+        'fallidos': sum(e['Estado'] == FALLIDO for e in estados),
+        'reintentos': sum(e['Intentos'] - 1 for e in estados),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mensajes', type=int, default=1000)
+    parser.add_argument('--trabajadores', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--latencia', type=float, default=0.01, help="Latencia simulada de la API (s)")
+    parser.add_argument('--tasa-fallo', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'trabajadores':>12}{'encolar µs':>12}{'msg/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'reintentos':>11}{'fallidos':>9}")
+    for trabajadores in args.trabajadores:
+        r = correr(args.mensajes, trabajadores, args.latencia, args.tasa_fallo)
+        print(f"{trabajadores:>12}{r['encolar_us']:>12.1f}{r['msg_por_s']:>10,.0f}{r['p50_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['reintentos']:>11}{r['fallidos']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark por página del demo con datos sintéticos (Streamlit ``AppTest``, sin navegador).
+
+Para cada escala puebla una base SQLite temporal con ``sgc.sintetico`` y, en un
+proceso nuevo (cachés de Streamlit y módulos limpios), recorre todas las
+páginas de ``PAGES``: tiempo de la primera visita (fría) y de un rerun de la
+misma página (tibia). En una segunda pasada, también en un proceso nuevo, mide
+la memoria pico de Python de cada visita fría con ``tracemalloc``.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.paginas_streamlit --pacientes 10000 100000 --citas-por-paciente 3
+    python -m benchmarks.paginas_streamlit --pacientes 1000000 --sin-memoria --json paginas.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+DEMO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo.py')
+ARRANQUE = '(arranque: carga del almacén)'
+
+
+def _recorrer(memoria, timeout, cola):
+    """Visita cada página una vez en frío y otra en tibio; corre en un proceso hijo."""
+    from streamlit.testing.v1 import AppTest
+
+    if memoria:
+        tracemalloc.start()
+    at = AppTest.from_file(DEMO, default_timeout=timeout)
+    t0 = time.perf_counter()
+    at.run()
+    filas = [{'pagina': ARRANQUE, 'fria': time.perf_counter() - t0, 'tibia': None,
+              'pico_mb': tracemalloc.get_traced_memory()[1] / 2**20 if memoria else None,
+              'error': at.exception[0].message if at.exception else None}]
+    for pagina in at.sidebar.radio[0].options:
+        if memoria:
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        at.sidebar.radio[0].set_value(pagina).run()
+        fria = time.perf_counter() - t0
+        pico = tracemalloc.get_traced_memory()[1] / 2**20 if memoria else None
+        error = at.exception[0].message if at.exception else None
+        t0 = time.perf_counter()
+        at.run()
+        filas.append({'pagina': pagina, 'fria': fria, 'tibia': time.perf_counter() - t0, 'pico_mb': pico, 'error': error})
+    cola.put(filas)
+
+
+def _en_proceso(memoria, timeout):
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_recorrer, args=(memoria, timeout, cola))
+    proceso.start()
+    filas = cola.get()
+    proceso.join()
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--citas-por-paciente', type=float, default=3.0)
+    parser.add_argument('--articulos', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=900, help="Segundos máximos por rerun")
+    parser.add_argument('--sin-memoria', action='store_true', help="Omitir la pasada con tracemalloc")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    from sgc.persistencia import BaseDatos
+    from sgc.sintetico import poblar
+
+    resultados = []
+    for n_pacientes in args.pacientes:
+        n_citas = int(n_pacientes * args.citas_por_paciente)
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, 'sgc.db')
+            t0 = time.perf_counter()
+            base_datos = BaseDatos(ruta)
+            poblar(base_datos, n_pacientes, n_citas, args.articulos)
+            base_datos.pool.cerrar()
+            print(f"\n== {n_pacientes:,} pacientes, {n_citas:,} citas, {args.articulos} artículos "
+                  f"(poblado en {time.perf_counter() - t0:.1f} s) ==")
+            # Los procesos hijos leen la ruta al importar sgc.persistencia
+            os.environ['SGC_DB'] = ruta
+            os.environ['SGC_IMAGENES'] = os.path.join(carpeta, 'imagenes')
+            os.environ['SGC_AUDITORIA'] = os.path.join(carpeta, 'auditoria')
+            filas = _en_proceso(False, args.timeout)
+            if not args.sin_memoria:
+                for fila, con_memoria in zip(filas, _en_proceso(True, args.timeout)):
+                    fila['pico_mb'] = con_memoria['pico_mb']
+
+        print(f"{'página':<48}{'fría ms':>10}{'tibia ms':>10}{'pico MB':>10}")
+        for fila in filas:
+            tibia = f"{fila['tibia'] * 1000:>10.0f}" if fila['tibia'] is not None else f"{'-':>10}"
+            pico = f"{fila['pico_mb']:>10.1f}" if fila['pico_mb'] is not None else f"{'-':>10}"
+            print(f"{fila['pagina'][:47]:<48}{fila['fria'] * 1000:>10.0f}{tibia}{pico}" + (f"  ERROR: {fila['error']}" if fila['error'] else ""))
+            resultados.append(dict(fila, pacientes=n_pacientes, citas=n_citas))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Prueba de carga del portal del paciente: sesiones concurrentes sobre datos sintéticos.
+
+Puebla una base SQLite temporal con ``sgc.sintetico`` (más cobros de Aspel
+repartidos entre los pacientes) y atiende peticiones del portal desde N hilos
+a la vez, como sesiones de Streamlit en un mismo servidor. Cada petición lee
+lo que muestra la página: próximas citas, consultas pagadas, totales y
+facturas del paciente (el total pagado sale del libro mayor). Los pacientes se eligen con el mismo sesgo que las
+citas sintéticas (los frecuentes piden más).
+
+Se compara con un escaneo de la tabla de citas completa por petición (lo que
+costaba sin vistas por paciente). Reporta peticiones por segundo y latencia
+p50/p99.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.portal_concurrente --pacientes 100000 --sesiones 1 8 32
+    python -m benchmarks.portal_concurrente --pacientes 20000 --peticiones 500 --sin-escaneo
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from sgc.almacen import AlmacenClinica
+from sgc.aspel import SINCRONIZADA, BandejaAspel, nueva_clave
+from sgc.libro_mayor import INGRESO, a_centavos
+from sgc.persistencia import BaseDatos
+from sgc.portal import COMPLETADA
+from sgc.sintetico import poblar
+
+
+def peticion_vistas(almacen, bandeja, id_paciente, hoy):
+    """Datos de una vista del portal desde las vistas por paciente."""
+    return (almacen.portal.proximas(id_paciente, hoy), almacen.portal.pagadas(id_paciente, 50),
+            almacen.libro.total(INGRESO, paciente=id_paciente), bandeja.totales(id_paciente), bandeja.facturas_paciente(id_paciente))
+
+
+def peticion_escaneo(almacen, bandeja, id_paciente, hoy):
+    """Los mismos datos recorriendo todas las citas en cada petición (NumPy)."""
+    citas = almacen.citas
+    del_paciente = np.flatnonzero(citas.columna('ID Paciente') == id_paciente)
+    fechas = citas.columna('Fecha')[del_paciente]
+    completada = citas.categoria('Estado').categorias.index(COMPLETADA)
+    pagadas = del_paciente[citas.columna('Estado')[del_paciente] == completada]
+    proximas = sorted((citas.fila(i) for i in del_paciente[fechas >= np.datetime64(hoy, 'D')]),
+                      key=lambda c: (c['Fecha'], c['Hora']))
+    historial = sorted((citas.fila(i) for i in pagadas), key=lambda c: (c['Fecha'], c['Hora']), reverse=True)[:50]
+    pagado = int(a_centavos(citas.columna('Costo_Cita')[pagadas]).sum())
+    return proximas, historial, pagado, bandeja.totales(id_paciente), bandeja.facturas_paciente(id_paciente)
+
+
+def _sesiones(peticion, almacen, bandeja, ids, hoy, sesiones):
+    """Reparte ``ids`` entre ``sesiones`` hilos. Devuelve (segundos, latencias)."""
+    latencias = [[] for _ in range(sesiones)]
+
+    def _sesion(i):
+        for id_paciente in ids[i::sesiones]:
+            t0 = time.perf_counter()
+            peticion(almacen, bandeja, id_paciente, hoy)
+            latencias[i].append(time.perf_counter() - t0)
+
+    hilos = [threading.Thread(target=_sesion, args=(i,)) for i in range(sesiones)]
+    t0 = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return time.perf_counter() - t0, np.concatenate([np.array(l) for l in latencias]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=100_000)
+    parser.add_argument('--citas-por-paciente', type=float, default=3.0)
+    parser.add_argument('--cobros-por-paciente', type=float, default=1.0)
+    parser.add_argument('--sesiones', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--peticiones', type=int, default=2_000, help="Peticiones por corrida (repartidas entre sesiones)")
+    parser.add_argument('--sin-escaneo', action='store_true', help="Omitir la comparación con el escaneo completo")
+    args = parser.parse_args()
+
+    hoy = datetime.date.today()
+    azar = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as carpeta:
+        base_datos = BaseDatos(os.path.join(carpeta, 'portal.db'))
+        t0 = time.perf_counter()
+        poblar(base_datos, args.pacientes, int(args.pacientes * args.citas_por_paciente), hoy=hoy)
+        bandeja = BandejaAspel(base_datos)
+        n_cobros = int(args.pacientes * args.cobros_por_paciente)
+        pacientes = (args.pacientes * azar.random(n_cobros) ** 2).astype(np.int64) + 1
+        for inicio in range(0, n_cobros, 50_000):
+            lote = pacientes[inicio:inicio + 50_000].tolist()
+            bandeja.registrar_cobros([
+                {'clave_idempotencia': nueva_clave(), 'id_paciente': f"P{p:03d}", 'paciente': f"P{p:03d}",
+                 'concepto': 'Consulta', 'monto': 800} for p in lote[::2]
+            ], estado=SINCRONIZADA)
+            bandeja.registrar_cobros([
+                {'id_paciente': f"P{p:03d}", 'paciente': f"P{p:03d}", 'concepto': 'Consulta', 'monto': 800} for p in lote[1::2]
+            ])
+        almacen = AlmacenClinica(base_datos)
+        print(f"{args.pacientes:,} pacientes, {len(almacen.citas):,} citas, {n_cobros:,} cobros "
+              f"(base y carga en {time.perf_counter() - t0:.1f} s)")
+
+        ids = [f"P{p:03d}" for p in ((args.pacientes * azar.random(args.peticiones) ** 2).astype(np.int64) + 1).tolist()]
+        assert all(
+            repr(a) == repr(b) for a, b in zip(peticion_vistas(almacen, bandeja, ids[0], hoy), peticion_escaneo(almacen, bandeja, ids[0], hoy))
+        )
+        modos = [('vistas', peticion_vistas)] + ([] if args.sin_escaneo else [('escaneo', peticion_escaneo)])
+        print(f"\n{'modo':<10}{'sesiones':>10}{'pet/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for nombre, peticion in modos:
+            for sesiones in args.sesiones:
+                segundos, latencias = _sesiones(peticion, almacen, bandeja, ids, hoy, sesiones)
+                print(f"{nombre:<10}{sesiones:>10}{len(ids) / segundos:>10,.0f}"
+                      f"{np.percentile(latencias, 50):>10.2f}{np.percentile(latencias, 99):>10.2f}")
+        base_datos.pool.cerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark del pronóstico de inventario sobre un catálogo grande con varias sucursales.
+
+Genera un catálogo sintético ``(sucursales, artículos)`` con 90 días de consumo,
+corre ``sgc.inventario.pronosticar`` de una sola vez y lo compara (tiempo y
+resultados) con el mismo cálculo artículo por artículo en Python.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.pronostico_inventario --sucursales 5 --articulos 2000 20000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from sgc.inventario import CICLO_REVISION, PEDIR, URGENTE, Z_NIVEL_SERVICIO, OK, _pesos_exponenciales, pronosticar
+
+
+def catalogo_sintetico(sucursales, articulos, dias, semilla=13):
+    azar = np.random.default_rng(semilla)
+    uso_mensual = azar.gamma(2.0, 40.0, (sucursales, articulos)).round()
+    tasa = uso_mensual / 30 * azar.uniform(0.7, 1.3, (sucursales, articulos))
+    historial = azar.poisson(tasa[..., None], (sucursales, articulos, dias)).astype(np.float64)
+    historial[:, ::50] = 0 # Artículos nuevos, sin consumo registrado
+    stock = (uso_mensual * azar.uniform(0.05, 1.5, (sucursales, articulos))).round()
+    dias_entrega = azar.choice([5, 7, 10], (sucursales, articulos))
+    return stock, uso_mensual, historial, dias_entrega
+
+
+def pronosticar_por_articulo(stock, uso_mensual, historial, dias_entrega):
+    """Referencia escalar: el mismo modelo, un artículo a la vez."""
+    pesos = _pesos_exponenciales(historial.shape[-1]).tolist()
+    estados, cantidades = [], []
+    for s, u, h, l in zip(stock.ravel().tolist(), uso_mensual.ravel().tolist(),
+                          historial.reshape(-1, historial.shape[-1]).tolist(), dias_entrega.ravel().tolist()):
+        if any(h):
+            demanda = sum(x * w for x, w in zip(h, pesos))
+            desviacion = math.sqrt(max(sum((x - demanda) ** 2 * w for x, w in zip(h, pesos)), 0.0))
+        else:
+            demanda, desviacion = u / 30, u / 30 * 0.3
+        reorden = demanda * l + Z_NIVEL_SERVICIO * desviacion * math.sqrt(l)
+        cobertura = s / demanda if demanda > 0 else math.inf
+        estados.append(URGENTE if cobertura <= l else PEDIR if s <= reorden else OK)
+        cantidades.append(math.ceil(max(reorden + demanda * CICLO_REVISION - s, 0.0)) if s <= reorden else 0)
+    return np.array(estados).reshape(stock.shape), np.array(cantidades).reshape(stock.shape)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sucursales', type=int, default=5)
+    parser.add_argument('--articulos', type=int, nargs='+', default=[2000, 20000])
+    parser.add_argument('--dias', type=int, default=90)
+    parser.add_argument('--sin-referencia', action='store_true', help="No correr la versión artículo por artículo")
+    args = parser.parse_args()
+
+    print(f"{'SKUs totales':>13}{'vectorizado ms':>16}{'SKUs/s':>14}{'por artículo ms':>17}{'aceleración':>13}{'urgentes':>10}")
+    for articulos in args.articulos:
+        stock, uso, historial, entrega = catalogo_sintetico(args.sucursales, articulos, args.dias)
+        t0 = time.perf_counter()
+        p = pronosticar(stock, uso, historial, entrega)
+        vectorizado = time.perf_counter() - t0
+        total = stock.size
+        referencia = ''
+        aceleracion = ''
+        if not args.sin_referencia:
+            t0 = time.perf_counter()
+            estados, cantidades = pronosticar_por_articulo(stock, uso, historial, entrega)
+            lento = time.perf_counter() - t0
+            assert (estados == p['estado']).mean() > 0.999, "El estado difiere de la referencia"
+            assert np.abs(cantidades - p['cantidad_sugerida']).max() <= 1, "La cantidad difiere de la referencia"
+            referencia, aceleracion = f"{lento * 1000:,.0f}", f"{lento / vectorizado:,.0f}x"
+        print(f"{total:>13,}{vectorizado * 1000:>16.1f}{total / vectorizado:>14,.0f}{referencia:>17}{aceleracion:>13}"
+              f"{int((p['estado'] == URGENTE).sum()):>10,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark del cierre de mes: vaciar la bandeja de Aspel contra el simulador HTTP.
+
+Registra N cobros, los sincroniza con distintos tamaños de lote y trabajadores,
+y verifica que, aun con fallos simulados y reintentos, lo facturado en Aspel
+coincide exactamente con la bandeja (sin cobros duplicados).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.sincronizacion_aspel --cobros 2000 --lote 1 50 --trabajadores 1 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sgc.aspel import BandejaAspel, ClienteAspelHTTP, SincronizadorAspel
+from sgc.persistencia import BaseDatos
+from sgc.stub_aspel import AspelSimulado, ServidorAspelSimulado
+
+
+def correr(cobros, lote, trabajadores, latencia, tasa_fallo, tasa_perdida):
+    with tempfile.TemporaryDirectory() as carpeta:
+        bandeja = BandejaAspel(BaseDatos(os.path.join(carpeta, 'bench.db')), max_intentos=100)
+        bandeja.registrar_cobros([
+            {'paciente': f"Paciente {i}", 'concepto': 'Limpieza', 'monto': 800 + i % 7 * 100}
+            for i in range(cobros)
+        ])
+        esperado = bandeja.totales()['pendiente']
+        aspel = AspelSimulado(latencia_lote=latencia, tasa_fallo=tasa_fallo, tasa_respuesta_perdida=tasa_perdida)
+        servidor = ServidorAspelSimulado(aspel=aspel).iniciar_en_hilo()
+        sincronizador = SincronizadorAspel(bandeja, ClienteAspelHTTP(servidor.url), lote, trabajadores)
+        t0 = time.perf_counter()
+        rondas = 0
+        while bandeja.totales()['pendiente'] > 0:
+            sincronizador.sincronizar()
+            rondas += 1
+        total = time.perf_counter() - t0
+        servidor.shutdown()
+        assert abs(aspel.total_facturado() - esperado) < 1e-6, "Aspel facturó distinto a la bandeja"
+        return {'facturas_por_s': cobros / total, 'segundos': total, 'rondas': rondas, 'reenviadas': aspel.duplicadas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cobros', type=int, default=2000)
+    parser.add_argument('--lote', type=int, nargs='+', default=[1, 50, 200])
+    parser.add_argument('--trabajadores', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--latencia', type=float, default=0.02, help="Latencia simulada por lote (s)")
+    parser.add_argument('--tasa-fallo', type=float, default=0.1)
+    parser.add_argument('--tasa-perdida', type=float, default=0.05, help="Lotes facturados cuya respuesta se pierde")
+    args = parser.parse_args()
+
+    print(f"{'lote':>6}{'trabajadores':>13}{'facturas/s':>12}{'segundos':>10}{'rondas':>8}{'reenvíos deduplicados':>23}")
+    for lote in args.lote:
+        for trabajadores in args.trabajadores:
+            r = correr(args.cobros, lote, trabajadores, args.latencia, args.tasa_fallo, args.tasa_perdida)
+            print(f"{lote:>6}{trabajadores:>13}{r['facturas_por_s']:>12,.0f}{r['segundos']:>10.2f}{r['rondas']:>8}{r['reenviadas']:>23}")
+
+
+if __name__ == '__main__':
+    main()
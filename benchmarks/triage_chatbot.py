@@ -0,0 +1,79 @@
+"""Benchmark del motor de triage del chatbot (mensajes por segundo).
+
+Procesa una mezcla sintética de conversaciones (dolor -> severidad -> opción,
+urgencias, horarios, mensajes sin intención) con ``MotorTriage`` y, como
+referencia, con la cadena de ``in``/``elif`` que usaba la página.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.triage_chatbot --mensajes 200000 --largo 40 400
+"""
+import argparse
+import datetime
+import random
+import time
+
+from sgc import triage
+
+FRASES = [
+    "me duele una muela desde ayer", "tengo un dolor fuerte", "2", "1", "martes",
+    "tengo un sangrado que no para", "¿a qué hora abren el sábado?", "muchas gracias",
+    "quisiera saber el precio de una limpieza", "tengo una molestia al masticar",
+]
+RELLENO = "hola buenas tardes quisiera informacion sobre la clinica por favor "
+# Horarios fijos: aquí se mide el motor de texto, no la disponibilidad
+HORARIOS = [{'Doctor': 'Dra. Vega', 'Fecha': datetime.date(2026, 1, 6), 'Hora': f"{h}:00"} for h in (9, 10, 11)]
+
+
+def mensajes_sinteticos(n, largo, semilla=7):
+    azar = random.Random(semilla)
+    mensajes = []
+    for _ in range(n):
+        frase = azar.choice(FRASES)
+        if len(frase) > 2 and largo > len(frase):
+            relleno = (RELLENO * (largo // len(RELLENO) + 1))[:largo - len(frase)]
+            frase = relleno + frase
+        mensajes.append(frase)
+    return mensajes
+
+
+def cadena_elif(estado, texto):
+    """Réplica de la lógica anterior de la página (sin el ``time.sleep``)."""
+    p = texto.lower()
+    if 'emergencia' in p or 'insoportable' in p or 'sangrado' in p:
+        return triage.URGENCIA
+    elif 'dolor' in p or 'muela' in p or 'molestia' in p and estado == triage.INIT:
+        return triage.TRIAGE_DOLOR
+    elif p in ['1', 'leve', 'ocasional', '2', 'constante', 'agudo'] and estado == triage.TRIAGE_DOLOR:
+        return triage.OFERTA_CITA
+    elif p in ['1', 'martes', '2', 'miércoles', '3', 'viernes'] and estado == triage.OFERTA_CITA:
+        return triage.INIT
+    elif 'horario' in p or 'abren' in p or 'gracias' in p:
+        return triage.INIT
+    return triage.INIT
+
+
+def correr(mensajes, procesar):
+    estado = triage.INIT
+    t0 = time.perf_counter()
+    for texto in mensajes:
+        estado = procesar(estado, texto)
+    return len(mensajes) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mensajes', type=int, default=200_000)
+    parser.add_argument('--largo', type=int, nargs='+', default=[0, 40, 400], help="Largo aproximado de cada mensaje (caracteres)")
+    args = parser.parse_args()
+
+    motor = triage.MotorTriage()
+    print(f"{'largo':>6}{'motor msg/s':>14}{'cadena elif msg/s':>20}")
+    for largo in args.largo:
+        mensajes = mensajes_sinteticos(args.mensajes, largo)
+        r_motor = correr(mensajes, lambda estado, texto: motor.procesar(estado, texto, HORARIOS, lambda: HORARIOS)['estado'])
+        r_elif = correr(mensajes, cadena_elif)
+        print(f"{largo:>6}{r_motor:>14,.0f}{r_elif:>20,.0f}")
+
+
+if __name__ == '__main__':
+    main()
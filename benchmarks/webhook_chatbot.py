@@ -0,0 +1,111 @@
+"""Generador de carga para el webhook asíncrono del chatbot.
+
+Reproduce N conversaciones sintéticas de WhatsApp en paralelo (cada una con su
+conexión keep-alive) y reporta mensajes por segundo y latencia p50/p99 de la
+respuesta. Sin ``--url`` levanta el webhook en un hilo aparte con una base de
+datos temporal, así que las citas agendadas también escriben en SQLite.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.webhook_chatbot --conversaciones 100 1000 5000
+    python -m benchmarks.webhook_chatbot --url http://127.0.0.1:8767/webhook
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+from sgc.almacen import AlmacenClinica
+from sgc.persistencia import BaseDatos
+from sgc.webhook_chatbot import ConversacionesTTL, ServicioChatbot, ServidorWebhook
+
+GUIONES = [
+    ["Hola, me duele una muela", "2", "1", "gracias"],
+    ["tengo una molestia al masticar", "leve", "2"],
+    ["¿a qué hora abren?", "gracias"],
+    ["tengo un sangrado que no para"],
+    ["quisiera saber precios", "me duele mucho", "constante", "3"],
+]
+
+
+def iniciar_servidor_local(carpeta):
+    """Webhook en su propio event loop dentro de un hilo daemon. Devuelve la URL."""
+    listo = threading.Event()
+    estado = {}
+
+    def _correr():
+        async def _principal():
+            almacen = AlmacenClinica(BaseDatos(os.path.join(carpeta, 'bench.db')))
+            servidor = await ServidorWebhook(ServicioChatbot(almacen, ConversacionesTTL())).iniciar()
+            estado['url'] = servidor.url
+            listo.set()
+            await servidor.servir()
+        asyncio.run(_principal())
+
+    threading.Thread(target=_correr, daemon=True).start()
+    listo.wait()
+    return estado['url']
+
+
+async def conversacion(url, telefono, guion, latencias, pausa):
+    destino = urllib.parse.urlsplit(url)
+    lector, escritor = await asyncio.open_connection(destino.hostname, destino.port)
+    try:
+        for texto in guion:
+            cuerpo = json.dumps({'from': telefono, 'body': texto}).encode('utf-8')
+            t0 = time.perf_counter()
+            escritor.write(
+                f"POST {destino.path} HTTP/1.1\r\nHost: {destino.netloc}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo
+            )
+            await escritor.drain()
+            cabecera = await lector.readuntil(b'\r\n\r\n')
+            largo = int(next(l for l in cabecera.decode('latin-1').split('\r\n') if l.lower().startswith('content-length')).split(':')[1])
+            await lector.readexactly(largo)
+            latencias.append(time.perf_counter() - t0)
+            assert cabecera.startswith(b'HTTP/1.1 200'), cabecera
+            if pausa:
+                await asyncio.sleep(random.uniform(0, pausa)) # El paciente tarda en escribir
+    finally:
+        escritor.close()
+
+
+async def correr(url, conversaciones, pausa, semilla):
+    azar = random.Random(semilla)
+    latencias = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        conversacion(url, f"52{semilla:02d}{i:08d}", azar.choice(GUIONES), latencias, pausa)
+        for i in range(conversaciones)
+    ])
+    total = time.perf_counter() - t0
+    ms = np.array(latencias) * 1000
+    return {
+        'mensajes': len(latencias), 'msg_por_s': len(latencias) / total,
+        'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="Webhook ya corriendo (por defecto se levanta uno local)")
+    parser.add_argument('--conversaciones', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--pausa', type=float, default=0.0, help="Pausa aleatoria máxima entre mensajes (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        url = args.url or iniciar_servidor_local(carpeta)
+        print(f"{'conversaciones':>14}{'mensajes':>10}{'msg/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for semilla, n in enumerate(args.conversaciones):
+            r = asyncio.run(correr(url, n, args.pausa, semilla))
+            print(f"{n:>14}{r['mensajes']:>10}{r['msg_por_s']:>10,.0f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Páginas del demo, una por módulo; ``demo.py`` importa cada una al visitarla."""
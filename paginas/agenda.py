@@ -0,0 +1,152 @@
+"""Página 3: Agenda (calendario interactivo + confirmación por WhatsApp)."""
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from paginas.comun import obtener_notificaciones, seccion, selector_paciente
+from sgc.calendario import VISTAS, rango_visible
+from sgc.disponibilidad import APERTURA, CIERRE, DIAS_HABILES, GRANO, ConflictoAgenda
+from sgc.memo import memoizado
+
+# --- Intento de importar la librería de calendario ---
+try:
+    from streamlit_calendar import calendar
+    CALENDAR_ENABLED = True
+except ImportError:
+    CALENDAR_ENABLED = False
+    # El error se mostrará solo si se entra a la página de Agenda
+
+
+@memoizado('citas', 'pacientes')
+def eventos_agenda(almacen, inicio, fin):
+    """Eventos del calendario en ``[inicio, fin)``; el título lleva el nombre del paciente."""
+    return almacen.agenda.eventos(inicio, fin)
+
+
+def render_agenda_citas():
+    st.title("🗓️ Agenda y Calendario Interactivo")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Visualiza la agenda real de la clínica. Aquí validamos el proceso de agendar 
+    una cita local (Asistente/Doctor) y cómo esto **dispara la notificación 
+    simulada a WhatsApp**.
+    """)
+    
+    if not CALENDAR_ENABLED:
+        st.error("Módulo de Calendario deshabilitado. No se pudo importar 'streamlit-calendar'.")
+        st.code("Instale esta librería en su venv: pip install streamlit-calendar")
+        st.subheader("Vista de Tabla (Alternativa)")
+        st.dataframe(st.session_state.almacen.citas.vista(), use_container_width=True)
+        return
+
+    # --- KPIs del Módulo ---
+    seccion("KPIs")
+    st.subheader("KPIs de Ocupación de Agenda")
+    almacen = st.session_state.almacen
+    kpis = almacen.kpis.instantanea(datetime.date.today())
+    citas_prox_7d = kpis['citas_prox_7d']
+    doctor_mas_ocupado = kpis['doctor_mas_ocupado'] # "N/A" si no hay citas
+    citas_pendientes = kpis['citas_pendientes']
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Citas Próximos 7 Días", citas_prox_7d)
+    col2.metric("Citas Pendientes de Confirmar", citas_pendientes)
+    col3.metric("Doctor Más Ocupado", doctor_mas_ocupado)
+    st.divider()
+
+    tab1, tab2 = st.tabs(["🗓️ Vista de Calendario (Interactivo)", "➕ Agendar Cita (con Notificación WhatsApp)"])
+
+    with tab1:
+        seccion("Calendario")
+        st.subheader("Calendario de Citas")
+        st.markdown("Haga clic en las citas o arrástrelas (simulación de reagendamiento).")
+        
+        # Solo se construyen y envían los eventos del rango visible (caché por día)
+        c_vista, c_fecha = st.columns(2)
+        vista = c_vista.radio("Vista", list(VISTAS), horizontal=True)
+        fecha_ref = c_fecha.date_input("Ir a la fecha", datetime.date.today())
+        inicio_rango, fin_rango = rango_visible(vista, fecha_ref)
+        events, errores = eventos_agenda(almacen, inicio_rango, fin_rango)
+        for error in errores:
+            st.warning(error)
+        
+        calendar_options = {
+            "headerToolbar": {"left": "", "center": "title", "right": ""},
+            "initialView": VISTAS[vista], "initialDate": fecha_ref.isoformat(),
+            "validRange": {"start": inicio_rango.isoformat(), "end": fin_rango.isoformat()},
+            "slotMinTime": f"{APERTURA:%H:%M:%S}", "slotMaxTime": f"{CIERRE:%H:%M:%S}",
+            "businessHours": { # FullCalendar numera desde el domingo
+                "daysOfWeek": [(dia + 1) % 7 for dia in DIAS_HABILES],
+                "startTime": f"{APERTURA:%H:%M}", "endTime": f"{CIERRE:%H:%M}",
+            },
+            "editable": True, "selectable": True, "allDaySlot": False,
+            "resources": [{"id": doctor, "title": doctor} for doctor in almacen.disponibilidad.doctores],
+            "resourceAreaHeaderContent": "Doctores",
+        }
+        
+        calendar(events=events, options=calendar_options, key=f"agenda_{vista}_{inicio_rango}")
+
+    with tab2:
+        seccion("Agendar cita")
+        st.subheader("Agendar Nueva Cita (Uso Interno)")
+        st.markdown("Simulación del formulario que usaría su asistente.")
+        
+        # Fuera del formulario: la búsqueda se actualiza mientras se escribe
+        if len(almacen.pacientes) == 0:
+            st.error("No hay pacientes registrados.")
+            paciente_obj = None
+        else:
+            paciente_obj = selector_paciente("Paciente", "cita_paciente")
+
+        with st.form("form_nueva_cita"):
+            doctor_sel = st.selectbox("Doctor", almacen.disponibilidad.doctores)
+            fecha_cita = st.date_input("Fecha", min_value=datetime.date.today())
+            hora_sel = st.time_input("Hora", datetime.time(14, 0), step=datetime.timedelta(minutes=GRANO))
+            servicio = st.text_input("Servicio/Motivo", "Valoración")
+            costo_cita = st.number_input("Costo de esta Cita", value=800)
+            
+            st.divider()
+            st.markdown("**Confirmación al Paciente**")
+            notificar_wa = st.checkbox("✅ Enviar confirmación por WhatsApp al paciente (Simulación)", value=True)
+            
+            submit_cita = st.form_submit_button("Agendar Cita y Notificar")
+            
+            if submit_cita and paciente_obj:
+                paciente_sel = paciente_obj['Nombre']
+                paciente_id = paciente_obj['ID']
+                paciente_telefono = paciente_obj['Telefono']
+                
+                nueva_cita = {
+                    'ID Paciente': paciente_id, 'Doctor': doctor_sel, 'Fecha': fecha_cita, 
+                    'Hora': hora_sel.strftime("%H:%M"), 'Estado': 'Confirmada', 'Servicio': servicio, 'Costo_Cita': costo_cita
+                }
+                try:
+                    almacen.reservar_cita(nueva_cita, origen='Recepción')
+                except ConflictoAgenda as e:
+                    libres = almacen.disponibilidad.proximos(3, datetime.datetime.combine(fecha_cita, hora_sel), doctor=doctor_sel)
+                    st.error(f"{e} Próximos horarios libres de {doctor_sel}: "
+                             + ", ".join(f"{h['Fecha']:%d/%m} {h['Hora']}" for h in libres) + ".")
+                    notificar_wa = False
+                else:
+                    st.success(f"Cita agendada para {paciente_sel} el {fecha_cita} a las {hora_sel}.")
+                
+                if notificar_wa:
+                    # Se encola y se entrega en segundo plano; la recepción no espera
+                    texto = f"Hola {paciente_sel}, su cita de {servicio} con {doctor_sel} quedó confirmada para el {fecha_cita} a las {hora_sel.strftime('%H:%M')}."
+                    id_mensaje = obtener_notificaciones().encolar(paciente_telefono, texto)
+                    st.session_state.notificaciones_enviadas.append(id_mensaje)
+                    st.success(f"Confirmación por WhatsApp en cola para el teléfono {paciente_telefono}.")
+
+        seccion("Notificaciones")
+        # --- Estado de las notificaciones de esta sesión ---
+        if st.session_state.notificaciones_enviadas:
+            st.markdown("**Notificaciones de WhatsApp (esta sesión)**")
+            cola_wa = obtener_notificaciones()
+            estados = [cola_wa.estado(i) for i in st.session_state.notificaciones_enviadas[-10:]]
+            estados = [e for e in estados if e] # Los muy antiguos ya se descartaron de la cola
+            st.dataframe(
+                pd.DataFrame(estados, columns=['ID', 'Telefono', 'Estado', 'Intentos', 'Error']),
+                use_container_width=True, hide_index=True
+            )
+            st.button("🔄 Actualizar estado de envíos")
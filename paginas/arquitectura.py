@@ -0,0 +1,107 @@
+"""Página 9: Arquitectura Cloud (acceso multi-consultorio)."""
+import streamlit as st
+
+from paginas.comun import seccion
+
+
+def render_arquitectura_cloud():
+    st.title("☁️ Arquitectura Cloud (Acceso Múlti-Consultorio)")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Este módulo responde a su necesidad crítica de **acceso 100% en la Nube**. 
+    El sistema no será un software local, sino una plataforma web que 
+    permite el acceso seguro desde sus múltiples consultorios y su domicilio.
+    """)
+
+    # --- KPIs del Módulo ---
+    seccion("KPIs")
+    st.subheader("KPIs de Salud del Sistema (Simulados)")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Estado del Sistema", "✅ Operacional")
+    col2.metric("Tiempo de Actividad (Uptime)", "99.98%")
+    col3.metric("Conexión API (WhatsApp)", "Activa", help="Conexión con Meta/Twilio.")
+    col4.metric("Conexión API (Aspel)", "Activa", help="Conexión con sistema de facturación.")
+
+    seccion("Caché de derivados")
+    # --- Caché de derivados (figuras, tablas y eventos por versión de colección) ---
+    memo = st.session_state.almacen.memo.estadisticas()
+    col5, col6, col7, col8 = st.columns(4)
+    col5.metric("Aciertos de Caché", f"{memo['tasa_aciertos']:.0%}", f"{memo['aciertos']} de {memo['aciertos'] + memo['fallos']}")
+    col6.metric("Recálculos por Datos Nuevos", memo['invalidaciones'])
+    col7.metric("Entradas en Caché", f"{memo['entradas']} / {memo['capacidad']}")
+    col8.metric("Desalojos (LRU)", memo['desalojos'])
+    st.caption("Versiones actuales: " + ", ".join(f"{nombre} v{version}" for nombre, version in st.session_state.almacen.versiones().items()))
+    st.divider()
+
+    seccion("Diagrama")
+    st.subheader("Arquitectura de Sistema Propuesta (Enfocada en Seguridad)")
+    st.graphviz_chart("""
+    digraph SGC_IA_Cloud {
+        rankdir="TB";
+        bgcolor="transparent";
+        node [shape=record, style="filled", fillcolor="#F0F2F6", color="#005A9C", fontname="Arial"];
+        edge [color="#444444"];
+
+        subgraph cluster_pacientes {
+            label = "Pacientes (Usuarios Externos)";
+            style="filled";
+            fillcolor="#F9F9F9";
+            color="#CCCCCC";
+            paciente_wa [label="Paciente (WhatsApp)", shape=rect, fillcolor="#DCF8C6"];
+            paciente_web [label="Paciente (Portal Web)", shape=rect, fillcolor="#E6F3FF"];
+        }
+
+        subgraph cluster_consultorios {
+            label = "Personal de Clínica (Usuarios Internos)";
+            style="filled";
+            fillcolor="#F9F9F9";
+            color="#CCCCCC";
+            consultorio1 [label="Consultorio 1 (Recepción)\nRol: Asistente", shape=rect, fillcolor="#E6F3FF"];
+            consultorio2 [label="Consultorio 2 (Doctor)\nRol: Médico", shape=rect, fillcolor="#E6F3FF"];
+            domicilio [label="Admin (Domicilio)\nRol: Admin", shape=rect, fillcolor="#E6F3FF"];
+        }
+
+        subgraph cluster_cloud {
+            label = "Plataforma en la Nube (AWS / Google Cloud) - Cumple LFPDPPP";
+            style="filled";
+            fillcolor="#F0F8FF";
+            color="#007BFF";
+            
+            api_gateway [label="<f0> API Gateway | (Firewall y Control de Acceso)"];
+            
+            subgraph cluster_backend {
+                label = "Backend (FastAPI)";
+                api_backend [label="<f0> SGC-IA Backend |<f1> Lógica de Roles (Confidencialidad) |<f2> Conexión a IA"];
+            }
+            
+            database [label="<f0> Base de Datos PostgreSQL |<f1> Datos Encriptados (AES-256) |<f2> Pista de Auditoría (NOM-004) |<f3> Respaldos 5 Años", shape=record];
+            
+            frontend [label="<f0> Frontend (Streamlit) |<f1> Dashboard |<f2> Paneles de Gestión", shape=record];
+        }
+        
+        subgraph cluster_apis_externas {
+            label = "APIs Externas";
+            style="filled";
+            fillcolor="#FFF9F0";
+            color="#CCCCCC";
+            api_wa [label="API WhatsApp (Twilio/Meta)", shape=rect, fillcolor="#FFF0E0"];
+            api_aspel [label="API Aspel", shape=rect, fillcolor="#FFF0E0"];
+            api_openai [label="API OpenAI (GPT-4)", shape=rect, fillcolor="#FFF0E0"];
+        }
+
+        // Conexiones
+        {consultorio1, consultorio2, domicilio} -> api_gateway [label="Acceso Web (HTTPS Encriptado)"];
+        paciente_wa -> api_wa [label="Mensaje"];
+        paciente_web -> frontend [label="Visita Portal"];
+        
+        api_gateway -> frontend;
+        api_gateway -> api_backend;
+        
+        frontend -> api_backend [label="Pide datos (Validado por Rol)"];
+        api_backend -> database [label="Lee/Escribe (Genera Auditoría)"];
+        
+        api_backend -> api_wa [label="Responde WhatsApp"];
+        api_backend -> api_aspel [label="Genera Factura"];
+        api_backend -> api_openai [label="Procesa Chatbot"];
+    }
+    """)
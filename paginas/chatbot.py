@@ -0,0 +1,90 @@
+"""Página 4: Chatbot externo (triage y agendamiento)."""
+import datetime
+
+import streamlit as st
+
+from paginas.comun import seccion
+from sgc import triage
+from sgc.disponibilidad import ConflictoAgenda
+
+
+def render_chatbot_paciente():
+    st.title("🤖 Chatbot de Pacientes (Triage y Agendamiento)")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Este es el **Asistente Virtual 24/7** para sus pacientes. 
+    Responde a su solicitud de un chatbot que pueda **calificar la urgencia (triage)** de un síntoma y **agendar citas** automáticamente.
+    """)
+    
+    # --- KPIs del Módulo ---
+    seccion("KPIs")
+    st.subheader("KPIs de Rendimiento del Chatbot (Simulados)")
+    total_consultas = st.session_state.kpi_chat_consultas
+    citas_ia = st.session_state.kpi_chat_citas_ia
+    urgencias = st.session_state.kpi_chat_urgencias
+    tasa_conversion = (citas_ia / (total_consultas + 1)) * 100 # +1 para evitar división por cero
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Consultas Atendidas (Hoy)", total_consultas, help="Número total de interacciones iniciadas por pacientes.")
+    col2.metric("Citas Agendadas por IA (Hoy)", citas_ia, help="Pacientes que completaron el flujo de agendamiento.")
+    col3.metric("Alertas de Urgencia (Hoy)", urgencias, "inverse", help="Pacientes que reportaron síntomas graves y fueron escalados.")
+    col4.metric("Tasa de Conversión a Cita", f"{tasa_conversion:.1f}%", help="Porcentaje de consultas que terminan en una cita agendada.")
+    st.divider()
+
+    st.markdown("Pruebe el flujo de agendamiento. Escriba **'me duele una muela'**.")
+
+    # Simulación de un teléfono
+    seccion("Conversación")
+    with st.container(border=True):
+        st.markdown("""
+        <div style="background-color: #075E54; color: white; padding: 10px 15px; border-radius: 8px 8px 0 0; display: flex; align-items: center;">
+            <img src="https://upload.wikimedia.org/wikipedia/commons/7/7e/Circle-icons-profile.svg" style="height: 40px; width: 40px; border-radius: 50%; margin-right: 10px;">
+            <b style="font-size: 1.1em;">Asistente Clínica Dental (En línea)</b>
+        </div>
+        """, unsafe_allow_html=True)
+
+        chat_container = st.container(height=400)
+        historial = st.session_state.chat_externo_historial
+
+        # Solo se dibujan los últimos mensajes; los archivados se piden por página
+        if historial.archivados and chat_container.toggle(f"⬆️ Cargar mensajes anteriores ({historial.archivados} archivados)", key="chat_externo_ver_archivo"):
+            tamano_pagina = 20
+            pagina = chat_container.number_input("Página (1 = más recientes)", 1, historial.paginas(tamano_pagina), 1, key="chat_externo_pagina")
+            for message in historial.pagina_archivada(pagina, tamano_pagina):
+                with chat_container.chat_message(message["role"]):
+                    st.markdown(message["content"])
+            chat_container.divider()
+
+        for message in historial.recientes():
+            with chat_container.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+        if prompt := st.chat_input("Escribe tu consulta..."):
+            historial.agregar("user", prompt)
+            with chat_container.chat_message("user"):
+                st.markdown(prompt)
+            
+            st.session_state.kpi_chat_consultas += 1 # KPI
+            
+            with chat_container.chat_message("assistant"):
+                # --- Lógica de IA (Triage y Agendamiento): tabla de transiciones en sgc.triage ---
+                almacen = st.session_state.almacen
+                current_state = st.session_state.get('chat_externo_state', triage.INIT)
+                buscar_horarios = lambda: almacen.disponibilidad.proximos(triage.OPCIONES, datetime.datetime.now())
+                resultado = triage.MOTOR.procesar(current_state, prompt, st.session_state.get('chat_externo_ofertas', []), buscar_horarios)
+
+                if resultado['accion'] == triage.ALERTAR_URGENCIA:
+                    st.session_state.kpi_chat_urgencias += 1 # KPI
+                elif resultado['accion'] == triage.AGENDAR_CITA:
+                    # Añadir la cita al calendario real (si otra sesión ganó el horario, se ofrecen otros)
+                    try:
+                        almacen.reservar_cita(triage.cita_de_horario(resultado['horario']), origen='Chatbot')
+                        st.session_state.kpi_chat_citas_ia += 1 # KPI
+                    except ConflictoAgenda:
+                        resultado = triage.MOTOR.ofrecer(buscar_horarios, triage.RESPUESTAS['horario_ocupado'])
+                response = resultado['respuesta']
+                st.session_state.chat_externo_state = resultado['estado']
+                st.session_state.chat_externo_ofertas = resultado['ofertas']
+
+                st.markdown(response)
+            historial.agregar("assistant", response)
@@ -0,0 +1,207 @@
+"""Recursos compartidos por las páginas: almacén, servicios de fondo y estado de sesión.
+
+Las dependencias pesadas que solo usan algunas páginas (pandas para las
+vistas, el pool de rayos X, el generador sintético) se importan dentro de la
+función que las necesita, no al cargar este módulo.
+"""
+import datetime
+import os
+
+import numpy as np
+import streamlit as st
+
+from sgc.almacen import AlmacenClinica
+from sgc.aspel import BandejaAspel, ClienteAspelHTTP, SincronizadorAspel, SINCRONIZADA
+from sgc.auditoria import BitacoraAuditoria
+from sgc.disponibilidad import DIAS_HABILES, horarios
+from sgc.historial_chat import ArchivoChat, HistorialChat
+from sgc.memo import memoizado
+from sgc.notificaciones import ColaNotificaciones, PasarelaHTTP, PasarelaSimulada
+from sgc.persistencia import BaseDatos
+from sgc.stub_aspel import AspelSimulado
+
+
+# --- FUNCIONES DE UTILIDAD (Reutilizadas) ---
+def seccion(nombre):
+    """Marca el inicio de una sección de la página para el perfilado (sin efecto si está apagado)."""
+    st.session_state.perfilador.seccion(nombre)
+
+
+def render_perfilado(perfil):
+    """Panel lateral del perfilado: últimos reruns desglosados por tramo y exportación JSON-lines."""
+    if not perfil.ejecuciones:
+        return
+    import pandas as pd
+    with st.sidebar.expander(f"⏱️ Perfilado (últimos {len(perfil.ejecuciones)} reruns)", expanded=True):
+        ultima = perfil.ejecuciones[-1]
+        st.metric("Último rerun", f"{ultima['total_ms']:.0f} ms", help=ultima['etiqueta'])
+        st.bar_chart(pd.Series([e['total_ms'] for e in perfil.ejecuciones], name="ms por rerun"), height=120)
+        tabla = pd.DataFrame(perfil.tabla()).T
+        st.dataframe(pd.DataFrame({
+            "Último": tabla.iloc[:, -1], "Promedio": tabla.mean(axis=1), "Máx": tabla.max(axis=1),
+        }).rename(index=lambda ruta: "· " * ruta.count('/') + ruta.rsplit('/', 1)[-1]).round(1), use_container_width=True)
+        st.download_button("Exportar JSONL", perfil.exportar_jsonl(), file_name="perfilado_sgc.jsonl", mime="application/jsonl")
+
+
+def selector_paciente(etiqueta, clave):
+    """Typeahead de pacientes: solo los mejores resultados de la búsqueda llegan al navegador.
+
+    Devuelve el registro completo del paciente elegido, o ``None`` si no hay coincidencias.
+    """
+    almacen = st.session_state.almacen
+    consulta = st.text_input(etiqueta, key=f"{clave}_consulta", placeholder="Nombre, teléfono o ID")
+    resultados = almacen.busqueda.buscar(consulta) if consulta.strip() else almacen.busqueda.primeros()
+    if not resultados:
+        st.caption("Sin coincidencias.")
+        return None
+    nombres = {r['ID']: f"{r['ID']} · {r['Nombre']} · {r['Telefono']}" for r in resultados}
+    id_paciente = st.selectbox(etiqueta, list(nombres), format_func=nombres.get,
+                               key=f"{clave}_resultado", label_visibility="collapsed")
+    return almacen.indices.paciente(id_paciente)
+
+
+# ====================================================================================
+# --- DATOS COMPARTIDOS (SQLITE, UNA INSTANCIA POR PROCESO) ---
+# ====================================================================================
+def cargar_datos_semilla(almacen):
+    """Carga los datos de demostración en una base de datos vacía."""
+    almacen.registrar_pacientes([
+        {'ID': 'P001', 'Nombre': 'Ana García', 'Historial': 'Hipertensión', 'Riesgo IA': 'Alto', 'Telefono': '5512345678', 'Servicio': 'Endodoncia', 'Costo': 4500, 'Fecha_Registro': datetime.date(2024, 1, 15), 'Tratamientos_Pasados': 5, 'Fuente': 'Recomendación', 'Aviso_Privacidad': 'Firmado'},
+        {'ID': 'P002', 'Nombre': 'Luis Martínez', 'Historial': 'Ninguno', 'Riesgo IA': 'Bajo', 'Telefono': '5598765432', 'Servicio': 'Limpieza', 'Costo': 800, 'Fecha_Registro': datetime.date(2024, 5, 10), 'Tratamientos_Pasados': 1, 'Fuente': 'Web', 'Aviso_Privacidad': 'Firmado'},
+        {'ID': 'P003', 'Nombre': 'Sofía Hernández', 'Historial': 'Diabetes Tipo 2', 'Riesgo IA': 'Alto', 'Telefono': '5555667788', 'Servicio': 'Ortodoncia', 'Costo': 28000, 'Fecha_Registro': datetime.date(2023, 11, 20), 'Tratamientos_Pasados': 8, 'Fuente': 'Recomendación', 'Aviso_Privacidad': 'Pendiente'},
+        {'ID': 'P004', 'Nombre': 'Carlos Vera', 'Historial': 'Ninguno', 'Riesgo IA': 'Bajo', 'Telefono': '5511223344', 'Servicio': 'Limpieza', 'Costo': 800, 'Fecha_Registro': datetime.date(2024, 10, 1), 'Tratamientos_Pasados': 2, 'Fuente': 'Web', 'Aviso_Privacidad': 'Firmado'},
+        {'ID': 'P005', 'Nombre': 'María López', 'Historial': 'Alergia Penicilina', 'Riesgo IA': 'Medio', 'Telefono': '5544332211', 'Servicio': 'Resina (x2)', 'Costo': 1800, 'Fecha_Registro': datetime.date(2024, 10, 5), 'Tratamientos_Pasados': 1, 'Fuente': 'Chatbot', 'Aviso_Privacidad': 'Firmado'}
+    ])
+    today = datetime.date.today()
+    almacen.agendar_citas([
+        # Citas de hoy
+        {'ID Paciente': 'P001', 'Doctor': 'Dr. Salas', 'Fecha': today, 'Hora': '10:00', 'Estado': 'Confirmada', 'Servicio': 'Endodoncia', 'Costo_Cita': 4500},
+        {'ID Paciente': 'P002', 'Doctor': 'Dra. Vega', 'Fecha': today, 'Hora': '12:00', 'Estado': 'Confirmada', 'Servicio': 'Limpieza', 'Costo_Cita': 800},
+        # Citas futuras
+        {'ID Paciente': 'P003', 'Doctor': 'Dr. Salas', 'Fecha': today + datetime.timedelta(days=1), 'Hora': '16:00', 'Estado': 'Pendiente', 'Servicio': 'Ortodoncia (Ajuste)', 'Costo_Cita': 1500},
+        {'ID Paciente': 'P005', 'Doctor': 'Dra. Vega', 'Fecha': today + datetime.timedelta(days=2), 'Hora': '11:00', 'Estado': 'Confirmada', 'Servicio': 'Resina (Revisión)', 'Costo_Cita': 0},
+        # Citas pasadas (para KPIs)
+        {'ID Paciente': 'P001', 'Doctor': 'Dr. Salas', 'Fecha': today - datetime.timedelta(days=7), 'Hora': '10:00', 'Estado': 'Completada', 'Servicio': 'Valoración', 'Costo_Cita': 800},
+        {'ID Paciente': 'P004', 'Doctor': 'Dra. Vega', 'Fecha': today - datetime.timedelta(days=10), 'Hora': '14:00', 'Estado': 'Cancelada', 'Servicio': 'Limpieza', 'Costo_Cita': 800}
+    ])
+    # Historial de citas completadas (alimenta el pronóstico de ingresos): solo días hábiles y
+    # horarios de la jornada publicada, sin empalmes por doctor, con una tendencia ligera al alza
+    azar = np.random.default_rng(2024)
+    servicios = [('Limpieza', 800), ('Valoración', 800), ('Resina', 900), ('Endodoncia', 4500), ('Ortodoncia (Ajuste)', 1500)]
+    doctores = ('Dr. Salas', 'Dra. Vega')
+    turnos = horarios(paso=60) # Una cita por hora y doctor
+    historial_citas = []
+    for d in range(120, 0, -1):
+        fecha = today - datetime.timedelta(days=d)
+        if fecha.weekday() not in DIAS_HABILES or d in (7, 10): # 7 y 10 ya tienen cita
+            continue
+        n = min(azar.poisson(5 * (1 + 0.2 * (120 - d) / 120)), len(doctores) * len(turnos))
+        for k in azar.choice(len(doctores) * len(turnos), n, replace=False).tolist():
+            servicio, costo = servicios[azar.choice(len(servicios), p=[0.35, 0.25, 0.2, 0.08, 0.12])]
+            historial_citas.append({
+                'ID Paciente': f"P00{azar.integers(1, 6)}", 'Doctor': doctores[k % len(doctores)], 'Fecha': fecha,
+                'Hora': turnos[k // len(doctores)], 'Estado': 'Completada', 'Servicio': servicio, 'Costo_Cita': costo,
+            })
+    almacen.agendar_citas(historial_citas)
+    inventario = {
+        'Guantes (Caja)': {'Stock': 15, 'Uso Mensual': 50, 'Costo_Unitario': 180, 'Proveedor': 'DentalPro'},
+        'Anestesia (ml)': {'Stock': 250, 'Uso Mensual': 400, 'Costo_Unitario': 15, 'Proveedor': 'MedSupply'},
+        'Resina A2 (Jeringa)': {'Stock': 5, 'Uso Mensual': 15, 'Costo_Unitario': 950, 'Proveedor': '3M Dental'}
+    }
+    almacen.guardar_inventario(inventario)
+    # Consumo diario de los últimos 90 días (Poisson alrededor del uso mensual)
+    azar = np.random.default_rng(360)
+    almacen.consumo.registrar([
+        (articulo, today - datetime.timedelta(days=d), cantidad)
+        for articulo, datos in inventario.items()
+        for d, cantidad in enumerate(azar.poisson(datos['Uso Mensual'] / 30, 90)) if cantidad
+    ])
+    bandeja = BandejaAspel(almacen.base_datos)
+    bandeja.registrar_cobros([
+        {'paciente': 'Cobros previos', 'concepto': 'Facturación del día', 'monto': 12500.50, 'folio': 'F-1235'},
+    ], estado=SINCRONIZADA)
+    bandeja.registrar_cobro('Ana García', 4500.00, 'Endodoncia', id_paciente='P001')
+
+
+@st.cache_resource
+def obtener_almacen():
+    """Almacén compartido por todas las sesiones (y recepciones) del servidor, con su bitácora de auditoría."""
+    almacen = AlmacenClinica(BaseDatos(), auditoria=BitacoraAuditoria())
+    if len(almacen.pacientes) == 0:
+        escala = int(os.environ.get('SGC_SINTETICO', 0)) # Pacientes sintéticos (p. ej. 100000) en vez de la semilla
+        if escala:
+            from sgc.sintetico import poblar
+            poblar(almacen.base_datos, escala, 3 * escala)
+            almacen.sincronizar()
+        else:
+            cargar_datos_semilla(almacen)
+    return almacen
+
+
+@st.cache_resource
+def obtener_aspel():
+    """Bandeja y sincronizador de Aspel. Usa ``SGC_ASPEL_URL`` si está definida; si no, un Aspel simulado."""
+    url = os.environ.get('SGC_ASPEL_URL')
+    cliente = ClienteAspelHTTP(url) if url else AspelSimulado(latencia_lote=1.0, latencia_factura=0.01)
+    almacen = obtener_almacen()
+    return SincronizadorAspel(BandejaAspel(almacen.base_datos), cliente, auditoria=almacen.auditoria)
+
+
+@st.cache_resource
+def obtener_notificaciones():
+    """Cola de WhatsApp del servidor. Usa ``SGC_WHATSAPP_URL`` (API real o simulador) si está definida."""
+    url = os.environ.get('SGC_WHATSAPP_URL')
+    pasarela = PasarelaHTTP(url, os.environ.get('SGC_WHATSAPP_TOKEN')) if url else PasarelaSimulada(latencia=2.0)
+    return ColaNotificaciones(pasarela)
+
+
+@st.cache_resource
+def obtener_analizador_rx():
+    """Pool de procesos para el análisis de radiografías, compartido por todas las sesiones."""
+    from sgc.rayos_x import AnalizadorRayosX
+    return AnalizadorRayosX(obtener_almacen().base_datos)
+
+
+@st.cache_resource
+def obtener_archivo_chat():
+    """Mensajes antiguos del chatbot (de todas las sesiones) en la base de datos compartida."""
+    return ArchivoChat(obtener_almacen().base_datos)
+
+
+# ====================================================================================
+# --- DERIVADOS MEMOIZADOS (SE RECALCULAN SOLO SI CAMBIAN SUS COLECCIONES) ---
+# ====================================================================================
+@memoizado('inventario', 'consumo')
+def pronostico_inventario(almacen, hoy):
+    """Catálogo con punto de reorden, cobertura, pedido sugerido y estado (motor vectorizado)."""
+    inventario = almacen.inventario
+    consumo = almacen.consumo.matriz(list(inventario), 90, hoy)
+    from sgc.inventario import tabla_pronostico
+    return tabla_pronostico(inventario, consumo)
+
+
+# ====================================================================================
+# --- DATOS DE SIMULACIÓN (ESTADO DE SESIÓN) ---
+# ====================================================================================
+def inicializar_datos():
+    """Conecta la sesión al almacén compartido y carga el estado propio de la sesión."""
+    st.session_state.almacen = obtener_almacen()
+    st.session_state.almacen.sincronizar() # Citas/pacientes registrados por otras sesiones o procesos
+    
+    # Inicializar el estado del chatbot externo
+    if 'chat_externo_historial' not in st.session_state:
+        historial = HistorialChat(obtener_archivo_chat(), capacidad=int(os.environ.get('SGC_CHAT_CAPACIDAD', 30)))
+        historial.agregar("assistant", "¡Hola! Soy el asistente virtual de la Clínica Dental. ¿En qué puedo ayudarte hoy?")
+        st.session_state.chat_externo_historial = historial
+    if 'chat_externo_state' not in st.session_state:
+        st.session_state.chat_externo_state = "INIT"
+    if 'notificaciones_enviadas' not in st.session_state:
+        st.session_state.notificaciones_enviadas = [] # IDs en la cola de WhatsApp
+    
+    # --- KPIs del Chatbot ---
+    if 'kpi_chat_consultas' not in st.session_state:
+        st.session_state.kpi_chat_consultas = 0
+    if 'kpi_chat_citas_ia' not in st.session_state:
+        st.session_state.kpi_chat_citas_ia = 0
+    if 'kpi_chat_urgencias' not in st.session_state:
+        st.session_state.kpi_chat_urgencias = 0
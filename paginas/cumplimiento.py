@@ -0,0 +1,112 @@
+"""Página 8: Cumplimiento Normativo (LFPDPPP y NOM-004)."""
+import datetime
+
+import streamlit as st
+
+from paginas.comun import seccion
+
+
+def verificar_bitacora(bitacora):
+    """Recorre la cadena completa y guarda el resumen en la sesión (antes del rerun, para que lo vean los KPIs)."""
+    verificacion = bitacora.verificar()
+    verificacion['hora'] = datetime.datetime.now().strftime('%H:%M:%S')
+    st.session_state.auditoria_verificacion = verificacion
+
+
+def render_cumplimiento_normativo():
+    st.title("🛡️ Cumplimiento Normativo (LFPDPPP & NOM-004)")
+    st.warning("Este módulo es uno de los **activos más valiosos** del sistema. Protege su clínica contra multas millonarias por mal manejo de datos sensibles.")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Responde a su preocupación sobre el cumplimiento de las **leyes mexicanas de datos personales y expedientes clínicos**. 
+    Demostramos cómo la arquitectura del SGC-IA está diseñada para cumplir con estas normas.
+    """)
+
+    # --- KPIs del Módulo ---
+    seccion("KPIs")
+    st.subheader("KPIs de Cumplimiento y Auditoría")
+    almacen = st.session_state.almacen
+    kpis = almacen.kpis.instantanea(datetime.date.today())
+    total_pacientes = kpis['total_pacientes']
+    consentimientos_firmados = total_pacientes - kpis['consentimiento_pendiente']
+    tasa_consentimiento = (consentimientos_firmados / total_pacientes) * 100 if total_pacientes > 0 else 100
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Tasa de Consentimiento (LFPDPPP)", f"{tasa_consentimiento:.0f}%",
+                help="Porcentaje de pacientes que han firmado el consentimiento de datos sensibles.")
+    bitacora = almacen.auditoria
+    verificacion = st.session_state.get('auditoria_verificacion')
+    if verificacion is None:
+        estado_bitacora = "✅ Activa"
+    else:
+        estado_bitacora = "✅ Íntegra" if verificacion['error'] is None else "❌ Alterada"
+    col2.metric("Pista de Auditoría (NOM-004)", estado_bitacora,
+                f"{bitacora.punta()['seq']:,} registros", "off",
+                help="Cada alta, cita, cobro y consulta de expediente queda encadenada por hash en la bitácora.")
+    col3.metric("Accesos No Autorizados (Hoy)", "0",
+                help="Intentos de acceso bloqueados a datos sensibles.")
+    col4.metric("Solicitudes ARCO Pendientes", "1", "inverse",
+                help="Solicitudes de pacientes para rectificar o cancelar sus datos.")
+
+    # --- Verificación de la cadena (recorre todos los segmentos; solo a petición) ---
+    st.button("Verificar integridad de la bitácora", on_click=verificar_bitacora, args=(bitacora,))
+    if verificacion is not None:
+        megas = verificacion['bytes'] / 1e6
+        resumen = (f"{verificacion['registros']:,} registros en {verificacion['marcos']:,} marcos ({megas:,.1f} MB) "
+                   f"verificados a las {verificacion['hora']} en {verificacion['segundos'] * 1000:,.0f} ms")
+        if verificacion['error'] is None:
+            st.success(f"Cadena de hashes íntegra: {resumen}.")
+        else:
+            st.error(f"La bitácora fue alterada: {verificacion['error']} ({resumen}).")
+    if bitacora.error:
+        perdidos = bitacora.estadisticas['perdidos']
+        st.warning(f"La bitácora no ha podido escribir a disco: {bitacora.error}"
+                   + (f" ({perdidos:,} registros sin guardar)." if perdidos else ". Reintentando."))
+    st.divider()
+
+    seccion("Pestañas normativas")
+    tab_lfpdppp, tab_nom004 = st.tabs(["🔒 Ley de Protección de Datos (LFPDPPP)", "📋 Norma del Expediente Clínico (NOM-004)"])
+
+    with tab_lfpdppp:
+        st.subheader("Cumplimiento de la LFPDPPP (Datos Personales Sensibles)")
+        st.markdown("""
+        La LFPDPPP exige un manejo estricto de los "Datos Sensibles" (estado de salud). Un Excel o una libreta no cumplen con esto.
+        
+        **Nuestra Solución (SGC-IA):**
+        
+        1.  **Consentimiento Explícito:**
+            - El SGC-IA fuerza la captura del consentimiento.
+            - El `Portal del Paciente` permite la firma digital del Aviso de Privacidad.
+            - El `Panel de Pacientes` (Pág 2) le alerta qué pacientes tienen el consentimiento **pendiente**.
+        
+        2.  **Seguridad (Arquitectura Cloud):**
+            - Como se ve en la `Página 9 (Arquitectura)`, toda la base de datos está en la nube, no en computadoras locales vulnerables a robo o pérdida.
+            - Toda la información viaja **encriptada (HTTPS)**.
+            - La base de datos (PostgreSQL) está **encriptada en reposo (AES-256)**.
+        
+        3.  **Derechos ARCO (Acceso, Rectificación, Cancelación, Oposición):**
+            - El `Portal del Paciente` (Pág 7) es la herramienta para que sus pacientes ejerzan sus derechos ARCO de forma digital y auditable.
+        """)
+
+    with tab_nom004:
+        st.subheader("Cumplimiento de la NOM-004-SSA3-2012 (Expediente Clínico)")
+        st.markdown("""
+        La NOM-004 exige la Integridad, Confidencialidad y Conservación del expediente clínico.
+        
+        **Nuestra Solución (SGC-IA):**
+        
+        1.  **Confidencialidad (Gestión de Roles):**
+            - El sistema implementa **roles y permisos**.
+            - El personal de recepción **(Rol: Asistente)** puede ver la `Agenda` (Pág 3) y el `Chatbot` (Pág 4), pero **NO PUEDE** ver los `Registros Clínicos` (Pág 5).
+            - Solo el personal médico **(Rol: Doctor)** puede acceder al historial clínico sensible.
+        
+        2.  **Integridad (Pista de Auditoría):**
+            - Un expediente en papel o Excel se puede alterar. La NOM-004 lo prohíbe.
+            - El SGC-IA escribe una **Pista de Auditoría (Audit Log)** de solo-anexar: cada alta de paciente, cita (recepción, chatbot o importación), cobro enviado a Aspel y consulta de un expediente deja un registro `[Fecha] | [Acción] | [Origen] | [Paciente] | [Detalle]`.
+            - Cada registro queda **encadenado por hash (SHA-256)** al anterior: modificar o borrar uno solo se detecta con el botón *Verificar integridad de la bitácora*.
+            - El paciente puede consultar desde el `Portal del Paciente` (Pág 7) quién accedió o modificó su expediente (Derecho de Acceso).
+        
+        3.  **Conservación (Backups Automatizados):**
+            - La NOM-004 exige conservar los expedientes por **5 años** después del último acto médico.
+            - La `Arquitectura Cloud` incluye **respaldos automáticos diarios** y una política de retención de 5 años, protegiéndola contra incendios, inundaciones o robo de equipo.
+        """)
@@ -0,0 +1,127 @@
+"""Página 6: Gestión Interna (inventario con pronóstico y sincronización con Aspel)."""
+import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from paginas.comun import obtener_aspel, pronostico_inventario, seccion, selector_paciente
+from sgc.aspel import clave_cobro, nueva_clave
+from sgc.tablas import estilos_por_categoria, paginar, total_paginas
+
+# Colores por estado del pronóstico, en el orden de ``sgc.inventario.ESTADOS`` (OK, PEDIR, URGENTE)
+ESTILO_ESTADO = [
+    'background-color: #4BBF73; color: white',
+    'background-color: #FFB84B; color: black',
+    'background-color: #FF4B4B; color: white',
+]
+
+
+def color_prediccion(df):
+    """Colores de las columnas de predicción a partir del estado precalculado (una pasada por página)."""
+    css = estilos_por_categoria(df['Estado'], ESTILO_ESTADO)
+    return pd.DataFrame({columna: css for columna in df.columns}, index=df.index)
+
+
+def render_gestion_interna():
+    st.title("📦 Gestión Interna (Inventario y Aspel)")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Este módulo protege los ingresos y optimiza el flujo de caja. 
+    Responde a su necesidad de **conectar la operación clínica con la facturación (Aspel)** y de predecir las necesidades de inventario.
+    """)
+    
+    almacen = st.session_state.almacen
+    tab1, tab2 = st.tabs(["Inventario (Predicciones IA)", "Sincronización con Aspel"])
+    
+    with tab1:
+        seccion("KPIs de inventario")
+        st.subheader("KPIs de Gestión de Inventario")
+        df_inventario = pronostico_inventario(almacen, datetime.date.today())
+        valor_total_stock = (df_inventario['Stock'] * df_inventario['Costo_Unitario']).sum()
+        items_urgentes = int((df_inventario['Estado'] == 'URGENTE').sum())
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Valor Total del Inventario", f"${valor_total_stock:,.2f} MXN")
+        col2.metric("Ítems en Nivel Crítico (IA)", f"{items_urgentes} ítems", "inverse" if items_urgentes > 0 else "normal")
+        col3.metric("Proveedor Principal", df_inventario['Proveedor'].mode()[0])
+        st.divider()
+
+        seccion("Tabla de inventario")
+        st.subheader("Control de Inventario (Forecasting IA)")
+        st.caption("Demanda diaria ponderada de los últimos 90 días de consumo; punto de reorden con stock de seguridad al 95 % según el tiempo de entrega de cada proveedor.")
+        # Orden y paginación del lado del servidor: solo la página visible se estiliza y se envía
+        c_orden, c_dir, c_tamano, c_pagina = st.columns([3, 2, 2, 2])
+        orden = c_orden.selectbox("Ordenar por", ['Estado', 'Días de Cobertura', 'Cantidad Sugerida', 'Stock', 'Proveedor'], key="inv_orden")
+        descendente = c_dir.radio("Dirección", ["Desc", "Asc"], horizontal=True, index=0 if orden == 'Estado' else 1, key=f"inv_dir_{orden}") == "Desc"
+        tamano = c_tamano.selectbox("Filas por página", [25, 50, 100], key="inv_tamano")
+        paginas = total_paginas(len(df_inventario), tamano)
+        pagina = c_pagina.number_input(f"Página (de {paginas})", 1, paginas, 1, key="inv_pagina")
+        df_pagina = paginar(df_inventario, pagina, tamano, orden, descendente)
+        st.dataframe(
+            df_pagina.style
+            .format({"Costo_Unitario": "S{:,.2f} MXN", "Días de Cobertura": lambda v: "∞" if np.isinf(v) else f"{v:.1f}"})
+            .apply(color_prediccion, axis=None, subset=['Predicción IA', 'Estado']),
+            use_container_width=True
+        )
+        st.caption(f"Mostrando {(pagina - 1) * tamano + 1 if len(df_pagina) else 0}–{(pagina - 1) * tamano + len(df_pagina)} de {len(df_inventario)} artículos.")
+        
+    with tab2:
+        sincronizador = obtener_aspel()
+        bandeja = sincronizador.bandeja
+        seccion("Aspel")
+        st.subheader("KPIs de Sincronización de Facturación")
+        totales_aspel = bandeja.totales()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Monto Sincronizado", f"${totales_aspel['sincronizado']:,.2f} MXN")
+        col2.metric("Monto Pendiente de Sincronizar", f"${totales_aspel['pendiente']:,.2f} MXN", "inverse")
+        col3.metric("Cobros en Error", totales_aspel['por_estado'].get('Error', (0, 0.0))[0],
+                    help="Cobros que agotaron sus reintentos. Revise el detalle en la bandeja.")
+        st.divider()
+
+        st.subheader("Sincronizar Cobro con Aspel")
+        st.markdown("Cada cobro entra a una **bandeja de salida** con clave de idempotencia; la sincronización envía lotes en paralelo y un reintento nunca duplica la factura.")
+        
+        if len(almacen.pacientes) == 0:
+            st.warning("No hay pacientes registrados.")
+            paciente_obj = None
+        else:
+            paciente_obj = selector_paciente("Paciente a cobrar", "cobro_paciente")
+        if paciente_obj:
+            paciente_cobro = paciente_obj['Nombre']
+            # El formulario de registro acepta costos menores al mínimo del cobro
+            monto = st.number_input("Monto (MXN)", min_value=100.0, value=max(100.0, float(paciente_obj['Costo'])), step=100.0)
+            concepto = st.text_input("Concepto", paciente_obj['Servicio'])
+            
+            # La clave sale de la captura: un doble clic o un rerun con los mismos datos no registran
+            # dos cargos; el nonce solo cambia cuando se edita el formulario (otro paciente, monto o concepto)
+            captura = (paciente_obj['ID'], monto, concepto)
+            if st.session_state.get('captura_cobro_aspel') != captura:
+                st.session_state.captura_cobro_aspel = captura
+                st.session_state.nonce_cobro_aspel = nueva_clave()
+            clave = clave_cobro(*captura, st.session_state.nonce_cobro_aspel)
+            
+            if st.button("Enviar Factura a ASPEL (API)"):
+                if bandeja.contiene(clave):
+                    st.info(f"Este cobro de {paciente_cobro} ya está en la bandeja de Aspel. Para un cargo nuevo, modifique el monto o el concepto.")
+                else:
+                    bandeja.registrar_cobro(paciente_cobro, monto, concepto, id_paciente=paciente_obj['ID'], clave_idempotencia=clave)
+                    almacen.auditoria.registrar('cobro_registrado', paciente_obj['ID'], 'Recepción', clave=clave, monto=monto, concepto=concepto)
+                    sincronizador.sincronizar_en_segundo_plano()
+                    st.success(f"Cobro de {paciente_cobro} (${monto:,.2f}) en la bandeja de Aspel. Se está sincronizando en segundo plano.")
+
+        st.markdown("##### Bandeja de Salida (Cierre de Mes)")
+        c_lote, c_boton = st.columns([1, 2])
+        tamano_lote = c_lote.number_input("Facturas por lote", min_value=1, max_value=500, value=sincronizador.tamano_lote)
+        if c_boton.button("Sincronizar todos los pendientes"):
+            if sincronizador.sincronizar_en_segundo_plano(int(tamano_lote)):
+                st.info("Sincronización iniciada.")
+            else:
+                st.info("Ya hay una sincronización en curso.")
+        if sincronizador.en_curso:
+            st.caption("⏳ Sincronización en curso...")
+        elif sincronizador.ultimo_resumen:
+            r = sincronizador.ultimo_resumen
+            st.caption(f"Última sincronización: {r['sincronizadas']} facturas en {r['lotes']} lotes, {r['fallidas']} fallidas.")
+        st.dataframe(pd.DataFrame(bandeja.recientes()), use_container_width=True, hide_index=True)
+        st.button("🔄 Actualizar bandeja")
@@ -0,0 +1,110 @@
+"""Página 2: Gestión de Pacientes (CRM base)."""
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from paginas.comun import seccion
+from sgc.carga_masiva import FORMATOS, OBLIGATORIAS, a_archivo, exportar_csv, exportar_parquet, formato_de, importar, riesgo_paciente
+
+
+def render_gestion_pacientes():
+    st.title("👥 Gestión de Pacientes (CRM)")
+    st.info("""
+    **Propósito del Módulo:** Este es el núcleo del CRM. 
+    Aquí se almacenan los datos de contacto y la IA los enriquece 
+    clasificando a los pacientes por su nivel de riesgo y origen.
+    """)
+    
+    # --- KPIs del Módulo ---
+    seccion("KPIs")
+    st.subheader("KPIs de Cartera de Pacientes")
+    almacen = st.session_state.almacen
+    df_pacientes = almacen.pacientes.vista()
+    kpis = almacen.kpis.instantanea(datetime.date.today())
+    fuente_principal = kpis['fuente_principal']
+    
+    # KPI de Cumplimiento LFPDPPP
+    consentimiento_pendiente = kpis['consentimiento_pendiente']
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total de Pacientes", kpis['total_pacientes'])
+    col2.metric("Pacientes de Alto Riesgo (IA)", kpis['pacientes_alto_riesgo'])
+    col3.metric("Consentimientos Pendientes", f"{consentimiento_pendiente} Pacientes", 
+                "inverse" if consentimiento_pendiente > 0 else "normal",
+                help="Pacientes que no han firmado el Aviso de Privacidad de Datos Sensibles (LFPDPPP).")
+    st.divider()
+
+    seccion("Tabla de pacientes")
+    st.subheader("Pacientes Registrados (Base de Datos Central)")
+    # Mostrar la columna de cumplimiento
+    st.dataframe(df_pacientes[['ID', 'Nombre', 'Telefono', 'Servicio', 'Costo', 'Riesgo IA', 'Aviso_Privacidad']], use_container_width=True)
+
+    seccion("Registro de paciente")
+    with st.expander("➕ Registrar Nuevo Paciente"):
+        with st.form("form_nuevo_paciente"):
+            c1, c2 = st.columns(2)
+            nombre = c1.text_input("Nombre Completo")
+            telefono = c2.text_input("Teléfono")
+            historial = st.text_area("Historial Médico (e.g., Hipertensión, Diabetes)")
+            alergias = st.text_input("Alergias (e.g., Penicilina, Aspirina)")
+            c3, c4 = st.columns(2)
+            servicio = c3.text_input("Servicio Principal", "Limpieza")
+            costo = c4.number_input("Costo del Servicio", min_value=0, value=800)
+            
+            # Check de Cumplimiento al registrar
+            consentimiento = st.checkbox("El paciente firmó el Aviso de Privacidad y Consentimiento de Datos Sensibles (LFPDPPP).", value=False)
+            
+            submit_paciente = st.form_submit_button("Registrar Paciente")
+            if submit_paciente:
+                riesgo = riesgo_paciente(historial, alergias)
+                
+                nuevo_paciente = {
+                    'ID': None, 'Nombre': nombre, 'Historial': historial, 'Riesgo IA': riesgo, # ID: lo asigna el almacén
+                    'Telefono': telefono, 'Servicio': servicio, 'Costo': costo, 
+                    'Fecha_Registro': datetime.date.today(), 'Tratamientos_Pasados': 0, 'Fuente': 'Manual',
+                    'Aviso_Privacidad': 'Firmado' if consentimiento else 'Pendiente'
+                }
+                almacen.registrar_paciente(nuevo_paciente, origen='Recepción')
+                st.success(f"Paciente {nombre} registrado. Riesgo IA detectado: {riesgo}")
+                
+                if not consentimiento:
+                    st.warning("¡Alerta de Cumplimiento! El paciente fue registrado sin firmar el Aviso de Privacidad.")
+                
+                st.info("Paciente añadido. Los KPIs en el 'Panel de Control' se actualizarán al visitar esa pestaña.")
+
+    seccion("Importación y exportación")
+    with st.expander("📥 Importar / 📤 Exportar Pacientes y Citas (CSV, Excel, Parquet)"):
+        st.markdown("**Importar lista heredada**")
+        tipo = st.radio("Destino", list(OBLIGATORIAS), format_func=str.capitalize, horizontal=True, key="carga_tipo")
+        st.caption(f"Columnas obligatorias: {', '.join(OBLIGATORIAS[tipo])}. "
+                   "Los pacientes sin 'Riesgo IA' se clasifican con su historial y alergias; las citas deben "
+                   "referir a pacientes ya registrados. Fechas ISO (2024-01-15) o dd/mm/aaaa.")
+        archivo = st.file_uploader("Archivo de migración", type=list(FORMATOS), key="carga_archivo")
+        if archivo is not None and st.button(f"Importar {tipo}", key="carga_importar"):
+            avance = st.empty()
+            try:
+                resumen = importar(almacen, tipo, archivo, formato_de(archivo.name),
+                                   al_avanzar=lambda leidas: avance.caption(f"{leidas:,} filas procesadas..."))
+            except ImportError as e:
+                st.error(f"Falta una dependencia para leer este formato: {e}")
+            except ValueError as e:
+                st.error(f"No se pudo importar el archivo: {e}")
+            else:
+                avance.empty()
+                st.success(f"{resumen['importadas']:,} de {resumen['leidas']:,} filas importadas a {tipo}.")
+                if resumen['rechazadas']:
+                    st.warning(f"{resumen['rechazadas']:,} filas rechazadas (se muestran las primeras {len(resumen['errores'])}).")
+                    st.dataframe(pd.DataFrame(resumen['errores'], columns=['Fila', 'Motivo']), hide_index=True, use_container_width=True)
+
+        st.markdown("**Exportar**")
+        st.caption("El archivo se genera por lotes al pulsar el botón.")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.download_button("Pacientes (CSV)", lambda: a_archivo(exportar_csv(almacen.pacientes)),
+                             file_name="pacientes.csv", mime="text/csv", key="exportar_pacientes_csv")
+        col2.download_button("Pacientes (Parquet)", lambda: a_archivo(exportar_parquet(almacen.pacientes)),
+                             file_name="pacientes.parquet", mime="application/octet-stream", key="exportar_pacientes_parquet")
+        col3.download_button("Citas (CSV)", lambda: a_archivo(exportar_csv(almacen.citas)),
+                             file_name="citas.csv", mime="text/csv", key="exportar_citas_csv")
+        col4.download_button("Citas (Parquet)", lambda: a_archivo(exportar_parquet(almacen.citas)),
+                             file_name="citas.parquet", mime="application/octet-stream", key="exportar_citas_parquet")
@@ -0,0 +1,167 @@
+"""Página 1: Panel de Control (KPI maestro de todos los módulos)."""
+import datetime
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from paginas.comun import obtener_aspel, pronostico_inventario, seccion
+from sgc.libro_mayor import AGENDADO, CARTERA, INGRESO
+from sgc.memo import memoizado
+
+
+@memoizado('pacientes')
+def figura_servicios(almacen):
+    """Pastel de pacientes por servicio principal."""
+    if len(almacen.pacientes) == 0:
+        return go.Figure() # Figura vacía si no hay datos
+    servicios_conteo = almacen.pacientes.vista()['Servicio'].value_counts()
+    servicios_conteo = servicios_conteo[servicios_conteo > 0] # Categorías sin pacientes
+    pie_fig = go.Figure(data=[go.Pie(
+        labels=servicios_conteo.index,
+        values=servicios_conteo.values,
+        hole=.3,
+        pull=[0.1 if i == 0 else 0 for i in range(len(servicios_conteo))] # Destacar el más común
+    )])
+    pie_fig.update_layout(
+        title_text="Pacientes por Tipo de Servicio Principal",
+        margin=dict(t=50, b=10, l=10, r=10)
+    )
+    return pie_fig
+
+
+@memoizado('citas')
+def figura_ingresos(almacen, hoy):
+    """Ingresos diarios reales (últimos 60 días) y pronóstico con su banda del 95 %."""
+    pronostico = almacen.ingresos.pronostico(hoy)
+    visibles = slice(-60, None)
+    fig_ingresos = go.Figure()
+    fig_ingresos.add_bar(x=pronostico['dias'][visibles], y=pronostico['historial'][visibles], name="Ingreso real", marker_color="#9BB8D3")
+    fig_ingresos.add_scatter(x=pronostico['dias'][visibles], y=pronostico['promedio_7d'][visibles], name="Promedio 7 días", line=dict(color="#1F4E79"))
+    fig_ingresos.add_scatter(x=pronostico['dias_pronostico'], y=pronostico['superior'], line=dict(width=0), showlegend=False, hoverinfo='skip')
+    fig_ingresos.add_scatter(x=pronostico['dias_pronostico'], y=pronostico['inferior'], line=dict(width=0), fill='tonexty',
+                             fillcolor="rgba(255, 140, 0, 0.2)", name="Intervalo 95 %")
+    fig_ingresos.add_scatter(x=pronostico['dias_pronostico'], y=pronostico['pronostico'], name=f"Pronóstico ({pronostico['modelo']})", line=dict(color="#FF8C00", dash='dash'))
+    fig_ingresos.update_layout(margin=dict(t=10, b=10, l=10, r=10), yaxis_title="MXN", legend=dict(orientation='h'))
+    return fig_ingresos
+
+
+def render_panel_control():
+    st.title("📈 Panel de Control (KPIs Globales y de Módulos)")
+    st.info("""
+    **Propósito del Módulo:** Este es el **Panel de Control Maestro**. 
+    Responde a su solicitud de consolidar los KPIs más importantes de **todos los módulos** en una sola vista para una toma de decisiones 360°.
+    """)
+    
+    seccion("KPIs")
+    # --- CÁLCULO DE TODOS LOS KPIs (Motor incremental, sin recorrer el historial) ---
+    almacen = st.session_state.almacen
+    df_pacientes = almacen.pacientes.vista()
+    df_inventario = pronostico_inventario(almacen, datetime.date.today())
+    hoy = datetime.date.today()
+    kpis = almacen.kpis.instantanea(hoy)
+    
+    # --- KPIs Financieros (Pág 1): sumas por rango del libro mayor, en centavos exactos ---
+    libro = almacen.libro
+    total_pacientes = kpis['total_pacientes']
+    consulta_promedio = 800
+    ingreso_real_total = libro.total(CARTERA) / 100
+    ticket_promedio_real = ingreso_real_total / total_pacientes if total_pacientes > 0 else 0
+    ingreso_citas_hoy = libro.total(AGENDADO, hoy, hoy) / 100
+    hace_30d = hoy - datetime.timedelta(days=29)
+    ingreso_cobrado_mes = libro.total(INGRESO, hace_30d, hoy) / 100
+    ingreso_cobrado_mes_anterior = libro.total(INGRESO, hace_30d - datetime.timedelta(days=30), hace_30d - datetime.timedelta(days=1)) / 100
+
+    # --- KPIs Operativos (Pág 1 y 3) ---
+    citas_completadas_mes = kpis['citas_completadas_mes']
+    citas_canceladas_mes = kpis['citas_canceladas_mes']
+    tasa_no_show = (citas_canceladas_mes / (citas_completadas_mes + citas_canceladas_mes + 1)) * 100
+    citas_prox_7d = kpis['citas_prox_7d']
+
+    # --- KPIs de Cartera y Cumplimiento (Pág 2 y 8) ---
+    pacientes_alto_riesgo = kpis['pacientes_alto_riesgo']
+    pacientes_nuevos_mes = kpis['pacientes_nuevos_mes']
+    consentimiento_pendiente = kpis['consentimiento_pendiente']
+    tasa_consentimiento = ((total_pacientes - consentimiento_pendiente) / total_pacientes) * 100 if total_pacientes > 0 else 100
+
+    # --- KPIs del Chatbot (Pág 4) ---
+    total_consultas_chat = st.session_state.kpi_chat_consultas
+    citas_ia_chat = st.session_state.kpi_chat_citas_ia
+    urgencias_chat = st.session_state.kpi_chat_urgencias
+    tasa_conversion_chat = (citas_ia_chat / (total_consultas_chat + 1)) * 100
+
+    # --- KPIs de Inventario y Facturación (Pág 6) ---
+    valor_total_stock = (df_inventario['Stock'] * df_inventario['Costo_Unitario']).sum()
+    items_urgentes = int((df_inventario['Estado'] == 'URGENTE').sum())
+    totales_aspel = obtener_aspel().bandeja.totales() # Derivados de la bandeja de salida
+    monto_sincronizado_aspel = totales_aspel['sincronizado']
+    monto_pendiente_aspel = totales_aspel['pendiente']
+
+    seccion("Métricas")
+    # --- RENDERIZADO DEL DASHBOARD MAESTRO ---
+    
+    st.subheader("Resumen Ejecutivo (Finanzas y Operaciones)")
+    col1, col2, col3, col_ingreso, col4 = st.columns(5)
+    col1.metric("Valor Real de Cartera", f"${ingreso_real_total:,.2f} MXN", 
+                help="Suma de los costos de los tratamientos principales de todos los pacientes.")
+    col2.metric("Ticket Promedio Real", f"${ticket_promedio_real:,.2f} MXN",
+                f"{((ticket_promedio_real / consulta_promedio) - 1) * 100:.0f}% vs. Consulta Base")
+    col3.metric("Valor en Citas (Hoy)", f"${ingreso_citas_hoy:,.2f} MXN",
+                help="Suma del valor de las citas programadas para hoy (sin las canceladas).")
+    col_ingreso.metric("Ingresos Cobrados (Últ. 30d)", f"${ingreso_cobrado_mes:,.2f} MXN",
+                       f"{ingreso_cobrado_mes - ingreso_cobrado_mes_anterior:+,.2f} vs. 30d previos",
+                       help="Suma del valor de las citas completadas en los últimos 30 días.")
+    col4.metric("Tasa de No-Show (Últ. 30d)", f"{tasa_no_show:.1f}%",
+                f"{citas_canceladas_mes} canceladas", "inverse")
+    
+    st.markdown("---")
+    st.subheader("Resumen de Módulos (KPIs Específicos)")
+    
+    # --- Fila de Cartera y Agenda ---
+    st.markdown("##### Cartera, Agenda y Cumplimiento")
+    col5, col6, col7, col8 = st.columns(4)
+    col5.metric("Pacientes Activos", f"{total_pacientes} Pacientes")
+    col6.metric("Pacientes Nuevos (Últ. 30d)", f"{pacientes_nuevos_mes} Pacientes")
+    col7.metric("Citas Próximos 7 Días", f"{citas_prox_7d} Citas")
+    col8.metric("Tasa de Consentimiento (LFPDPPP)", f"{tasa_consentimiento:.0f}%",
+                f"{consentimiento_pendiente} pendientes", "inverse" if consentimiento_pendiente > 0 else "normal")
+
+    # --- Fila de Chatbot y Finanzas Internas ---
+    st.markdown("##### Automatización (Chatbot y Aspel)")
+    col9, col10, col11, col12 = st.columns(4)
+    col9.metric("Consultas Chatbot (Hoy)", f"{total_consultas_chat}")
+    col10.metric("Citas por Chatbot (Hoy)", f"{citas_ia_chat}",
+                 f"{tasa_conversion_chat:.0f}% conversión")
+    col11.metric("Monto Sincronizado (Aspel)", f"${monto_sincronizado_aspel:,.2f} MXN")
+    col12.metric("Monto Pendiente (Aspel)", f"${monto_pendiente_aspel:,.2f} MXN",
+                 "inverse" if monto_pendiente_aspel > 0 else "normal")
+
+    # --- Fila de IA e Inventario ---
+    st.markdown("##### Riesgo (IA e Inventario)")
+    col13, col14, col15 = st.columns(3)
+    col13.metric("Pacientes 'Alto Riesgo' (IA)", f"{pacientes_alto_riesgo} Pacientes",
+                 "inverse" if pacientes_alto_riesgo > 0 else "normal")
+    col14.metric("Valor Total del Inventario", f"${valor_total_stock:,.2f} MXN")
+    col15.metric("Ítems Críticos (Inventario)", f"{items_urgentes} ítems",
+                 "inverse" if items_urgentes > 0 else "normal")
+
+    st.divider()
+    
+    seccion("Gráficas")
+    # --- GRÁFICAS DE DESEMPEÑO ---
+    st.subheader("Análisis Gráfico de Desempeño")
+    c1_graf, c2_graf = st.columns(2)
+    with c1_graf:
+        st.plotly_chart(figura_servicios(almacen), use_container_width=True)
+    with c2_graf:
+        st.markdown("**Costos de Servicios por Paciente**")
+        st.dataframe(df_pacientes[['Nombre', 'Servicio', 'Costo']], use_container_width=True, height=300,
+                     column_config={"Costo": st.column_config.NumberColumn(format="$%.2f MXN")}) # Sin Styler: no tiene límite de celdas
+
+    seccion("Pronóstico de ingresos")
+    # --- Pronóstico de ingresos (citas completadas; se reajusta solo con datos nuevos) ---
+    st.markdown("**Ingresos Diarios y Pronóstico (Próximos 30 Días)**")
+    pronostico = almacen.ingresos.pronostico(datetime.date.today())
+    col_graf, col_kpi = st.columns([4, 1])
+    col_graf.plotly_chart(figura_ingresos(almacen, datetime.date.today()), use_container_width=True)
+    col_kpi.metric("Ingreso Proyectado (30d)", f"${pronostico['pronostico'].sum():,.0f} MXN",
+                   f"{(pronostico['pronostico'].sum() / max(pronostico['historial'][-30:].sum(), 1) - 1) * 100:.0f}% vs. últimos 30d")
@@ -0,0 +1,113 @@
+"""Página 7: Portal del Paciente (citas, facturación y derechos ARCO)."""
+import datetime
+
+import streamlit as st
+
+from paginas.comun import obtener_aspel, seccion, selector_paciente
+from sgc.aspel import SINCRONIZADA
+from sgc.libro_mayor import INGRESO
+
+
+def render_portal_paciente():
+    st.title("👤 Portal del Paciente (Facturación y Citas)")
+    st.warning("**VISIÓN DEL CLIENTE:** Este módulo simula la **única vista** que vería su paciente si entra a su página web para consultar su información.")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Responde a su solicitud de tener un módulo de facturación separado para el cliente.
+    Esto es un "Portal de Paciente" donde pueden auto-gestionarse, 
+    ver su historial de pagos, sus próximas citas y **gestionar su privacidad**.
+    """)
+
+    seccion("Inicio de sesión")
+    st.subheader("Simulación de Inicio de Sesión del Paciente")
+    
+    # Simulación de Login
+    almacen = st.session_state.almacen
+    paciente = selector_paciente("Seleccione un paciente para simular su vista:", "portal_paciente")
+    
+    if paciente:
+        st.divider()
+        st.header(f"Bienvenido, {paciente['Nombre']}")
+        
+        seccion("KPIs")
+        # --- KPIs del Módulo (Vista de Paciente): solo se leen las filas de este paciente ---
+        citas_paciente = almacen.portal.proximas(paciente['ID'], datetime.date.today())
+        bandeja = obtener_aspel().bandeja
+        cobros = bandeja.totales(paciente['ID'])['por_estado']
+        facturas_pendientes = sum(n for estado, (n, _) in cobros.items() if estado != SINCRONIZADA)
+        total_historico = almacen.libro.total(INGRESO, paciente=paciente['ID']) / 100 # Citas completadas, en centavos
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Próximas Citas", len(citas_paciente))
+        col2.metric("Facturas Pendientes", facturas_pendientes)
+        col3.metric("Total Pagado (Histórico)", f"${total_historico:,.2f} MXN")
+        
+        seccion("Pestañas del portal")
+        # --- Pestañas del Portal ---
+        tab_citas, tab_facturas, tab_privacidad = st.tabs(["Mis Próximas Citas", "Mi Historial de Facturación", "🔐 Mis Datos y Privacidad (ARCO)"])
+        
+        with tab_citas:
+            if not citas_paciente:
+                st.info("No tiene próximas citas agendadas.")
+                st.button("Agendar Nueva Cita (Ir a WhatsApp)")
+            else:
+                for cita in citas_paciente:
+                    st.success(f"**{cita['Servicio']}** con **{cita['Doctor']}**\n- **Fecha:** {cita['Fecha']}\n- **Hora:** {cita['Hora']}\n- **Estado:** {cita['Estado']}")
+        
+        with tab_facturas:
+            st.markdown(f"Historial de pagos y facturas de {paciente['Nombre']}.")
+            pagadas = almacen.portal.pagadas(paciente['ID'], limite=50)
+            if pagadas:
+                st.markdown("**Consultas pagadas**")
+                st.dataframe([
+                    {"Fecha": c['Fecha'], "Concepto": c['Servicio'], "Doctor": c['Doctor'], "Monto": c['Costo_Cita']} for c in pagadas
+                ], use_container_width=True)
+            facturas = bandeja.facturas_paciente(paciente['ID'])
+            if facturas:
+                st.markdown("**Facturas (CFDI vía Aspel)**")
+                st.dataframe([
+                    dict(f, Fecha=f['Fecha'][:10], Estado="Emitida" if f['Estado'] == SINCRONIZADA else "En trámite") for f in facturas
+                ], use_container_width=True)
+            if not pagadas and not facturas:
+                st.info("Aún no tiene pagos ni facturas registrados.")
+
+        # --- Pestaña de Cumplimiento LFPDPPP ---
+        with tab_privacidad:
+            st.subheader("Gestión de Datos Personales (Derechos ARCO)")
+            st.markdown("En cumplimiento con la Ley de Protección de Datos Personales (LFPDPPP), usted tiene control sobre su información.")
+            
+            st.markdown("---")
+            st.markdown("#### Derecho de Acceso y Rectificación")
+            st.info(f"**Estado de Consentimiento:** {paciente['Aviso_Privacidad']}")
+            if paciente['Aviso_Privacidad'] == 'Pendiente':
+                st.warning("Aún no ha firmado nuestro aviso de privacidad para el manejo de sus datos sensibles de salud. Por favor, fírmelo en su próxima visita.")
+            
+            with st.expander("Ver Mis Datos Registrados (Acceso)"):
+                st.json({
+                    "Nombre": paciente['Nombre'],
+                    "Teléfono": paciente['Telefono'],
+                    "Historial Médico (Sensible)": paciente['Historial'],
+                    "Servicio Principal": paciente['Servicio']
+                })
+
+            # Pista de auditoría del paciente: se lee por índice, sin recorrer la bitácora
+            bitacora = almacen.auditoria
+            with st.expander(f"¿Quién ha consultado o modificado mi expediente? ({bitacora.contar_paciente(paciente['ID'])} registros)"):
+                registros = bitacora.registros_paciente(paciente['ID'], limite=50)
+                if registros:
+                    st.dataframe([
+                        {"Fecha": r['ts'][:19].replace('T', ' '), "Acción": r['accion'], "Origen": r['origen'], "Detalle": r['detalle']}
+                        for r in registros
+                    ], use_container_width=True)
+                else:
+                    st.caption("Aún no hay registros de auditoría para su expediente.")
+            
+            if st.button("Solicitar Corrección de Datos (Rectificación)"):
+                bitacora.registrar('solicitud_arco', paciente['ID'], 'Portal', derecho='Rectificación')
+                st.success("Su solicitud de rectificación ha sido enviada. Nuestro personal se pondrá en contacto con usted para validarla.")
+
+            st.markdown("---")
+            st.markdown("#### Derecho de Cancelación y Oposición")
+            if st.button("Solicitar Eliminación de mi Expediente (Cancelación)"):
+                bitacora.registrar('solicitud_arco', paciente['ID'], 'Portal', derecho='Cancelación')
+                st.info("Su solicitud de cancelación será procesada. (Nota: Por la NOM-004, los expedientes clínicos deben conservarse 5 años. Pasado ese tiempo, se eliminarán).")
@@ -0,0 +1,116 @@
+"""Página 5: Registros Clínicos (análisis de rayos X con IA)."""
+import streamlit as st
+
+from paginas.comun import obtener_analizador_rx, seccion, selector_paciente
+
+
+def render_registros_clinicos():
+    st.title("🔬 Registros Clínicos (IA de Visión por Computadora)")
+    st.info("""
+    **Propósito del Módulo (Su Requerimiento):**
+    Este es el expediente digital (EHR). Responde a su interés en usar 
+    **IA de Visión por Computadora** como un "segundo par de ojos" para el diagnóstico.
+    Es un módulo de alta seguridad que cumple con la **NOM-004** (Expediente Clínico).
+    """)
+    
+    almacen = st.session_state.almacen
+    if len(almacen.pacientes) == 0:
+        st.warning("No hay pacientes registrados.")
+    else:
+        paciente_obj = selector_paciente("Seleccionar Paciente", "rc_paciente")
+        # NOM-004: cada apertura de un expediente queda en la bitácora (una vez por selección, no por rerun)
+        if paciente_obj and st.session_state.get('rc_auditado') != paciente_obj['ID']:
+            almacen.auditoria.registrar('consulta_expediente', paciente_obj['ID'], 'Registros Clínicos')
+            st.session_state.rc_auditado = paciente_obj['ID']
+        
+        # --- KPIs del Módulo (Paciente Específico) ---
+        seccion("KPIs")
+        st.subheader("KPIs del Paciente Seleccionado")
+        
+        if paciente_obj:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Paciente", paciente_obj['Nombre'])
+            col2.metric("Riesgo IA Detectado", paciente_obj['Riesgo IA'],
+                        "Alto" if paciente_obj['Riesgo IA'] == 'Alto' else "normal")
+            col3.metric("Tratamientos Históricos", paciente_obj['Tratamientos_Pasados'])
+            col4.metric("Valor Histórico (Cartera)", f"${paciente_obj['Costo']:,.2f} MXN")
+        st.divider()
+
+        seccion("Odontograma")
+        st.subheader("Odontograma (Simulación)")
+        st.markdown("""
+            <div style='border: 2px solid #005A9C; padding: 20px; text-align: center; background-color: #F0F2F6; height: 150px; display: flex; align-items: center; justify-content: center; font-size: 1.1em; font-weight: bold; color: #005A9C; border-radius: 8px;'>
+                SIMULACIÓN DE ODONTOGRAMA INTERACTIVO (NOM-004)
+            </div>
+            """, unsafe_allow_html=True)
+        st.caption("Aquí iría un odontograma interactivo para el registro de tratamientos por pieza.")
+        st.divider()
+        
+        # --- MÓDULO DE IA DE RAYOS X (EL REQUERIMIENTO) ---
+        seccion("Rayos X")
+        st.subheader("Análisis de Rayos X con IA (Deep Learning)")
+        st.markdown("Simulación de la funcionalidad de IA más avanzada.")
+        
+        uploaded_file = st.file_uploader("Cargar imagen de Rayos X (Simulación)", type=["jpg", "png"])
+        
+        analizador = obtener_analizador_rx()
+        paciente_id = paciente_obj['ID'] if paciente_obj else None
+        if uploaded_file is not None and paciente_id:
+            # La carga se archiva (y se vincula al paciente) una sola vez, no en cada rerun
+            if st.session_state.get('rx_carga') != (paciente_id, uploaded_file.file_id):
+                st.session_state.rx_hash = analizador.ingresar(uploaded_file, paciente_id)
+                st.session_state.rx_carga = (paciente_id, uploaded_file.file_id)
+                almacen.auditoria.registrar('radiografia_archivada', paciente_id, 'Registros Clínicos', hash=st.session_state.rx_hash)
+                uploaded_file.seek(0)
+            hash_rx = st.session_state.rx_hash
+
+            col_img, col_diag = st.columns(2)
+            with col_img:
+                st.image(uploaded_file, caption=f"Imagen de Rayos X cargada (SHA-256 {hash_rx[:12]}…).", use_container_width=True)
+            with col_diag:
+                if st.button("Analizar Imagen (Simulación IA)"):
+                    analizador.analizar(hash_rx) # Corre en el pool de procesos; si ya se analizó, sale de la caché
+
+                resultado = analizador.resultado(hash_rx)
+                if resultado is not None:
+                    st.success(f"Análisis IA Completado ({resultado['ancho']}x{resultado['alto']} px, {resultado['mosaicos']} mosaicos).")
+                    if resultado['hallazgos']:
+                        st.warning("**Hallazgos de IA (Simulación):**\n" + "\n".join(
+                            f"- {h['hallazgo']} en pieza {h['pieza']} (Confianza: {h['confianza']:.0%})." for h in resultado['hallazgos']
+                        ))
+                    else:
+                        st.info("La IA no encontró zonas sospechosas en esta imagen.")
+                elif analizador.en_proceso(hash_rx):
+                    st.info("La IA (modelo de Visión por Computadora) está analizando la imagen en segundo plano...")
+                    st.button("🔄 Actualizar resultado")
+                elif error_rx := analizador.error(hash_rx):
+                    st.error(f"No se pudo analizar la imagen: {error_rx}")
+
+        seccion("Galería de radiografías")
+        # --- Radiografías archivadas: solo se leen (por mmap) las miniaturas de la página visible ---
+        archivo_rx = analizador.archivo
+        total_rx = archivo_rx.contar_paciente(paciente_id)
+        st.subheader(f"Radiografías del Paciente ({total_rx})")
+        if total_rx == 0:
+            st.caption("Este paciente aún no tiene radiografías archivadas.")
+        else:
+            por_pagina = 12
+            paginas_rx = -(-total_rx // por_pagina)
+            pagina_rx = st.number_input("Página", 1, paginas_rx, 1, key="rx_pagina") if paginas_rx > 1 else 1
+            imagenes_rx = archivo_rx.pagina_paciente(paciente_id, pagina_rx, por_pagina)
+            columnas_rx = st.columns(4)
+            for i, imagen in enumerate(imagenes_rx):
+                with columnas_rx[i % 4]:
+                    if imagen['miniatura']:
+                        st.image(archivo_rx.leer(imagen['miniatura']), caption=f"{imagen['creado'][:10]} · {imagen['hash'][:8]}")
+                    else:
+                        st.caption(f"{imagen['hash'][:8]}: miniatura en proceso…")
+            original = st.selectbox(
+                "Ver radiografía original", [None] + [imagen['hash'] for imagen in imagenes_rx],
+                format_func=lambda h: "—" if h is None else h[:12], key="rx_original",
+            )
+            if original:
+                if st.session_state.get('rx_original_auditado') != original:
+                    almacen.auditoria.registrar('consulta_radiografia', paciente_id, 'Registros Clínicos', hash=original)
+                    st.session_state.rx_original_auditado = original
+                st.image(archivo_rx.leer(original), caption=f"Original ({original[:12]}…)", use_container_width=True)
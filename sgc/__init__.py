@@ -0,0 +1 @@
+"""Núcleo de datos y servicios del SGC Integral360 (Demo)."""
@@ -0,0 +1,389 @@
+"""Capa de datos columnar del SGC (pacientes y citas).
+
+Cada tabla guarda sus columnas en arreglos NumPy pre-asignados con tipo fijo:
+fechas como ``datetime64[D]``, catálogos (Estado, Doctor, Servicio, Riesgo IA...)
+como códigos enteros + categorías, e importes como ``float64``. Las páginas leen
+una vista de Pandas que se construye una sola vez por versión de la tabla.
+"""
+import datetime
+import threading
+
+import numpy as np
+
+from sgc.busqueda import IndiceBusqueda
+from sgc.calendario import IndiceAgenda
+from sgc.disponibilidad import MotorDisponibilidad
+from sgc.indices import IndicePacientes
+from sgc.inventario import HistorialConsumo
+from sgc.kpis import MotorKPI
+from sgc.libro_mayor import LibroMayor
+from sgc.memo import Memoizador
+from sgc.portal import VistasPortal
+from sgc.pronostico_ingresos import PronosticoIngresos
+
+CAPACIDAD_INICIAL = 1024
+
+# --- Esquemas (columna -> tipo). Las categorías listadas son el catálogo base ---
+ESQUEMA_PACIENTES = {
+    'ID': 'texto',
+    'Nombre': 'texto',
+    'Historial': 'texto',
+    'Riesgo IA': ('categoria', ['Bajo', 'Medio', 'Alto']),
+    'Telefono': 'texto',
+    'Servicio': ('categoria', []),
+    'Costo': 'importe',
+    'Fecha_Registro': 'fecha',
+    'Tratamientos_Pasados': 'entero',
+    'Fuente': ('categoria', ['Recomendación', 'Web', 'Chatbot', 'Manual']),
+    'Aviso_Privacidad': ('categoria', ['Firmado', 'Pendiente']),
+}
+
+ESQUEMA_CITAS = {
+    'ID Paciente': 'texto',
+    'Doctor': ('categoria', ['Dr. Salas', 'Dra. Vega']),
+    'Fecha': 'fecha',
+    'Hora': 'texto',
+    'Estado': ('categoria', ['Confirmada', 'Pendiente', 'Completada', 'Cancelada']),
+    'Servicio': ('categoria', []),
+    'Costo_Cita': 'importe',
+}
+
+
+# ====================================================================================
+# --- COLUMNAS TIPADAS ---
+# ====================================================================================
+class _Columna:
+    """Arreglo pre-asignado que crece al doble cuando se llena."""
+    dtype = object
+
+    def __init__(self, capacidad):
+        self.datos = np.empty(capacidad, dtype=self.dtype)
+
+    def reservar(self, capacidad):
+        if capacidad > len(self.datos):
+            nuevos = np.empty(capacidad, dtype=self.dtype)
+            nuevos[:len(self.datos)] = self.datos
+            self.datos = nuevos
+
+    def codificar(self, valor):
+        return valor
+
+    def decodificar(self, valor):
+        return valor
+
+    def asignar(self, inicio, valores):
+        self.datos[inicio:inicio + len(valores)] = [self.codificar(v) for v in valores]
+
+    def serie(self, n):
+        return self.datos[:n]
+
+
+class _ColumnaTexto(_Columna):
+    dtype = object
+
+    def codificar(self, valor):
+        return '' if valor is None else str(valor)
+
+
+class _ColumnaEntero(_Columna):
+    dtype = np.int64
+
+    def codificar(self, valor):
+        return int(valor or 0)
+
+    def decodificar(self, valor):
+        return int(valor)
+
+
+class _ColumnaImporte(_Columna):
+    dtype = np.float64
+
+    def codificar(self, valor):
+        return float(valor or 0)
+
+    def decodificar(self, valor):
+        return float(valor)
+
+
+class _ColumnaFecha(_Columna):
+    dtype = 'datetime64[D]'
+
+    def codificar(self, valor):
+        if isinstance(valor, datetime.datetime): # Incluye pd.Timestamp
+            valor = valor.date()
+        elif not isinstance(valor, (datetime.date, np.datetime64)):
+            import pandas as pd # Textos y otros formatos que entiende Pandas
+            valor = pd.Timestamp(valor).date()
+        return np.datetime64(valor, 'D')
+
+    def decodificar(self, valor):
+        return valor.astype(datetime.date)
+
+    def serie(self, n):
+        # Pandas trabaja con resolución mínima de segundos.
+        return self.datos[:n].astype('datetime64[s]')
+
+
+class _ColumnaCategoria(_Columna):
+    """Códigos enteros sobre un catálogo que crece al aparecer valores nuevos."""
+    dtype = np.int32
+
+    def __init__(self, capacidad, categorias):
+        super().__init__(capacidad)
+        self.categorias = list(categorias)
+        self._codigos = {c: i for i, c in enumerate(self.categorias)}
+
+    def codificar(self, valor):
+        valor = '' if valor is None else str(valor)
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.categorias)
+            self.categorias.append(valor)
+            self._codigos[valor] = codigo
+        return codigo
+
+    def decodificar(self, valor):
+        return self.categorias[valor]
+
+    def codigo(self, valor):
+        """Código de una categoría existente (``-1`` si no existe)."""
+        return self._codigos.get(valor, -1)
+
+    def serie(self, n):
+        import pandas as pd
+        return pd.Categorical.from_codes(self.datos[:n], categories=list(self.categorias), validate=False)
+
+
+def _crear_columna(tipo, capacidad):
+    if isinstance(tipo, tuple):
+        return _ColumnaCategoria(capacidad, tipo[1])
+    return {
+        'texto': _ColumnaTexto,
+        'entero': _ColumnaEntero,
+        'importe': _ColumnaImporte,
+        'fecha': _ColumnaFecha,
+    }[tipo](capacidad)
+
+
+# ====================================================================================
+# --- TABLA COLUMNAR ---
+# ====================================================================================
+class TablaColumnar:
+    """Tabla de solo-anexar con columnas tipadas y vista de Pandas cacheada."""
+
+    def __init__(self, esquema, capacidad=CAPACIDAD_INICIAL):
+        self.esquema = esquema
+        self._columnas = {nombre: _crear_columna(tipo, capacidad) for nombre, tipo in esquema.items()}
+        self._capacidad = capacidad
+        self._n = 0
+        self.version = 0
+        self._vista = None
+        self._vista_version = -1
+
+    def __len__(self):
+        return self._n
+
+    def _reservar(self, n):
+        if n <= self._capacidad:
+            return
+        capacidad = self._capacidad
+        while capacidad < n:
+            capacidad *= 2
+        for columna in self._columnas.values():
+            columna.reservar(capacidad)
+        self._capacidad = capacidad
+
+    def agregar(self, fila):
+        """Anexa una fila (dict) y devuelve su índice."""
+        return self.extender([fila])
+
+    def extender(self, filas):
+        """Anexa un lote de filas en una sola pasada por columna. Devuelve el índice de la primera."""
+        inicio = self._n
+        if not filas:
+            return inicio
+        self._reservar(inicio + len(filas))
+        for nombre, columna in self._columnas.items():
+            columna.asignar(inicio, [f.get(nombre) for f in filas])
+        self._n += len(filas)
+        self.version += 1
+        return inicio
+
+    def columna(self, nombre):
+        """Arreglo crudo (códigos para categorías) de las filas ocupadas."""
+        return self._columnas[nombre].datos[:self._n]
+
+    def categoria(self, nombre):
+        return self._columnas[nombre]
+
+    def vista(self):
+        """DataFrame tipado de la tabla. Se reconstruye solo si cambió la versión."""
+        if self._vista_version != self.version:
+            import pandas as pd # Solo las páginas que muestran tablas pagan su importación
+            n = self._n
+            self._vista = pd.DataFrame(
+                {nombre: columna.serie(n) for nombre, columna in self._columnas.items()},
+                copy=False,
+            )
+            self._vista_version = self.version
+        return self._vista
+
+    def fila(self, i):
+        """Fila ``i`` como dict de objetos de Python (fechas como ``datetime.date``)."""
+        return {nombre: columna.decodificar(columna.datos[i]) for nombre, columna in self._columnas.items()}
+
+
+# ====================================================================================
+# --- ALMACÉN DE LA CLÍNICA ---
+# ====================================================================================
+class AlmacenClinica:
+    """Agrupa las tablas de pacientes y citas y centraliza sus escrituras.
+
+    Con ``base_datos`` las escrituras van primero a SQLite y las tablas en memoria
+    se ponen al día leyendo solo las filas nuevas (incluidas las de otros procesos),
+    así que una misma instancia puede compartirse entre todas las sesiones.
+
+    Los suscriptores (índices, KPIs...) reciben ``(tabla, inicio, fin)`` tras
+    cada lote anexado mediante ``al_registrar_pacientes`` / ``al_agendar_citas``;
+    ``busqueda`` responde el typeahead de pacientes de las páginas.
+    ``reservar_cita`` rechaza empalmes; ``agendar_citas`` (semillas, importación)
+    anexa sin validar. Con ``auditoria`` (``sgc.auditoria.BitacoraAuditoria``)
+    cada alta y cada cita deja un registro por fila con su ``origen``.
+
+    ``consumo`` (``sgc.inventario.HistorialConsumo``, solo con base de datos)
+    guarda el consumo diario del inventario para el pronóstico.
+
+    ``versiones()`` da el contador de cada colección; ``memo`` guarda los
+    derivados (figuras, tablas...) y los recalcula solo cuando sus colecciones cambian.
+    """
+
+    def __init__(self, base_datos=None, capacidad=CAPACIDAD_INICIAL, auditoria=None):
+        self.base_datos = base_datos
+        self.auditoria = auditoria
+        self.pacientes = TablaColumnar(ESQUEMA_PACIENTES, capacidad)
+        self.citas = TablaColumnar(ESQUEMA_CITAS, capacidad)
+        self.inventario = {}
+        self.version_inventario = 0
+        self.consumo = HistorialConsumo(base_datos) if base_datos is not None else None
+        self.version_consumo = 0
+        self._lock = threading.RLock()
+        self._seq_pacientes = 0
+        self._seq_citas = 0
+        self._suscriptores = []
+        self.kpis = MotorKPI()
+        self.indices = IndicePacientes()
+        self.suscribir(self.kpis)
+        self.agenda = IndiceAgenda(self.indices)
+        self.suscribir(self.indices)
+        self.suscribir(self.agenda)
+        self.disponibilidad = MotorDisponibilidad(ESQUEMA_CITAS['Doctor'][1])
+        self.suscribir(self.disponibilidad)
+        self.portal = VistasPortal()
+        self.suscribir(self.portal)
+        self.libro = LibroMayor()
+        self.suscribir(self.libro)
+        self.ingresos = PronosticoIngresos()
+        self.suscribir(self.ingresos)
+        self.busqueda = IndiceBusqueda()
+        self.suscribir(self.busqueda)
+        self.memo = Memoizador(self.versiones)
+        self.sincronizar()
+
+    def suscribir(self, suscriptor):
+        self._suscriptores.append(suscriptor)
+
+    def _anexar_pacientes(self, pacientes):
+        inicio = self.pacientes.extender(pacientes)
+        for suscriptor in self._suscriptores:
+            suscriptor.al_registrar_pacientes(self.pacientes, inicio, len(self.pacientes))
+        return inicio
+
+    def _anexar_citas(self, citas):
+        inicio = self.citas.extender(citas)
+        for suscriptor in self._suscriptores:
+            suscriptor.al_agendar_citas(self.citas, inicio, len(self.citas))
+        return inicio
+
+    def sincronizar(self):
+        """Trae de la base de datos las filas que aún no están en memoria."""
+        if self.base_datos is None:
+            return
+        with self._lock:
+            pacientes, self._seq_pacientes = self.base_datos.leer_pacientes(self._seq_pacientes)
+            self._anexar_pacientes(pacientes)
+            citas, self._seq_citas = self.base_datos.leer_citas(self._seq_citas)
+            self._anexar_citas(citas)
+            inventario = self.base_datos.leer_inventario()
+            if inventario != self.inventario:
+                self.inventario = inventario
+                self.version_inventario += 1
+            self.version_consumo = self.consumo.version() # Consumo registrado por cualquier proceso
+
+    def registrar_pacientes(self, pacientes, origen='Sistema'):
+        """Registra un lote de pacientes; los que no traen ``ID`` reciben el siguiente."""
+        with self._lock:
+            if self.base_datos is not None:
+                ids = self.base_datos.insertar_pacientes(pacientes)
+                self.sincronizar()
+            else:
+                # Mismo criterio que ``BaseDatos.insertar_pacientes``: se saltan los ``P###`` ya ocupados
+                siguiente = len(self.pacientes) + 1
+                ocupados = {p['ID'] for p in pacientes if p.get('ID')}
+                asignados = []
+                for paciente in pacientes:
+                    if not paciente.get('ID'):
+                        while f"P{siguiente:03d}" in ocupados or self.indices.paciente(f"P{siguiente:03d}") is not None:
+                            siguiente += 1
+                        paciente = dict(paciente, ID=f"P{siguiente:03d}")
+                        ocupados.add(paciente['ID'])
+                    siguiente += 1
+                    asignados.append(paciente)
+                pacientes = asignados
+                ids = [p['ID'] for p in pacientes]
+                self._anexar_pacientes(pacientes)
+        self._auditar('alta_paciente', origen, [
+            (id_paciente, {'Fuente': p.get('Fuente'), 'Aviso_Privacidad': p.get('Aviso_Privacidad')})
+            for id_paciente, p in zip(ids, pacientes)
+        ])
+
+    def agendar_citas(self, citas, origen='Sistema'):
+        with self._lock:
+            if self.base_datos is not None:
+                self.base_datos.insertar_citas(citas)
+                self.sincronizar()
+            else:
+                self._anexar_citas(citas)
+        self._auditar('cita_agendada', origen, [
+            (c.get('ID Paciente'), {k: c.get(k) for k in ('Doctor', 'Fecha', 'Hora', 'Estado', 'Servicio')})
+            for c in citas
+        ])
+
+    def reservar_cita(self, cita, origen='Sistema'):
+        """Agenda ``cita`` solo si su doctor está libre; si no, lanza ``ConflictoAgenda``."""
+        with self._lock:
+            self.sincronizar() # Citas que otros procesos hayan agendado
+            self.disponibilidad.validar(cita)
+            self.agendar_citas([cita], origen)
+
+    def registrar_paciente(self, paciente, origen='Sistema'):
+        self.registrar_pacientes([paciente], origen)
+
+    def agendar_cita(self, cita, origen='Sistema'):
+        self.agendar_citas([cita], origen)
+
+    def _auditar(self, accion, origen, filas):
+        """Encola un registro por ``(paciente, detalle)`` en la bitácora (no espera al disco)."""
+        if self.auditoria is not None:
+            self.auditoria.registrar_lote([(accion, paciente, origen, detalle) for paciente, detalle in filas])
+
+    def guardar_inventario(self, inventario):
+        with self._lock:
+            if self.base_datos is not None:
+                self.base_datos.guardar_inventario(inventario)
+            self.inventario.update(inventario)
+            self.version_inventario += 1
+
+    def versiones(self):
+        """Versión de cada colección (sube con cada cambio)."""
+        return {'pacientes': self.pacientes.version, 'citas': self.citas.version, 'inventario': self.version_inventario,
+                'consumo': self.version_consumo}
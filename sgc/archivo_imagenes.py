@@ -0,0 +1,222 @@
+"""Archivo de imágenes clínicas direccionado por contenido (SHA-256).
+
+Las imágenes se anexan a archivos ``pack-NNNNN.bin`` que nunca se reescriben;
+cada registro es una cabecera (``SGCI``, largo, hash) seguida de los bytes.
+El índice ``hash -> (pack, desplazamiento, largo)`` vive en SQLite junto con la
+relación paciente-imagen, y las lecturas usan ``mmap``: abrir el expediente de
+un paciente solo toca las miniaturas de la página visible, nunca los originales.
+
+Los bytes se copian y se hashean primero a un temporal, sin candados. Luego
+una transacción ``BEGIN IMMEDIATE`` corta reserva el hueco al final del pack
+y registra la imagen como ``pendiente`` (varios procesos pueden anexar sin
+pisarse, y una segunda subida de la misma imagen ve la reserva y espera en
+vez de copiarla otra vez); la copia al hueco y el ``fsync`` ocurren fuera de
+la transacción y una segunda transacción corta la confirma. Una subida grande
+nunca retiene el candado de escritura de la base de la clínica.
+"""
+import datetime
+import hashlib
+import io
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+CARPETA_POR_DEFECTO = os.environ.get('SGC_IMAGENES', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'imagenes'))
+TAMANO_PACK = 256 << 20 # Al superar este tamaño se abre el siguiente pack
+BLOQUE = 1 << 20
+MAGIA = b'SGCI'
+CABECERA = struct.Struct('<4sQ32s') # magia, largo, sha256
+RESERVA_VENCIDA = datetime.timedelta(minutes=5) # Una reserva pendiente más vieja se da por abandonada
+ESPERA_RESERVA = 0.05 # Segundos entre consultas mientras otro proceso copia la misma imagen
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS imagenes (
+    hash TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    desplazamiento INTEGER NOT NULL,
+    largo INTEGER NOT NULL,
+    miniatura TEXT,
+    creado TEXT NOT NULL,
+    pendiente INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imagenes_paciente (
+    id_paciente TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    PRIMARY KEY (id_paciente, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_imagenes_paciente_creado ON imagenes_paciente (id_paciente, creado);
+"""
+
+SQL_UBICACION = "SELECT pack, desplazamiento, largo FROM imagenes WHERE hash = ? AND NOT pendiente"
+SQL_RESERVA = "SELECT pendiente, creado FROM imagenes WHERE hash = ?"
+SQL_ULTIMO_PACK = "SELECT COALESCE(MAX(pack), 0) FROM imagenes"
+SQL_RESERVAR = """
+INSERT OR REPLACE INTO imagenes (hash, pack, desplazamiento, largo, creado, pendiente) VALUES (?, ?, ?, ?, ?, 1)
+"""
+SQL_CONFIRMAR = "UPDATE imagenes SET pendiente = 0, creado = ? WHERE hash = ? AND pack = ? AND desplazamiento = ? AND pendiente"
+SQL_CANCELAR = "DELETE FROM imagenes WHERE hash = ? AND pack = ? AND desplazamiento = ? AND pendiente"
+SQL_MINIATURA = "UPDATE imagenes SET miniatura = ? WHERE hash = ?"
+SQL_VINCULAR = "INSERT OR IGNORE INTO imagenes_paciente (id_paciente, hash, creado) VALUES (?, ?, ?)"
+SQL_CONTAR_PACIENTE = "SELECT COUNT(*) FROM imagenes_paciente WHERE id_paciente = ?"
+SQL_PAGINA_PACIENTE = """
+SELECT ip.hash, i.miniatura, i.largo, ip.creado
+FROM imagenes_paciente ip JOIN imagenes i ON i.hash = ip.hash AND NOT i.pendiente
+WHERE ip.id_paciente = ? ORDER BY ip.creado DESC, ip.hash LIMIT ? OFFSET ?
+"""
+
+
+def _ahora():
+    return datetime.datetime.now().isoformat(timespec='microseconds')
+
+
+def leer_ubicacion(ubicacion):
+    """Bytes de ``(ruta_pack, desplazamiento, largo)``; sirve en otros procesos sin el índice."""
+    ruta, desplazamiento, largo = ubicacion
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        return mapa[desplazamiento:desplazamiento + largo]
+
+
+class ArchivoImagenes:
+    """Packs de solo-anexar con índice en SQLite y lecturas por ``mmap``."""
+
+    def __init__(self, base_datos, carpeta=CARPETA_POR_DEFECTO, tamano_pack=TAMANO_PACK):
+        self.pool = base_datos.pool
+        self.carpeta = carpeta
+        self.tamano_pack = tamano_pack
+        os.makedirs(carpeta, exist_ok=True)
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+            if 'pendiente' not in {fila[1] for fila in conexion.execute("PRAGMA table_info(imagenes)")}:
+                conexion.execute("ALTER TABLE imagenes ADD COLUMN pendiente INTEGER NOT NULL DEFAULT 0") # Índices anteriores
+        self._mapas = {} # pack -> mmap (se vuelve a mapear si el pack creció)
+        self._reemplazados = [] # Mapas de un pack que creció: otro hilo puede seguir leyendo de ellos
+        self._lock = threading.Lock()
+
+    def ruta_pack(self, pack):
+        return os.path.join(self.carpeta, f"pack-{pack:05d}.bin")
+
+    # --- Escritura ---
+    def agregar(self, archivo):
+        """Anexa el contenido de ``archivo`` (objeto con ``read``) y devuelve su hash.
+
+        Si la imagen ya estaba archivada (o la está archivando otro proceso,
+        en cuyo caso se espera a que la confirme) no se escribe nada en el
+        pack. Un proceso que muera entre la reserva y la confirmación deja un
+        hueco en ceros (magia vacía) y una reserva pendiente que la siguiente
+        subida de esa imagen reemplaza pasado ``RESERVA_VENCIDA``.
+        """
+        with tempfile.TemporaryFile(dir=self.carpeta) as temporal:
+            digesto, largo = hashlib.sha256(), 0
+            while bloque := archivo.read(BLOQUE):
+                digesto.update(bloque)
+                temporal.write(bloque)
+                largo += len(bloque)
+            hash_imagen = digesto.hexdigest()
+            reserva = self._reservar(hash_imagen, largo)
+            if reserva is None:
+                return hash_imagen
+            ruta, pack, inicio = reserva
+            try:
+                with open(ruta, 'r+b') as f:
+                    f.seek(inicio + CABECERA.size)
+                    temporal.seek(0)
+                    while bloque := temporal.read(BLOQUE):
+                        f.write(bloque)
+                    f.seek(inicio)
+                    f.write(CABECERA.pack(MAGIA, largo, digesto.digest()))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                with self.pool.transaccion() as conexion: # El hueco queda sin referencia
+                    conexion.execute(SQL_CANCELAR, (hash_imagen, pack, inicio + CABECERA.size))
+                raise
+        with self.pool.transaccion() as conexion:
+            conexion.execute(SQL_CONFIRMAR, (_ahora(), hash_imagen, pack, inicio + CABECERA.size))
+        return hash_imagen
+
+    def _reservar(self, hash_imagen, largo):
+        """Reserva el hueco y registra la imagen como pendiente; ``(ruta, pack, inicio)``.
+
+        ``None`` si la imagen ya está archivada; si otro proceso la está
+        copiando, espera a que la confirme (o a que su reserva venza).
+        """
+        while True:
+            if self.ubicacion(hash_imagen) is not None:
+                return None
+            # Lo único que pasa bajo el candado de escritura
+            with self.pool.transaccion() as conexion:
+                fila = conexion.execute(SQL_RESERVA, (hash_imagen,)).fetchone()
+                if fila is not None and not fila[0]:
+                    return None
+                vencida = (datetime.datetime.now() - RESERVA_VENCIDA).isoformat(timespec='microseconds')
+                if fila is None or fila[1] < vencida:
+                    pack = conexion.execute(SQL_ULTIMO_PACK).fetchone()[0]
+                    ruta = self.ruta_pack(pack)
+                    if os.path.exists(ruta) and os.path.getsize(ruta) >= self.tamano_pack:
+                        pack += 1
+                        ruta = self.ruta_pack(pack)
+                    with open(ruta, 'r+b' if os.path.exists(ruta) else 'w+b') as f:
+                        inicio = f.seek(0, os.SEEK_END)
+                        f.truncate(inicio + CABECERA.size + largo)
+                    conexion.execute(SQL_RESERVAR, (hash_imagen, pack, inicio + CABECERA.size, largo, _ahora()))
+                    return ruta, pack, inicio
+            time.sleep(ESPERA_RESERVA) # Otro proceso la está copiando
+
+    def agregar_bytes(self, datos):
+        return self.agregar(io.BytesIO(datos))
+
+    def asignar_miniatura(self, hash_imagen, hash_miniatura):
+        with self.pool.transaccion() as conexion:
+            conexion.execute(SQL_MINIATURA, (hash_miniatura, hash_imagen))
+
+    def vincular(self, id_paciente, hash_imagen):
+        with self.pool.transaccion() as conexion:
+            conexion.execute(SQL_VINCULAR, (id_paciente, hash_imagen, _ahora()))
+
+    # --- Lectura ---
+    def ubicacion(self, hash_imagen):
+        """``(ruta_pack, desplazamiento, largo)`` o ``None`` si no está archivada."""
+        with self.pool.conexion() as conexion:
+            fila = conexion.execute(SQL_UBICACION, (hash_imagen,)).fetchone()
+        return (self.ruta_pack(fila[0]), fila[1], fila[2]) if fila else None
+
+    def _mapa(self, pack, hasta):
+        with self._lock:
+            mapa = self._mapas.get(pack)
+            if mapa is None or len(mapa) < hasta:
+                if mapa is not None: # No se cierra aún: otro hilo puede estar leyendo de él
+                    self._reemplazados.append(mapa)
+                with open(self.ruta_pack(pack), 'rb') as f:
+                    mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mapas[pack] = mapa
+            return mapa
+
+    def leer(self, hash_imagen):
+        """Bytes de una imagen (solo se copia esa imagen, no el pack)."""
+        with self.pool.conexion() as conexion:
+            fila = conexion.execute(SQL_UBICACION, (hash_imagen,)).fetchone()
+        if fila is None:
+            raise KeyError(hash_imagen)
+        pack, desplazamiento, largo = fila
+        return self._mapa(pack, desplazamiento + largo)[desplazamiento:desplazamiento + largo]
+
+    def contar_paciente(self, id_paciente):
+        with self.pool.conexion() as conexion:
+            return conexion.execute(SQL_CONTAR_PACIENTE, (id_paciente,)).fetchone()[0]
+
+    def pagina_paciente(self, id_paciente, pagina=1, tamano=12):
+        """Metadatos (sin bytes) de una página de imágenes del paciente, más recientes primero."""
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(SQL_PAGINA_PACIENTE, (id_paciente, tamano, (pagina - 1) * tamano)).fetchall()
+        return [{'hash': h, 'miniatura': m, 'largo': largo, 'creado': creado} for h, m, largo, creado in filas]
+
+    def cerrar(self):
+        with self._lock:
+            for mapa in [*self._mapas.values(), *self._reemplazados]:
+                mapa.close()
+            self._mapas.clear()
+            self._reemplazados.clear()
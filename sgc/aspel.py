@@ -0,0 +1,285 @@
+"""Sincronización de cobros con Aspel mediante una bandeja de salida (outbox).
+
+Cada cobro se guarda primero en la tabla ``aspel_outbox`` de SQLite con una clave
+de idempotencia única. El sincronizador reclama lotes pendientes, los envía en
+paralelo y marca el folio recibido; si un lote falla vuelve a quedar pendiente y
+el reintento reutiliza la misma clave, así que Aspel nunca factura dos veces.
+Los montos sincronizado/pendiente se calculan a partir de la bandeja.
+"""
+import concurrent.futures
+import datetime
+import hashlib
+import json
+import threading
+import urllib.error
+import urllib.request
+import uuid
+
+PENDIENTE = "Pendiente"
+ENVIANDO = "Enviando"
+SINCRONIZADA = "Sincronizada"
+ERROR = "Error"
+
+
+class ErrorAspel(Exception):
+    """Aspel rechazó o no respondió el lote (se puede reintentar)."""
+
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS aspel_outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    clave_idempotencia TEXT NOT NULL UNIQUE,
+    id_paciente TEXT,
+    paciente TEXT,
+    concepto TEXT,
+    monto REAL NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'Pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    folio TEXT,
+    error TEXT,
+    creado TEXT NOT NULL,
+    actualizado TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_aspel_estado ON aspel_outbox (estado, seq);
+CREATE INDEX IF NOT EXISTS ix_aspel_paciente ON aspel_outbox (id_paciente, seq);
+"""
+
+SQL_INSERTAR = """
+INSERT OR IGNORE INTO aspel_outbox
+    (clave_idempotencia, id_paciente, paciente, concepto, monto, estado, folio, creado, actualizado)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_CANDIDATAS = """
+SELECT seq, clave_idempotencia, id_paciente, paciente, concepto, monto FROM aspel_outbox
+WHERE estado = 'Pendiente' OR (estado = 'Enviando' AND actualizado < ?)
+ORDER BY seq LIMIT ?
+"""
+SQL_RECLAMAR = "UPDATE aspel_outbox SET estado = 'Enviando', actualizado = ? WHERE seq = ?"
+SQL_MARCAR_SINCRONIZADA = "UPDATE aspel_outbox SET estado = 'Sincronizada', folio = ?, error = NULL, intentos = intentos + 1, actualizado = ? WHERE clave_idempotencia = ?"
+SQL_MARCAR_FALLIDA = """
+UPDATE aspel_outbox
+SET intentos = intentos + 1, error = ?, actualizado = ?,
+    estado = CASE WHEN intentos + 1 >= ? THEN 'Error' ELSE 'Pendiente' END
+WHERE clave_idempotencia = ?
+"""
+SQL_CONTIENE = "SELECT 1 FROM aspel_outbox WHERE clave_idempotencia = ?"
+SQL_TOTALES = "SELECT estado, COUNT(*), COALESCE(SUM(monto), 0) FROM aspel_outbox GROUP BY estado"
+SQL_TOTALES_PACIENTE = "SELECT estado, COUNT(*), COALESCE(SUM(monto), 0) FROM aspel_outbox WHERE id_paciente = ? GROUP BY estado"
+SQL_FACTURAS_PACIENTE = """
+SELECT creado, concepto, monto, estado, folio FROM aspel_outbox
+WHERE id_paciente = ? ORDER BY seq DESC LIMIT ?
+"""
+SQL_RECIENTES = """
+SELECT seq, paciente, concepto, monto, estado, intentos, folio, error, creado
+FROM aspel_outbox ORDER BY seq DESC LIMIT ?
+"""
+
+# Un lote "Enviando" más viejo que esto se considera abandonado y se reclama de nuevo
+RECLAMO_VENCIDO = datetime.timedelta(minutes=5)
+
+
+def _ahora():
+    return datetime.datetime.now().isoformat(timespec='microseconds')
+
+
+def nueva_clave():
+    """Clave de idempotencia para un cobro nuevo."""
+    return uuid.uuid4().hex
+
+
+def clave_cobro(id_paciente, monto, concepto, nonce):
+    """Clave de idempotencia derivada del cobro capturado.
+
+    ``nonce`` identifica la captura (cambia solo cuando cambian los datos del
+    formulario): repetir el envío de la misma captura da la misma clave.
+    """
+    datos = json.dumps([id_paciente, round(float(monto), 2), concepto, nonce], ensure_ascii=False)
+    return hashlib.sha256(datos.encode('utf-8')).hexdigest()
+
+
+# ====================================================================================
+# --- CLIENTE HTTP ---
+# ====================================================================================
+class ClienteAspelHTTP:
+    """Envía lotes de facturas a ``POST /facturas/lote`` (API real o ``sgc.stub_aspel``)."""
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url
+        self.timeout = timeout
+
+    def facturar_lote(self, facturas):
+        cuerpo = json.dumps({'facturas': facturas}).encode('utf-8')
+        solicitud = urllib.request.Request(self.url, data=cuerpo, method='POST', headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(solicitud, timeout=self.timeout) as respuesta:
+                return json.loads(respuesta.read())['resultados']
+        except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+            raise ErrorAspel(str(e)) from e
+
+
+# ====================================================================================
+# --- BANDEJA DE SALIDA ---
+# ====================================================================================
+class BandejaAspel:
+    """Cobros por facturar, persistidos en SQLite junto con el resto de la clínica."""
+
+    def __init__(self, base_datos, max_intentos=5):
+        self.pool = base_datos.pool
+        self.max_intentos = max_intentos
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+
+    def registrar_cobros(self, cobros, estado=PENDIENTE):
+        """Agrega cobros (dicts con ``clave_idempotencia``, ``paciente``, ``monto``...).
+
+        Un cobro con una clave ya registrada se ignora, por lo que reenviar el mismo
+        formulario no duplica la factura.
+        """
+        ahora = _ahora()
+        filas = [
+            (c.get('clave_idempotencia') or nueva_clave(), c.get('id_paciente'), c.get('paciente'),
+             c.get('concepto'), float(c['monto']), estado, c.get('folio'), ahora, ahora)
+            for c in cobros
+        ]
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_INSERTAR, filas)
+        return [fila[0] for fila in filas]
+
+    def registrar_cobro(self, paciente, monto, concepto, id_paciente=None, clave_idempotencia=None):
+        return self.registrar_cobros([{
+            'clave_idempotencia': clave_idempotencia, 'id_paciente': id_paciente,
+            'paciente': paciente, 'concepto': concepto, 'monto': monto,
+        }])[0]
+
+    def contiene(self, clave_idempotencia):
+        with self.pool.conexion() as conexion:
+            return conexion.execute(SQL_CONTIENE, (clave_idempotencia,)).fetchone() is not None
+
+    def reclamar_lote(self, tamano):
+        """Marca hasta ``tamano`` cobros como "Enviando" y los devuelve como facturas."""
+        ahora = _ahora()
+        vencido = (datetime.datetime.now() - RECLAMO_VENCIDO).isoformat(timespec='microseconds')
+        with self.pool.transaccion() as conexion:
+            filas = conexion.execute(SQL_CANDIDATAS, (vencido, tamano)).fetchall()
+            conexion.executemany(SQL_RECLAMAR, [(ahora, fila[0]) for fila in filas])
+        return [
+            {'clave_idempotencia': clave, 'id_paciente': id_paciente, 'cliente': paciente, 'concepto': concepto, 'monto': monto}
+            for _, clave, id_paciente, paciente, concepto, monto in filas
+        ]
+
+    def marcar_sincronizadas(self, resultados):
+        ahora = _ahora()
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_MARCAR_SINCRONIZADA, [(r['folio'], ahora, r['clave_idempotencia']) for r in resultados])
+
+    def marcar_fallidas(self, claves, error):
+        ahora = _ahora()
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_MARCAR_FALLIDA, [(error, ahora, self.max_intentos, clave) for clave in claves])
+
+    def totales(self, id_paciente=None):
+        """``{estado: (cantidad, monto)}`` más los agregados ``sincronizado`` y ``pendiente``.
+
+        Con ``id_paciente``, solo los cobros de ese paciente (por índice).
+        """
+        with self.pool.conexion() as conexion:
+            if id_paciente is None:
+                filas = conexion.execute(SQL_TOTALES)
+            else:
+                filas = conexion.execute(SQL_TOTALES_PACIENTE, (id_paciente,))
+            por_estado = {estado: (n, monto) for estado, n, monto in filas}
+        return {
+            'por_estado': por_estado,
+            'sincronizado': por_estado.get(SINCRONIZADA, (0, 0.0))[1],
+            'pendiente': sum(por_estado.get(e, (0, 0.0))[1] for e in (PENDIENTE, ENVIANDO, ERROR)),
+        }
+
+    def facturas_paciente(self, id_paciente, limite=50):
+        """Últimos cobros del paciente (fecha, concepto, monto, estado, folio), leídos por índice."""
+        columnas = ['Fecha', 'Concepto', 'Monto', 'Estado', 'Folio']
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(SQL_FACTURAS_PACIENTE, (id_paciente, limite)).fetchall()
+        return [dict(zip(columnas, fila)) for fila in filas]
+
+    def recientes(self, limite=20):
+        columnas = ['#', 'Paciente', 'Concepto', 'Monto', 'Estado', 'Intentos', 'Folio', 'Error', 'Creado']
+        with self.pool.conexion() as conexion:
+            return [dict(zip(columnas, fila)) for fila in conexion.execute(SQL_RECIENTES, (limite,))]
+
+
+# ====================================================================================
+# --- SINCRONIZADOR ---
+# ====================================================================================
+class SincronizadorAspel:
+    """Vacía la bandeja en lotes de ``tamano_lote`` con ``trabajadores`` envíos en paralelo."""
+
+    def __init__(self, bandeja, cliente, tamano_lote=50, trabajadores=4, auditoria=None):
+        self.bandeja = bandeja
+        self.cliente = cliente
+        self.auditoria = auditoria
+        self.tamano_lote = tamano_lote
+        self.trabajadores = trabajadores
+        self._en_curso = threading.Lock()
+        self.ultimo_resumen = None
+
+    def _enviar(self, lote):
+        try:
+            resultados = self.cliente.facturar_lote(lote)
+        except ErrorAspel as e:
+            self.bandeja.marcar_fallidas([f['clave_idempotencia'] for f in lote], str(e))
+            self._auditar('factura_fallida', lote, {}, error=str(e))
+            return 0, len(lote), 0
+        self.bandeja.marcar_sincronizadas(resultados)
+        self._auditar('factura_sincronizada', lote, {r['clave_idempotencia']: r['folio'] for r in resultados})
+        return len(resultados), 0, sum(r.get('duplicada', False) for r in resultados)
+
+    def _auditar(self, accion, lote, folios, **detalle):
+        if self.auditoria is not None:
+            self.auditoria.registrar_lote([
+                (accion, f['id_paciente'], 'Aspel', dict(detalle, clave=f['clave_idempotencia'], monto=f['monto'],
+                                                         folio=folios.get(f['clave_idempotencia'])))
+                for f in lote
+            ])
+
+    def sincronizar(self, tamano_lote=None):
+        """Procesa la bandeja hasta vaciarla o hasta el primer lote fallido. Devuelve un resumen."""
+        tamano_lote = tamano_lote or self.tamano_lote
+        resumen = {'lotes': 0, 'sincronizadas': 0, 'fallidas': 0, 'duplicadas': 0}
+        with concurrent.futures.ThreadPoolExecutor(self.trabajadores, thread_name_prefix='aspel') as pool:
+            while True:
+                # Se reclaman tantos lotes como trabajadores y se espera a la ronda completa
+                lotes = []
+                while len(lotes) < self.trabajadores:
+                    lote = self.bandeja.reclamar_lote(tamano_lote)
+                    if not lote:
+                        break
+                    lotes.append(lote)
+                if not lotes:
+                    break
+                for sincronizadas, fallidas, duplicadas in pool.map(self._enviar, lotes):
+                    resumen['sincronizadas'] += sincronizadas
+                    resumen['fallidas'] += fallidas
+                    resumen['duplicadas'] += duplicadas
+                resumen['lotes'] += len(lotes)
+                if resumen['fallidas']:
+                    break # Lo fallido espera al siguiente ciclo (no se reintenta en caliente)
+        self.ultimo_resumen = resumen
+        return resumen
+
+    @property
+    def en_curso(self):
+        return self._en_curso.locked()
+
+    def sincronizar_en_segundo_plano(self, tamano_lote=None):
+        """Lanza ``sincronizar`` en un hilo si no hay otra sincronización corriendo."""
+        if not self._en_curso.acquire(blocking=False):
+            return False
+
+        def _correr():
+            try:
+                self.sincronizar(tamano_lote)
+            finally:
+                self._en_curso.release()
+
+        threading.Thread(target=_correr, name='aspel-sync', daemon=True).start()
+        return True
@@ -0,0 +1,307 @@
+"""Bitácora de auditoría (NOM-004): registros encadenados por hash en segmentos de solo-anexar.
+
+Cada mutación (alta de paciente, cita, cobro enviado a Aspel) y cada consulta
+de un expediente deja un registro JSON. ``registrar`` solo encola y regresa;
+un hilo escritor junta todo lo que llegó mientras escribía el grupo anterior
+(group commit) y lo anexa a ``seg-NNNNN.log`` como marcos, con un solo
+``fsync`` por grupo.
+
+Cada marco lleva el hash del marco anterior y el propio,
+``sha256(anterior + cabecera + registros)``, así que alterar, quitar o
+reordenar cualquier registro rompe la cadena desde ese punto. ``verificar``
+recorre los segmentos por ``mmap`` rehaciendo el hash de marcos completos
+(bloques grandes: va a la velocidad de lectura del disco).
+
+La punta de la cadena (último ``seq``, hash, segmento y fin) y el índice
+paciente -> registro viven en ``indice.db``, una base SQLite propia junto a
+los segmentos (el ``fsync`` de la bitácora nunca retiene el candado de
+escritura de la base de la clínica). Se actualizan en la misma transacción
+``BEGIN IMMEDIATE`` que protege la escritura del marco, así que varios
+procesos pueden auditar sobre los mismos segmentos. Lo escrito después de la
+punta (un escritor que murió antes de confirmar) se recorta al anexar.
+
+Un grupo que no se pudo escribir tras ``INTENTOS_ERROR`` intentos (o por un
+error que no es de disco) se cuenta en ``estadisticas['perdidos']`` y el
+motivo queda en ``error``; el escritor sigue con lo siguiente y ``vaciar``
+regresa ``False`` en vez de esperar para siempre.
+"""
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+
+from sgc.persistencia import PoolConexiones
+
+CARPETA_POR_DEFECTO = os.environ.get('SGC_AUDITORIA', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'auditoria'))
+TAMANO_SEGMENTO = 64 << 20 # Al superar este tamaño se abre el siguiente segmento
+REGISTROS_MARCO = 4096 # Máximo de registros por marco (un grupo grande se parte en varios)
+MAGIA = b'SGCA'
+CABECERA = struct.Struct('<4sQII32s32s') # magia, primer seq, registros, largo, hash anterior, hash
+CAMPOS = struct.Struct('<QII') # La parte de la cabecera que entra al hash
+GENESIS = bytes(32)
+ESPERA_ERROR = 1.0 # Segundos antes de reintentar un grupo que no se pudo escribir
+INTENTOS_ERROR = 5 # Después de estos intentos el grupo se da por perdido (y queda en ``error``)
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS auditoria_punta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    seq INTEGER NOT NULL,
+    hash BLOB NOT NULL,
+    segmento INTEGER NOT NULL,
+    fin INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO auditoria_punta (id, seq, hash, segmento, fin) VALUES (0, 0, zeroblob(32), 0, 0);
+CREATE TABLE IF NOT EXISTS auditoria_paciente (
+    id_paciente TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    segmento INTEGER NOT NULL,
+    desplazamiento INTEGER NOT NULL,
+    largo INTEGER NOT NULL,
+    PRIMARY KEY (id_paciente, seq)
+) WITHOUT ROWID;
+"""
+
+SQL_PUNTA = "SELECT seq, hash, segmento, fin FROM auditoria_punta WHERE id = 0"
+SQL_AVANZAR = "UPDATE auditoria_punta SET seq = ?, hash = ?, segmento = ?, fin = ? WHERE id = 0"
+SQL_INDEXAR = "INSERT OR REPLACE INTO auditoria_paciente (id_paciente, seq, segmento, desplazamiento, largo) VALUES (?, ?, ?, ?, ?)"
+SQL_REGISTROS_PACIENTE = """
+SELECT segmento, desplazamiento, largo FROM auditoria_paciente
+WHERE id_paciente = ? ORDER BY seq DESC LIMIT ?
+"""
+SQL_CONTAR_PACIENTE = "SELECT COUNT(*) FROM auditoria_paciente WHERE id_paciente = ?"
+
+
+def _ahora():
+    return datetime.datetime.now().isoformat(timespec='microseconds')
+
+
+def _json(registro):
+    return json.dumps(registro, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+
+
+class ErrorIntegridad(Exception):
+    """La cadena de hashes de la bitácora no cuadra (registro alterado, faltante o fuera de orden)."""
+
+
+class BitacoraAuditoria:
+    """Cola en memoria, escritor con group commit y lecturas por paciente y de verificación."""
+
+    def __init__(self, carpeta=CARPETA_POR_DEFECTO, tamano_segmento=TAMANO_SEGMENTO,
+                 registros_marco=REGISTROS_MARCO, agrupar=True):
+        self.carpeta = carpeta
+        self.tamano_segmento = tamano_segmento
+        self.registros_marco = registros_marco
+        self.agrupar = agrupar
+        os.makedirs(carpeta, exist_ok=True)
+        self.pool = PoolConexiones(os.path.join(carpeta, 'indice.db'), tamano=2)
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+        self.estadisticas = {'grupos': 0, 'marcos': 0, 'registros': 0, 'perdidos': 0}
+        self.error = None
+        self._cola = queue.SimpleQueue()
+        self._encolados = 0
+        self._escritos = 0
+        self._condicion = threading.Condition()
+        self._hilo = threading.Thread(target=self._escribir_siempre, name='auditoria', daemon=True)
+        self._hilo.start()
+
+    def ruta_segmento(self, segmento):
+        return os.path.join(self.carpeta, f"seg-{segmento:05d}.log")
+
+    # --- Registro (no bloquea) ---
+    def registrar(self, accion, paciente=None, origen='Sistema', **detalle):
+        self.registrar_lote([(accion, paciente, origen, detalle)])
+
+    def registrar_lote(self, registros):
+        """Encola ``(accion, paciente, origen, detalle)`` con la hora actual y regresa de inmediato."""
+        if not registros:
+            return
+        ahora = _ahora()
+        with self._condicion:
+            self._encolados += len(registros)
+        self._cola.put((ahora, registros))
+
+    def vaciar(self, timeout=None):
+        """Espera a que el escritor procese lo encolado hasta ahora. ``False`` si venció ``timeout`` o hubo un error."""
+        with self._condicion:
+            meta = self._encolados
+            return self._condicion.wait_for(lambda: self._escritos >= meta, timeout) and self.error is None
+
+    def pendientes(self):
+        with self._condicion:
+            return self._encolados - self._escritos
+
+    def cerrar(self, timeout=None):
+        """Espera lo pendiente y cierra las conexiones del índice."""
+        self.vaciar(timeout)
+        self.pool.cerrar()
+
+    # --- Escritor (un hilo) ---
+    def _escribir_siempre(self):
+        while True:
+            grupo = [self._cola.get()]
+            while self.agrupar: # Lo que llegó durante la escritura anterior va en este mismo grupo
+                try:
+                    grupo.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            total = sum(len(lote) for _, lote in grupo)
+            if not self._escribir_grupo(grupo):
+                self.estadisticas['perdidos'] += total
+            with self._condicion: # Aun si falló: quien espera en ``vaciar`` despierta y ve ``error``
+                self._escritos += total
+                self._condicion.notify_all()
+
+    def _escribir_grupo(self, grupo):
+        """Escribe el grupo reintentando los errores de disco; ``False`` si se perdió (el motivo queda en ``error``)."""
+        for intento in range(INTENTOS_ERROR):
+            try:
+                self._escribir([(ahora, *r) for ahora, lote in grupo for r in lote])
+            except (OSError, sqlite3.Error) as e: # Disco lleno, permisos...: se reintenta el mismo grupo
+                self.error = f"{type(e).__name__}: {e}"
+                if intento + 1 < INTENTOS_ERROR:
+                    time.sleep(ESPERA_ERROR)
+            except Exception as e: # Un error de programación no se arregla reintentando
+                self.error = f"{type(e).__name__}: {e}"
+                return False
+            else:
+                if not self.estadisticas['perdidos']: # Si ya se perdió algo, el error sigue a la vista
+                    self.error = None
+                return True
+        return False
+
+    def _escribir(self, registros):
+        """Anexa ``registros`` como marcos encadenados; un ``fsync`` por segmento tocado."""
+        with self.pool.transaccion() as conexion:
+            seq, anterior, segmento, fin = conexion.execute(SQL_PUNTA).fetchone()
+            indice = []
+            marcos = 0
+            f = None
+            try:
+                for inicio in range(0, len(registros), self.registros_marco):
+                    if f is None or fin >= self.tamano_segmento:
+                        if f is not None:
+                            f.flush()
+                            os.fsync(f.fileno())
+                            f.close()
+                        if fin >= self.tamano_segmento:
+                            segmento, fin = segmento + 1, 0
+                        ruta = self.ruta_segmento(segmento)
+                        f = open(ruta, 'r+b' if os.path.exists(ruta) else 'w+b')
+                        f.truncate(fin) # Marcos sin confirmar de un escritor que murió
+                        f.seek(fin)
+                    lineas = []
+                    desplazamiento = fin + CABECERA.size
+                    primero = seq + 1
+                    for ahora, accion, paciente, origen, detalle in registros[inicio:inicio + self.registros_marco]:
+                        seq += 1
+                        linea = _json({'seq': seq, 'ts': ahora, 'accion': accion, 'origen': origen, 'paciente': paciente, 'detalle': detalle})
+                        if paciente is not None:
+                            indice.append((paciente, seq, segmento, desplazamiento, len(linea)))
+                        desplazamiento += len(linea)
+                        lineas.append(linea)
+                    cuerpo = b''.join(lineas)
+                    campos = CAMPOS.pack(primero, len(lineas), len(cuerpo))
+                    digesto = hashlib.sha256(anterior)
+                    digesto.update(campos)
+                    digesto.update(cuerpo)
+                    actual = digesto.digest()
+                    f.write(CABECERA.pack(MAGIA, primero, len(lineas), len(cuerpo), anterior, actual))
+                    f.write(cuerpo)
+                    anterior, fin = actual, desplazamiento
+                    marcos += 1
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if f is not None:
+                    f.close()
+            conexion.executemany(SQL_INDEXAR, indice)
+            conexion.execute(SQL_AVANZAR, (seq, anterior, segmento, fin))
+        self.estadisticas['grupos'] += 1
+        self.estadisticas['marcos'] += marcos
+        self.estadisticas['registros'] += len(registros)
+
+    # --- Lectura ---
+    def punta(self):
+        """``{'seq', 'hash', 'segmento', 'fin'}`` del último marco confirmado."""
+        with self.pool.conexion() as conexion:
+            seq, hash_punta, segmento, fin = conexion.execute(SQL_PUNTA).fetchone()
+        return {'seq': seq, 'hash': bytes(hash_punta), 'segmento': segmento, 'fin': fin}
+
+    def contar_paciente(self, id_paciente):
+        with self.pool.conexion() as conexion:
+            return conexion.execute(SQL_CONTAR_PACIENTE, (id_paciente,)).fetchone()[0]
+
+    def registros_paciente(self, id_paciente, limite=100):
+        """Registros que mencionan al paciente (solicitudes ARCO), el más reciente primero, por índice."""
+        with self.pool.conexion() as conexion:
+            ubicaciones = conexion.execute(SQL_REGISTROS_PACIENTE, (id_paciente, limite)).fetchall()
+        registros, archivos = [], {}
+        try:
+            for segmento, desplazamiento, largo in ubicaciones:
+                if segmento not in archivos:
+                    archivos[segmento] = os.open(self.ruta_segmento(segmento), os.O_RDONLY)
+                registros.append(json.loads(os.pread(archivos[segmento], largo, desplazamiento)))
+        finally:
+            for descriptor in archivos.values():
+                os.close(descriptor)
+        return registros
+
+    def verificar(self):
+        """Rehace la cadena completa hasta la punta. Devuelve un resumen; ``error`` es ``None`` si está íntegra."""
+        punta = self.punta()
+        resumen = {'marcos': 0, 'registros': 0, 'bytes': 0, 'segundos': 0.0, 'error': None}
+        t0 = time.perf_counter()
+        anterior, esperado = GENESIS, 1
+        try:
+            for segmento in range(punta['segmento'] + 1 if punta['seq'] else 0):
+                ruta = self.ruta_segmento(segmento)
+                if not os.path.exists(ruta):
+                    raise ErrorIntegridad(f"Falta el segmento {os.path.basename(ruta)}.")
+                anterior, esperado = self._verificar_segmento(
+                    ruta, punta['fin'] if segmento == punta['segmento'] else None, anterior, esperado, resumen)
+            if anterior != punta['hash'] or esperado != punta['seq'] + 1:
+                raise ErrorIntegridad(f"La cadena termina en el registro {esperado - 1}, pero la punta confirmada es el {punta['seq']}.")
+        except ErrorIntegridad as e:
+            resumen['error'] = str(e)
+        resumen['segundos'] = time.perf_counter() - t0
+        return resumen
+
+    @staticmethod
+    def _verificar_segmento(ruta, fin, anterior, esperado, resumen):
+        nombre = os.path.basename(ruta)
+        with open(ruta, 'rb') as f:
+            tamano = os.fstat(f.fileno()).st_size
+            fin = tamano if fin is None else fin
+            if tamano < fin:
+                raise ErrorIntegridad(f"{nombre} está truncado ({tamano} de {fin} bytes).")
+            if fin == 0:
+                return anterior, esperado
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa, memoryview(mapa) as vista:
+                posicion = 0
+                while posicion < fin:
+                    if posicion + CABECERA.size > fin:
+                        raise ErrorIntegridad(f"{nombre}: cabecera incompleta en el byte {posicion}.")
+                    magia, primero, n, largo, previo, guardado = CABECERA.unpack_from(vista, posicion)
+                    cuerpo = posicion + CABECERA.size
+                    if magia != MAGIA or cuerpo + largo > fin:
+                        raise ErrorIntegridad(f"{nombre}: marco ilegible en el byte {posicion}.")
+                    if primero != esperado or previo != anterior:
+                        raise ErrorIntegridad(f"{nombre}: la cadena se rompe en el registro {esperado} (byte {posicion}).")
+                    digesto = hashlib.sha256(anterior)
+                    digesto.update(CAMPOS.pack(primero, n, largo))
+                    digesto.update(vista[cuerpo:cuerpo + largo])
+                    if digesto.digest() != guardado:
+                        raise ErrorIntegridad(f"{nombre}: registros {primero}-{primero + n - 1} alterados (byte {posicion}).")
+                    anterior, esperado = guardado, esperado + n
+                    posicion = cuerpo + largo
+                    resumen['marcos'] += 1
+                    resumen['registros'] += n
+                    resumen['bytes'] += CABECERA.size + largo
+        return anterior, esperado
@@ -0,0 +1,156 @@
+"""Búsqueda de pacientes por nombre, teléfono o ID (typeahead).
+
+Cada paciente se indexa como un texto normalizado (sin acentos, minúsculas)
+``" ana garcia p001 5512345678 "`` y se guardan listas de filas por trigrama
+de ese texto (más los bigramas de inicio de palabra, ``" a"``):
+
+- términos de 3+ caracteres coinciden como subcadena (``"arci"`` encuentra a
+  García); los de 1-2, solo como inicio de palabra
+- los candidatos salen de la lista más corta entre los gramas de los
+  términos, filtrada por bloques contra las demás con NumPy, y se verifican
+  contra el texto
+- rango: ID exacto, luego pacientes con todos los términos como inicio de
+  palabra, luego por subcadena; dentro de cada nivel, el más antiguo primero,
+  así que cada nivel se recorre en orden y se corta al juntar ``k``
+
+El índice se pone al día como suscriptor del almacén, pero los trigramas de
+las filas nuevas se calculan en la siguiente búsqueda: registrar pacientes (o
+arrancar con un millón) no paga el índice si nadie busca.
+"""
+import array
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+RESULTADOS = 20
+MAX_CANDIDATOS = 20_000 # Filas que se verifican por nivel antes de cortar
+BLOQUE = 2_048 # Candidatos de la lista más corta que se filtran a la vez
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+_NO_DIGITO = re.compile(r'[^0-9]')
+
+
+def normalizar(texto):
+    """``'José  Núñez'`` -> ``'jose nunez'``: sin acentos, minúsculas, palabras separadas por un espacio."""
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return _NO_ALFANUMERICO.sub(' ', texto.lower()).strip()
+
+
+def _gramas(texto):
+    """Trigramas de ``texto``."""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusqueda:
+    """Trigramas de nombre, teléfono e ID de cada paciente, con resultados rankeados."""
+
+    def __init__(self):
+        self._pacientes = None
+        self._textos = [] # Fila -> texto normalizado con espacios en los extremos
+        self._por_id = {}
+        self._listas = {} # Grama -> array de filas (en orden de registro)
+        self._indexadas = 0
+        self._lock = threading.Lock()
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        self._pacientes = tabla
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        pass
+
+    def _ponerse_al_dia(self):
+        """Indexa las filas registradas desde la última búsqueda (con el candado tomado)."""
+        if self._pacientes is None:
+            return
+        fin = len(self._pacientes)
+        if self._indexadas >= fin:
+            return
+        inicio = self._indexadas
+        ids = self._pacientes.columna('ID')[inicio:fin].tolist()
+        nombres = self._pacientes.columna('Nombre')[inicio:fin].tolist()
+        telefonos = self._pacientes.columna('Telefono')[inicio:fin].tolist()
+        listas = self._listas
+        for fila, (id_paciente, nombre, telefono) in enumerate(zip(ids, nombres, telefonos), start=inicio):
+            texto = f" {normalizar(nombre)} {normalizar(id_paciente)} {_NO_DIGITO.sub('', telefono or '')} "
+            self._textos.append(texto)
+            self._por_id[id_paciente.lower()] = fila
+            for grama in _gramas(texto) | {texto[i:i + 2] for i in range(len(texto) - 1) if texto[i] == ' '}:
+                lista = listas.get(grama)
+                if lista is None:
+                    listas[grama] = lista = array.array('i')
+                try:
+                    lista.append(fila)
+                except BufferError: # Una vista de NumPy quedó viva (p. ej. tras una excepción)
+                    listas[grama] = lista = array.array('i', lista)
+                    lista.append(fila)
+        self._indexadas = fin
+
+    # --- Consultas ---
+    def _coincidencias(self, gramas, patrones, excluir, k):
+        """Hasta ``k`` filas (en orden de registro) cuyo texto contiene todos los ``patrones``.
+
+        Recorre por bloques la lista más corta de los ``gramas``; cada bloque se
+        filtra contra las demás listas (ordenadas) con ``searchsorted`` y las
+        filas que quedan se verifican contra el texto. Una consulta común
+        termina en el primer bloque; una muy selectiva no verifica casi nada.
+        """
+        listas = [self._listas.get(grama) for grama in gramas]
+        if any(lista is None for lista in listas):
+            return []
+        vistas = sorted((np.frombuffer(lista, dtype=np.int32) for lista in listas), key=len)
+        textos = self._textos
+        encontradas = []
+        verificadas = 0
+        for desde in range(0, len(vistas[0]), BLOQUE):
+            filas = vistas[0][desde:desde + BLOQUE]
+            for vista in vistas[1:]:
+                posiciones = np.minimum(np.searchsorted(vista, filas), len(vista) - 1)
+                filas = filas[vista[posiciones] == filas]
+                if not len(filas):
+                    break
+            for fila in filas.tolist():
+                if fila not in excluir and all(p in textos[fila] for p in patrones):
+                    encontradas.append(fila)
+                    if len(encontradas) == k:
+                        return encontradas
+            verificadas += len(filas)
+            if verificadas >= MAX_CANDIDATOS:
+                break
+        return encontradas
+
+    def buscar(self, consulta, k=RESULTADOS):
+        """Hasta ``k`` pacientes ``{'ID', 'Nombre', 'Telefono'}`` que coinciden con ``consulta``."""
+        consulta = normalizar(consulta)
+        terminos = consulta.split()
+        if not terminos:
+            return []
+        prefijos = [f" {t}" for t in terminos]
+        with self._lock:
+            self._ponerse_al_dia()
+            exacto = self._por_id.get(consulta.replace(' ', ''))
+            filas = [] if exacto is None else [exacto]
+            # 1) Todos los términos como inicio de palabra
+            gramas = set().union(*(_gramas(p) if len(p) >= 3 else {p} for p in prefijos))
+            filas += self._coincidencias(gramas, prefijos, set(filas), k - len(filas))
+            # 2) Subcadenas (solo términos de 3+ caracteres; los cortos siguen como prefijo)
+            if len(filas) < k and any(len(t) >= 3 for t in terminos):
+                patrones = [t if len(t) >= 3 else f" {t}" for t in terminos]
+                gramas = set().union(*(_gramas(p) if len(p) >= 3 else {p} for p in patrones))
+                filas += self._coincidencias(gramas, patrones, set(filas), k - len(filas))
+            return [self._resultado(fila) for fila in filas]
+
+    def _resultado(self, fila):
+        return {
+            'ID': self._pacientes.columna('ID')[fila],
+            'Nombre': self._pacientes.columna('Nombre')[fila],
+            'Telefono': self._pacientes.columna('Telefono')[fila],
+        }
+
+    def primeros(self, k=RESULTADOS):
+        """Los ``k`` primeros pacientes registrados (lista inicial antes de escribir)."""
+        if self._pacientes is None:
+            return []
+        return [self._resultado(fila) for fila in range(min(k, len(self._pacientes)))]
@@ -0,0 +1,105 @@
+"""Índice de agenda por (doctor, día) y caché de eventos de FullCalendar.
+
+La página solo pide los eventos del rango visible (día, semana o mes). Los
+eventos de cada día se construyen una vez y se guardan ya serializados; la caché
+de un día se invalida únicamente cuando se agenda una cita en ese día.
+"""
+import datetime
+import threading
+
+import numpy as np
+
+from sgc.kpis import dia_ordinal
+
+VISTAS = {
+    "Semana": "timeGridWeek",
+    "Mes": "dayGridMonth",
+    "Día": "timeGridDay",
+}
+
+COLOR_ESTADO = {'Confirmada': 'green', 'Pendiente': 'orange'} # El resto en rojo
+DURACION_CITA = datetime.timedelta(hours=1)
+
+
+def rango_visible(vista, fecha):
+    """Rango ``[inicio, fin)`` de fechas que muestra FullCalendar (semanas inician en domingo)."""
+    if vista == "Día":
+        return fecha, fecha + datetime.timedelta(days=1)
+    if vista == "Semana":
+        inicio = fecha - datetime.timedelta(days=(fecha.weekday() + 1) % 7)
+        return inicio, inicio + datetime.timedelta(days=7)
+    primero = fecha.replace(day=1)
+    inicio = primero - datetime.timedelta(days=(primero.weekday() + 1) % 7)
+    return inicio, inicio + datetime.timedelta(days=42) # Cuadrícula de 6 semanas
+
+
+class IndiceAgenda:
+    """Citas agrupadas por (doctor, día) con eventos serializados por día."""
+
+    def __init__(self, indice_pacientes):
+        self._indice_pacientes = indice_pacientes
+        self._citas = None
+        self._por_doctor_dia = {}
+        self._doctores = []
+        self._eventos_por_dia = {}
+        self._generacion_dia = {} # Evita guardar un lote construido antes de una cita nueva
+        self._lock = threading.Lock()
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        pass
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        self._citas = tabla
+        dias = tabla.columna('Fecha')[inicio:fin].astype(np.int64).tolist()
+        cat_doctor = tabla.categoria('Doctor')
+        doctores = [cat_doctor.categorias[c] for c in tabla.columna('Doctor')[inicio:fin].tolist()]
+        with self._lock:
+            for fila, (dia, doctor) in enumerate(zip(dias, doctores), start=inicio):
+                self._por_doctor_dia.setdefault((doctor, dia), []).append(fila)
+                if doctor not in self._doctores:
+                    self._doctores.append(doctor)
+                self._eventos_por_dia.pop(dia, None)
+                self._generacion_dia[dia] = self._generacion_dia.get(dia, 0) + 1
+
+    # --- Construcción de eventos ---
+    def _evento(self, cita):
+        hora, minuto = (int(x) for x in cita['Hora'].split(':'))
+        inicio = datetime.datetime.combine(cita['Fecha'], datetime.time(hora, minuto))
+        paciente_nombre = self._indice_pacientes.nombre(cita['ID Paciente'], "Paciente Chatbot")
+        return {
+            "title": f"Cita: {paciente_nombre} ({cita['Servicio']})",
+            "start": inicio.isoformat(),
+            "end": (inicio + DURACION_CITA).isoformat(),
+            "color": COLOR_ESTADO.get(cita['Estado'], 'red'),
+            "resourceId": cita['Doctor'],
+        }
+
+    def _eventos_dia(self, dia):
+        """(eventos, errores) de un día, desde la caché o construidos una sola vez."""
+        lote = self._eventos_por_dia.get(dia)
+        if lote is not None:
+            return lote
+        generacion = self._generacion_dia.get(dia, 0)
+        eventos, errores = [], []
+        for doctor in list(self._doctores):
+            for fila in self._por_doctor_dia.get((doctor, dia), ()):
+                cita = self._citas.fila(fila)
+                try:
+                    eventos.append(self._evento(cita))
+                except Exception as e:
+                    errores.append(f"No se pudo procesar la cita {cita['ID Paciente']}: {e}")
+        lote = (eventos, errores)
+        with self._lock:
+            if self._generacion_dia.get(dia, 0) == generacion:
+                self._eventos_por_dia[dia] = lote
+        return lote
+
+    def eventos(self, inicio, fin):
+        """Eventos y errores de las citas con fecha en ``[inicio, fin)``."""
+        eventos, errores = [], []
+        for dia in range(dia_ordinal(inicio), dia_ordinal(fin)):
+            eventos_dia, errores_dia = self._eventos_dia(dia)
+            eventos.extend(eventos_dia)
+            errores.extend(errores_dia)
+        return eventos, errores
@@ -0,0 +1,297 @@
+"""Importación y exportación masiva de pacientes y citas, por lotes.
+
+Importar: el archivo (CSV, Parquet o Excel) se lee en lotes de ``LOTE`` filas;
+cada lote se valida con operaciones vectorizadas sobre columnas (fechas,
+números, catálogos, IDs duplicados o inexistentes), se clasifica el riesgo de
+los pacientes con una expresión regular sobre toda la columna y las filas
+válidas se escriben con una sola transacción por lote. En memoria solo vive un
+lote a la vez (CSV y Parquet; Excel no se puede leer por partes).
+
+Exportar: los generadores ``exportar_csv`` / ``exportar_parquet`` codifican la
+vista de la tabla lote por lote, sin armar una segunda copia completa en texto.
+"""
+import datetime
+import io
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from sgc.persistencia import COLUMNAS_CITAS, COLUMNAS_PACIENTES
+
+LOTE = 50_000
+MAX_ERRORES = 200 # Rechazos que se detallan (el conteo incluye todos)
+FORMATOS = ('csv', 'parquet', 'xlsx')
+
+# Misma regla que el formulario de registro: estas condiciones implican riesgo alto
+PATRON_RIESGO_ALTO = re.compile(r'hipertensi|diabetes|penicilina', re.IGNORECASE)
+RIESGOS = ['Bajo', 'Medio', 'Alto']
+AVISOS = ['Firmado', 'Pendiente']
+ESTADOS = ['Confirmada', 'Pendiente', 'Completada', 'Cancelada']
+PATRON_HORA = r'^(?:[01]\d|2[0-3]):[0-5]\d$'
+COSTO_MINIMO = 100 # Lo mínimo que se puede cobrar en Aspel (paginas/gestion_interna)
+
+OBLIGATORIAS = {
+    'pacientes': ['Nombre', 'Costo'],
+    'citas': ['ID Paciente', 'Doctor', 'Fecha', 'Hora', 'Servicio'],
+}
+COLUMNAS = {
+    'pacientes': [nombre for nombre, _ in COLUMNAS_PACIENTES] + ['Alergias'],
+    'citas': [nombre for nombre, _ in COLUMNAS_CITAS],
+}
+
+
+def _normalizar(nombre):
+    """``'Teléfono '`` -> ``'telefono'``: sin acentos, minúsculas, sin espacios ni guiones."""
+    nombre = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[\s_\-]+', '', nombre.lower())
+
+
+# Encabezado normalizado -> columna del almacén (acepta también los nombres de SQLite)
+ALIAS = {
+    tipo: {_normalizar(alias): nombre for nombre, sql in pares for alias in (nombre, sql)}
+    for tipo, pares in (('pacientes', COLUMNAS_PACIENTES + (('Alergias', 'alergias'),)), ('citas', COLUMNAS_CITAS))
+}
+
+
+# ====================================================================================
+# --- CLASIFICACIÓN DE RIESGO ---
+# ====================================================================================
+def riesgo_paciente(historial, alergias=''):
+    """Riesgo IA de un paciente a partir de su historial y alergias."""
+    return 'Alto' if PATRON_RIESGO_ALTO.search(f"{historial} {alergias}") else 'Bajo'
+
+
+def clasificar_riesgo(historial, alergias=None):
+    """``riesgo_paciente`` para columnas completas (``Series`` de texto) a la vez."""
+    texto = historial if alergias is None else historial.str.cat(alergias, sep=' ')
+    return pd.Series(np.where(texto.str.contains(PATRON_RIESGO_ALTO, na=False), 'Alto', 'Bajo'), index=historial.index)
+
+
+# ====================================================================================
+# --- LECTURA POR LOTES ---
+# ====================================================================================
+def formato_de(nombre_archivo):
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower()
+    if extension not in FORMATOS:
+        raise ValueError(f"Formato no soportado: .{extension} (use {', '.join('.' + f for f in FORMATOS)}).")
+    return extension
+
+
+def leer_por_lotes(archivo, formato, lote=LOTE):
+    """DataFrames de hasta ``lote`` filas de ``archivo`` (ruta o archivo abierto en binario)."""
+    if formato == 'csv':
+        yield from pd.read_csv(archivo, chunksize=lote, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    elif formato == 'parquet':
+        import pyarrow.parquet as pq
+        for tabla in pq.ParquetFile(archivo).iter_batches(batch_size=lote):
+            yield tabla.to_pandas()
+    else:
+        # openpyxl no lee por partes: la hoja completa se carga una vez y se recorre por lotes
+        hoja = pd.read_excel(archivo, dtype=str, keep_default_na=False, engine='openpyxl')
+        for inicio in range(0, len(hoja), lote):
+            yield hoja.iloc[inicio:inicio + lote]
+
+
+# ====================================================================================
+# --- VALIDACIÓN VECTORIZADA ---
+# ====================================================================================
+def _texto(df, columna):
+    if columna not in df:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[columna].astype(object).where(df[columna].notna(), '').astype(str).str.strip()
+
+
+def _numero(df, columna, defecto):
+    """Números (``defecto`` si la celda viene vacía); ``NaN`` donde el texto no es numérico."""
+    texto = _texto(df, columna).str.replace(r'[$,\s]|MXN', '', regex=True)
+    return pd.to_numeric(texto.mask(texto == '', str(defecto)), errors='coerce')
+
+
+def _fecha(df, columna, defecto=None):
+    """Fechas ISO (``2024-01-15``) o ``dd/mm/aaaa``; ``None`` donde no se pudo interpretar."""
+    texto = _texto(df, columna)
+    if defecto is not None:
+        texto = texto.mask(texto == '', defecto.isoformat())
+    fechas = pd.to_datetime(texto, errors='coerce', format='ISO8601')
+    fallidas = fechas.isna() & (texto != '')
+    if fallidas.any():
+        fechas[fallidas] = pd.to_datetime(texto[fallidas], errors='coerce', format='%d/%m/%Y')
+    return fechas.dt.date.where(fechas.notna(), None)
+
+
+def _catalogo(df, columna, valores, defecto):
+    """Valor normalizado al catálogo (sin importar mayúsculas/acentos); ``None`` si no pertenece."""
+    canonico = {_normalizar(v): v for v in valores}
+    texto = _texto(df, columna).mask(lambda s: s == '', defecto)
+    return texto.map({v: canonico.get(_normalizar(v)) for v in texto.unique()})
+
+
+def _rechazar(motivos, mascara, motivo):
+    """Anota ``motivo`` en las filas de ``mascara`` que aún no tenían uno."""
+    motivos[mascara.to_numpy() & (motivos == '')] = motivo
+
+
+def validar_pacientes(df, ids_existentes, hoy):
+    """``(filas válidas como DataFrame del almacén, motivo de rechazo por fila)``."""
+    motivos = np.full(len(df), '', dtype=object)
+    limpio = pd.DataFrame(index=df.index)
+    limpio['ID'] = _texto(df, 'ID')
+    limpio['Nombre'] = _texto(df, 'Nombre')
+    limpio['Historial'] = _texto(df, 'Historial').mask(lambda s: s == '', 'Ninguno')
+    limpio['Telefono'] = _texto(df, 'Telefono').str.replace(r'\D', '', regex=True)
+    limpio['Servicio'] = _texto(df, 'Servicio').mask(lambda s: s == '', 'Valoración')
+    limpio['Costo'] = _numero(df, 'Costo', '')
+    limpio['Fecha_Registro'] = _fecha(df, 'Fecha_Registro', hoy)
+    limpio['Tratamientos_Pasados'] = _numero(df, 'Tratamientos_Pasados', 0)
+    limpio['Fuente'] = _texto(df, 'Fuente').mask(lambda s: s == '', 'Manual')
+    limpio['Aviso_Privacidad'] = _catalogo(df, 'Aviso_Privacidad', AVISOS, 'Pendiente')
+    riesgo = _catalogo(df, 'Riesgo IA', RIESGOS, '')
+    limpio['Riesgo IA'] = riesgo.fillna(clasificar_riesgo(limpio['Historial'], _texto(df, 'Alergias')))
+
+    con_id = limpio['ID'] != ''
+    _rechazar(motivos, limpio['Nombre'] == '', "Nombre vacío")
+    _rechazar(motivos, con_id & limpio['ID'].isin(ids_existentes), "ID ya registrado")
+    _rechazar(motivos, con_id & limpio['ID'].duplicated(), "ID repetido en el archivo")
+    _rechazar(motivos, _texto(df, 'Costo') == '', "Costo vacío")
+    _rechazar(motivos, limpio['Costo'].isna() | (limpio['Costo'] < COSTO_MINIMO), f"Costo inválido (mínimo ${COSTO_MINIMO})")
+    _rechazar(motivos, limpio['Fecha_Registro'].isna(), "Fecha_Registro inválida")
+    _rechazar(motivos, limpio['Tratamientos_Pasados'].isna() | (limpio['Tratamientos_Pasados'] < 0), "Tratamientos_Pasados inválido")
+    _rechazar(motivos, limpio['Aviso_Privacidad'].isna(), f"Aviso_Privacidad debe ser {' o '.join(AVISOS)}")
+    return limpio[motivos == ''], motivos
+
+
+def validar_citas(df, ids_existentes):
+    """``(filas válidas, motivo de rechazo por fila)``; el paciente debe existir."""
+    motivos = np.full(len(df), '', dtype=object)
+    limpio = pd.DataFrame(index=df.index)
+    limpio['ID Paciente'] = _texto(df, 'ID Paciente')
+    limpio['Doctor'] = _texto(df, 'Doctor')
+    limpio['Fecha'] = _fecha(df, 'Fecha')
+    hora = _texto(df, 'Hora').str.replace(r'^(\d):', r'0\1:', regex=True).str.slice(0, 5)
+    limpio['Hora'] = hora
+    limpio['Estado'] = _catalogo(df, 'Estado', ESTADOS, 'Pendiente')
+    limpio['Servicio'] = _texto(df, 'Servicio')
+    limpio['Costo_Cita'] = _numero(df, 'Costo_Cita', 0)
+
+    _rechazar(motivos, ~limpio['ID Paciente'].isin(ids_existentes), "Paciente inexistente")
+    _rechazar(motivos, limpio['Doctor'] == '', "Doctor vacío")
+    _rechazar(motivos, limpio['Fecha'].isna(), "Fecha inválida")
+    _rechazar(motivos, ~hora.str.match(PATRON_HORA), "Hora inválida (HH:MM)")
+    _rechazar(motivos, limpio['Estado'].isna(), f"Estado debe ser uno de: {', '.join(ESTADOS)}")
+    _rechazar(motivos, limpio['Servicio'] == '', "Servicio vacío")
+    _rechazar(motivos, limpio['Costo_Cita'].isna() | (limpio['Costo_Cita'] < 0), "Costo_Cita inválido")
+    return limpio[motivos == ''], motivos
+
+
+# ====================================================================================
+# --- IMPORTACIÓN ---
+# ====================================================================================
+def importar(almacen, tipo, archivo, formato, lote=LOTE, hoy=None, al_avanzar=None):
+    """Importa ``archivo`` a ``almacen`` (``tipo``: ``'pacientes'`` o ``'citas'``).
+
+    Devuelve ``{'leidas', 'importadas', 'rechazadas', 'errores': [(fila, motivo)...]}``
+    con las filas numeradas desde 1 (sin contar el encabezado). ``al_avanzar(leidas)``
+    se llama después de cada lote.
+    """
+    hoy = hoy or datetime.date.today()
+    resumen = {'leidas': 0, 'importadas': 0, 'rechazadas': 0, 'errores': []}
+    # IDs de paciente ya conocidos: se amplía con cada lote de pacientes importado
+    ids = set(almacen.pacientes.columna('ID').tolist())
+    for df in leer_por_lotes(archivo, formato, lote):
+        df = df.rename(columns=lambda c: ALIAS[tipo].get(_normalizar(c), c))
+        faltan = [c for c in OBLIGATORIAS[tipo] if c not in df]
+        if faltan:
+            raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltan)}.")
+        if tipo == 'pacientes':
+            validas, motivos = validar_pacientes(df, ids, hoy)
+            filas = validas[[c for c in COLUMNAS[tipo] if c != 'Alergias']]
+        else:
+            validas, motivos = validar_citas(df, ids)
+            filas = validas[COLUMNAS[tipo]]
+        if len(filas):
+            columnas = {c: filas[c].tolist() for c in filas.columns}
+            if tipo == 'pacientes':
+                columnas['ID'] = [i or None for i in columnas['ID']] # Sin ID: lo asigna el almacén
+                columnas['Tratamientos_Pasados'] = [int(t) for t in columnas['Tratamientos_Pasados']]
+            registros = [dict(zip(columnas, fila)) for fila in zip(*columnas.values())]
+            if tipo == 'pacientes':
+                inicio = len(almacen.pacientes)
+                almacen.registrar_pacientes(registros, origen='Importación')
+                ids.update(almacen.pacientes.columna('ID')[inicio:].tolist())
+            else:
+                almacen.agendar_citas(registros, origen='Importación')
+
+        rechazadas = np.flatnonzero(motivos != '')
+        if len(resumen['errores']) < MAX_ERRORES:
+            resumen['errores'] += [
+                (resumen['leidas'] + int(i) + 1, motivos[i])
+                for i in rechazadas[:MAX_ERRORES - len(resumen['errores'])]
+            ]
+        resumen['leidas'] += len(df)
+        resumen['importadas'] += len(filas)
+        resumen['rechazadas'] += len(rechazadas)
+        if al_avanzar is not None:
+            al_avanzar(resumen['leidas'])
+    return resumen
+
+
+# ====================================================================================
+# --- EXPORTACIÓN ---
+# ====================================================================================
+def exportar_csv(tabla, lote=LOTE):
+    """Bytes del CSV de ``tabla`` (UTF-8 con BOM, para Excel), un lote a la vez."""
+    vista = tabla.vista()
+    yield vista.iloc[:0].to_csv(index=False).encode('utf-8-sig')
+    for inicio in range(0, len(vista), lote):
+        yield vista.iloc[inicio:inicio + lote].to_csv(index=False, header=False, date_format='%Y-%m-%d').encode('utf-8')
+
+
+class _Salida(io.RawIOBase):
+    """Destino de escritura que entrega lo escrito por partes (``tell`` sigue contando el total)."""
+
+    def __init__(self):
+        super().__init__()
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def exportar_parquet(tabla, lote=LOTE):
+    """Bytes del Parquet de ``tabla`` (un grupo de filas por lote)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    vista = tabla.vista()
+    salida = _Salida()
+    esquema = pa.Schema.from_pandas(vista.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(salida, esquema) as escritor:
+        for inicio in range(0, len(vista), lote):
+            escritor.write_table(pa.Table.from_pandas(vista.iloc[inicio:inicio + lote], schema=esquema, preserve_index=False))
+            yield salida.vaciar()
+    yield salida.vaciar() # Pie del archivo (metadatos)
+
+
+def a_archivo(partes):
+    """Junta los bytes de un exportador en un solo ``BytesIO`` (la única copia completa)."""
+    salida = io.BytesIO()
+    for parte in partes:
+        salida.write(parte)
+    salida.seek(0)
+    return salida
@@ -0,0 +1,257 @@
+"""Disponibilidad de doctores: horarios libres y detección de empalmes.
+
+La jornada publicada (``HORARIO_ATENCION``: días hábiles de 09:00 a 19:00,
+la misma ventana que muestra el calendario y que responde el chatbot) se
+divide en celdas de ``GRANO`` minutos. Cada doctor guarda:
+
+- un entero por día con un bit por celda ocupada (comprobar un empalme es un
+  AND con la máscara de la cita)
+- un árbol de segmentos sobre los días con la racha libre más larga de cada
+  uno, así que "el primer día desde X con N celdas seguidas libres" baja por
+  el árbol en O(log días) aunque la agenda esté llena durante meses
+
+Los fines de semana y los ``dias_cerrados`` nunca se ofrecen, ni los
+horarios que empiezan antes de ``ahora + ANTICIPACION``.
+
+Se mantiene al día como suscriptor de ``AlmacenClinica``; las citas canceladas
+no ocupan lugar.
+"""
+import datetime
+import heapq
+import threading
+
+import numpy as np
+
+from sgc.calendario import DURACION_CITA
+from sgc.kpis import dia_ordinal
+
+APERTURA = datetime.time(9, 0)
+CIERRE = datetime.time(19, 0)
+DIAS_HABILES = (0, 1, 2, 3, 4) # ``date.weekday()``: lunes a viernes (consecutivos)
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+ANTICIPACION = datetime.timedelta(hours=2) # Mínimo entre "ahora" y el horario ofrecido
+GRANO = 15 # Minutos por celda
+CELDAS = (CIERRE.hour * 60 + CIERRE.minute - APERTURA.hour * 60 - APERTURA.minute) // GRANO
+LLENO = (1 << CELDAS) - 1
+CAPACIDAD_INICIAL = 64 # Días del árbol al registrar la primera cita
+
+_EPOCA = datetime.date(1970, 1, 1)
+
+
+def _hora_12(hora):
+    return f"{(hora.hour - 1) % 12 + 1}:{hora.minute:02d} {'AM' if hora.hour < 12 else 'PM'}"
+
+
+HORARIO_ATENCION = (f"{DIAS_SEMANA[DIAS_HABILES[0]]} a {DIAS_SEMANA[DIAS_HABILES[-1]]} "
+                    f"de {_hora_12(APERTURA)} a {_hora_12(CIERRE)}")
+
+
+class ConflictoAgenda(Exception):
+    """La cita se empalma con otra del mismo doctor o cae fuera del horario de atención."""
+
+
+def _minutos(hora):
+    """Minutos desde la apertura de ``'HH:MM'`` o ``datetime.time``."""
+    if isinstance(hora, str):
+        horas, minutos = hora.split(':')[:2]
+        hora = datetime.time(int(horas), int(minutos))
+    return hora.hour * 60 + hora.minute - APERTURA.hour * 60 - APERTURA.minute
+
+
+def _celdas(duracion):
+    """Celdas que ocupa una cita de ``duracion`` (redondeando hacia arriba)."""
+    celdas = -(-int(duracion.total_seconds()) // (GRANO * 60))
+    if not 0 < celdas <= CELDAS:
+        raise ValueError(f"Duración fuera de la jornada: {duracion}")
+    return celdas
+
+
+def horarios(duracion=DURACION_CITA, paso=GRANO):
+    """Inicios ``'HH:MM'`` de la jornada, cada ``paso`` minutos, en los que cabe una cita de ``duracion``."""
+    ultimo = CELDAS - _celdas(duracion)
+    apertura = APERTURA.hour * 60 + APERTURA.minute
+    return [f"{(apertura + m) // 60:02d}:{(apertura + m) % 60:02d}" for m in range(0, ultimo * GRANO + 1, paso)]
+
+
+def _racha_maxima(libre):
+    """Largo de la racha más larga de bits en 1."""
+    n = 0
+    while libre:
+        libre &= libre >> 1
+        n += 1
+    return n
+
+
+def _inicios(libre, celdas):
+    """Bits donde empiezan ``celdas`` bits seguidos en 1 (desplazamientos que se duplican)."""
+    largo = 1
+    while largo < celdas:
+        paso = min(largo, celdas - largo)
+        libre &= libre >> paso
+        largo += paso
+    return libre
+
+
+class _AgendaDoctor:
+    """Máscaras de ocupación por día y árbol de máximos con la racha libre de cada día."""
+
+    def __init__(self):
+        self.ocupado = {} # Día ordinal -> máscara de celdas ocupadas
+        self._origen = None
+        self._capacidad = 0
+        self._arbol = []
+
+    def ocupar(self, dia, mascara):
+        self.ocupado[dia] = self.ocupado.get(dia, 0) | mascara
+        if self._origen is None or not self._origen <= dia < self._origen + self._capacidad:
+            self._crecer(dia)
+        nodo = self._capacidad + dia - self._origen
+        self._arbol[nodo] = _racha_maxima(LLENO & ~self.ocupado[dia])
+        nodo //= 2
+        while nodo:
+            self._arbol[nodo] = max(self._arbol[2 * nodo], self._arbol[2 * nodo + 1])
+            nodo //= 2
+
+    def _crecer(self, dia):
+        """Reconstruye el árbol para que cubra ``dia``; crece al menos al doble (O(1) amortizado)."""
+        if self._origen is None:
+            origen, fin = dia, dia + CAPACIDAD_INICIAL
+        else:
+            origen, fin = self._origen, self._origen + self._capacidad
+            if dia < origen:
+                origen = min(dia, origen - self._capacidad)
+            else:
+                fin = max(dia + 1, fin + self._capacidad)
+        capacidad = 1 << (fin - origen - 1).bit_length()
+        arbol = [CELDAS] * (2 * capacidad)
+        for d, mascara in self.ocupado.items():
+            if origen <= d < origen + capacidad:
+                arbol[capacidad + d - origen] = _racha_maxima(LLENO & ~mascara)
+        for nodo in range(capacidad - 1, 0, -1):
+            arbol[nodo] = max(arbol[2 * nodo], arbol[2 * nodo + 1])
+        self._origen, self._capacidad, self._arbol = origen, capacidad, arbol
+
+    def _buscar(self, nodo, izq, der, desde, celdas):
+        if der <= desde or self._arbol[nodo] < celdas:
+            return None
+        if der - izq == 1:
+            return izq
+        medio = (izq + der) // 2
+        encontrado = self._buscar(2 * nodo, izq, medio, desde, celdas)
+        return encontrado if encontrado is not None else self._buscar(2 * nodo + 1, medio, der, desde, celdas)
+
+    def primer_dia(self, desde, celdas):
+        """Primer día ``>= desde`` con ``celdas`` celdas seguidas libres."""
+        if self._origen is None or desde < self._origen:
+            return desde # Antes del primer día con citas todo está libre
+        indice = self._buscar(1, 0, self._capacidad, desde - self._origen, celdas)
+        return max(desde, self._origen + self._capacidad) if indice is None else self._origen + indice
+
+    def siguiente(self, dia, celda, celdas, habil):
+        """Primer ``(día, celda)`` desde ``(dia, celda)`` donde caben ``celdas`` celdas libres en un día ``habil``."""
+        while True:
+            if habil(dia):
+                inicios = _inicios(LLENO & ~self.ocupado.get(dia, 0), celdas) >> celda << celda
+                if inicios:
+                    return dia, (inicios & -inicios).bit_length() - 1
+            dia, celda = self.primer_dia(dia + 1, celdas), 0 # El árbol salta los días sin lugar
+
+
+class MotorDisponibilidad:
+    """Agenda de ocupación por doctor; responde horarios libres y valida citas nuevas."""
+
+    def __init__(self, doctores=(), duracion=DURACION_CITA, dias_cerrados=()):
+        self.duracion = duracion
+        self.dias_cerrados = {dia_ordinal(fecha) for fecha in dias_cerrados} # Festivos, vacaciones...
+        self._agendas = {doctor: _AgendaDoctor() for doctor in doctores}
+        self._lock = threading.Lock()
+
+    @property
+    def doctores(self):
+        return list(self._agendas)
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        pass
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        dias = tabla.columna('Fecha')[inicio:fin].astype(np.int64).tolist()
+        horas = tabla.columna('Hora')[inicio:fin].tolist()
+        cat_doctor, cat_estado = tabla.categoria('Doctor'), tabla.categoria('Estado')
+        doctores = [cat_doctor.categorias[c] for c in tabla.columna('Doctor')[inicio:fin].tolist()]
+        cancelada = cat_estado.categorias.index('Cancelada')
+        estados = tabla.columna('Estado')[inicio:fin].tolist()
+        celdas = _celdas(self.duracion)
+        with self._lock:
+            for dia, hora, doctor, estado in zip(dias, horas, doctores, estados):
+                if estado == cancelada:
+                    continue
+                try:
+                    primera = _minutos(hora) // GRANO
+                except (ValueError, AttributeError):
+                    continue # Hora ilegible: la cita no bloquea la agenda
+                ultima = min(primera + celdas, CELDAS)
+                primera = max(primera, 0)
+                if primera < ultima:
+                    self._agenda(doctor).ocupar(dia, ((1 << (ultima - primera)) - 1) << primera)
+
+    def _agenda(self, doctor):
+        agenda = self._agendas.get(doctor)
+        if agenda is None:
+            agenda = self._agendas[doctor] = _AgendaDoctor()
+        return agenda
+
+    def habil(self, dia):
+        """¿Se atiende el día ordinal ``dia``? (1970-01-01 fue jueves)."""
+        return (dia + 3) % 7 in DIAS_HABILES and dia not in self.dias_cerrados
+
+    # --- Consultas ---
+    def validar(self, cita, duracion=None):
+        """Lanza ``ConflictoAgenda`` si ``cita`` no cabe en la agenda de su doctor."""
+        if not self.habil(dia_ordinal(cita['Fecha'])):
+            raise ConflictoAgenda(f"La clínica no atiende el {cita['Fecha']}: el horario es de {HORARIO_ATENCION}.")
+        inicio = _minutos(cita['Hora'])
+        celdas = _celdas(duracion or self.duracion)
+        if inicio < 0 or inicio % GRANO or inicio // GRANO + celdas > CELDAS:
+            raise ConflictoAgenda(
+                f"{cita['Hora']} no es un horario válido: las citas van de {APERTURA:%H:%M} a {CIERRE:%H:%M} "
+                f"en bloques de {GRANO} minutos."
+            )
+        mascara = ((1 << celdas) - 1) << (inicio // GRANO)
+        with self._lock:
+            agenda = self._agendas.get(cita['Doctor'])
+            ocupado = 0 if agenda is None else agenda.ocupado.get(dia_ordinal(cita['Fecha']), 0)
+        if ocupado & mascara:
+            raise ConflictoAgenda(f"{cita['Doctor']} ya tiene una cita que se empalma el {cita['Fecha']} a las {cita['Hora']}.")
+
+    def proximos(self, n, desde, doctor=None, duracion=None, ahora=None):
+        """Los ``n`` horarios libres más próximos a partir de ``desde`` (``datetime``).
+
+        Con ``doctor=None`` se mezclan las agendas de todos (el más temprano
+        primero). Los horarios de un mismo doctor no se enciman entre sí.
+        Nada empieza antes de ``ahora`` (por omisión, la hora actual) más
+        ``ANTICIPACION``. Cada horario es ``{'Doctor', 'Fecha', 'Hora'}``, listo para una cita.
+        """
+        celdas = _celdas(duracion or self.duracion)
+        desde = max(desde, (ahora or datetime.datetime.now()) + ANTICIPACION)
+        dia = dia_ordinal(desde.date())
+        celda = max(0, -(-_minutos(desde.time()) // GRANO))
+        libres = []
+        with self._lock:
+            doctores = [doctor] if doctor is not None else list(self._agendas)
+            agendas = [self._agendas.get(d) or _AgendaDoctor() for d in doctores]
+            frente = [(*agenda.siguiente(dia, celda, celdas, self.habil), i) for i, agenda in enumerate(agendas)]
+            heapq.heapify(frente)
+            while frente and len(libres) < n:
+                dia_libre, celda_libre, i = frente[0]
+                libres.append(self._horario(doctores[i], dia_libre, celda_libre))
+                heapq.heapreplace(frente, (*agendas[i].siguiente(dia_libre, celda_libre + celdas, celdas, self.habil), i))
+        return libres
+
+    @staticmethod
+    def _horario(doctor, dia, celda):
+        minutos = APERTURA.hour * 60 + APERTURA.minute + celda * GRANO
+        return {
+            'Doctor': doctor, 'Fecha': _EPOCA + datetime.timedelta(days=dia),
+            'Hora': f"{minutos // 60:02d}:{minutos % 60:02d}",
+        }
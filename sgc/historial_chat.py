@@ -0,0 +1,83 @@
+"""Historial acotado del chatbot: búfer circular en memoria y archivo en SQLite.
+
+La sesión solo conserva los últimos ``capacidad`` mensajes (lo que se dibuja en
+cada rerun); el mensaje que sale del búfer se archiva en la tabla
+``chat_mensajes`` y se consulta por páginas cuando el usuario pide ver
+mensajes anteriores. Así el costo de dibujar un turno no depende de lo larga
+que sea la conversación.
+"""
+import collections
+import datetime
+import uuid
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS chat_mensajes (
+    conversacion TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    rol TEXT NOT NULL,
+    contenido TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    PRIMARY KEY (conversacion, n)
+) WITHOUT ROWID;
+"""
+
+SQL_ARCHIVAR = "INSERT OR REPLACE INTO chat_mensajes (conversacion, n, rol, contenido, creado) VALUES (?, ?, ?, ?, ?)"
+SQL_RANGO = """
+SELECT n, rol, contenido FROM chat_mensajes
+WHERE conversacion = ? AND n >= ? AND n < ? ORDER BY n
+"""
+
+
+class ArchivoChat:
+    """Mensajes archivados de todas las conversaciones, en la base de datos de la clínica."""
+
+    def __init__(self, base_datos):
+        self.pool = base_datos.pool
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+
+    def archivar(self, conversacion, mensajes):
+        creado = datetime.datetime.now().isoformat(timespec='seconds')
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_ARCHIVAR, [(conversacion, m['n'], m['role'], m['content'], creado) for m in mensajes])
+
+    def rango(self, conversacion, desde, hasta):
+        """Mensajes ``desde <= n < hasta`` en orden cronológico."""
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(SQL_RANGO, (conversacion, desde, hasta)).fetchall()
+        return [{'n': n, 'role': rol, 'content': contenido} for n, rol, contenido in filas]
+
+
+class HistorialChat:
+    """Últimos ``capacidad`` mensajes de una conversación; los anteriores van a ``archivo``."""
+
+    def __init__(self, archivo, capacidad=30, conversacion=None):
+        self.archivo = archivo
+        self.capacidad = capacidad
+        self.conversacion = conversacion or uuid.uuid4().hex
+        self._recientes = collections.deque()
+        self._total = 0
+
+    def __len__(self):
+        return self._total
+
+    def agregar(self, rol, contenido):
+        self._recientes.append({'n': self._total, 'role': rol, 'content': contenido})
+        self._total += 1
+        if len(self._recientes) > self.capacidad:
+            self.archivo.archivar(self.conversacion, [self._recientes.popleft()])
+
+    def recientes(self):
+        return list(self._recientes)
+
+    @property
+    def archivados(self):
+        return self._total - len(self._recientes)
+
+    def paginas(self, tamano):
+        return -(-self.archivados // tamano)
+
+    def pagina_archivada(self, pagina, tamano):
+        """Página ``pagina`` del archivo (1 = la más cercana a los mensajes visibles)."""
+        hasta = self.archivados - (pagina - 1) * tamano
+        return self.archivo.rango(self.conversacion, max(0, hasta - tamano), hasta) if hasta > 0 else []
@@ -0,0 +1,61 @@
+"""Índices hash en memoria sobre el almacén (búsquedas O(1)).
+
+- ID de paciente -> fila en la tabla de pacientes
+- Nombre -> IDs (puede haber homónimos)
+- ID de paciente -> filas de sus citas
+
+Se mantienen al día como suscriptor de ``AlmacenClinica``.
+"""
+
+
+class IndicePacientes:
+    """Índices por ID, por nombre y de citas por paciente."""
+
+    def __init__(self):
+        self._pacientes = None
+        self._citas = None
+        self._por_id = {}
+        self._por_nombre = {}
+        self._citas_por_paciente = {}
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        self._pacientes = tabla
+        ids = tabla.columna('ID')[inicio:fin].tolist()
+        nombres = tabla.columna('Nombre')[inicio:fin].tolist()
+        for fila, (id_paciente, nombre) in enumerate(zip(ids, nombres), start=inicio):
+            self._por_id[id_paciente] = fila
+            self._por_nombre.setdefault(nombre, []).append(id_paciente)
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        self._citas = tabla
+        for fila, id_paciente in enumerate(tabla.columna('ID Paciente')[inicio:fin].tolist(), start=inicio):
+            self._citas_por_paciente.setdefault(id_paciente, []).append(fila)
+
+    # --- Consultas ---
+    def fila_paciente(self, id_paciente):
+        return self._por_id.get(id_paciente)
+
+    def paciente(self, id_paciente):
+        """Paciente como dict, o ``None`` si el ID no existe."""
+        fila = self._por_id.get(id_paciente)
+        return None if fila is None else self._pacientes.fila(fila)
+
+    def nombre(self, id_paciente, defecto=None):
+        fila = self._por_id.get(id_paciente)
+        return defecto if fila is None else self._pacientes.columna('Nombre')[fila]
+
+    def ids_por_nombre(self, nombre):
+        return self._por_nombre.get(nombre, [])
+
+    def paciente_por_nombre(self, nombre):
+        """Primer paciente con ese nombre (como hacían los formularios), o ``None``."""
+        ids = self._por_nombre.get(nombre)
+        return self.paciente(ids[0]) if ids else None
+
+    def filas_citas(self, id_paciente):
+        """Filas de la tabla de citas del paciente, en orden de registro."""
+        return self._citas_por_paciente.get(id_paciente, [])
+
+    def citas(self, id_paciente):
+        return [self._citas.fila(i) for i in self.filas_citas(id_paciente)]
@@ -0,0 +1,171 @@
+"""Pronóstico de inventario vectorizado (punto de reorden, cobertura y pedido sugerido).
+
+Todo el catálogo se calcula de una vez con operaciones de NumPy; las funciones
+aceptan arreglos de cualquier forma ``(..., artículos)`` (p. ej. sucursales x
+artículos) y el historial de consumo agrega un último eje de días.
+
+Modelo por artículo:
+- demanda diaria: promedio exponencial del historial; sin historial, ``Uso Mensual / 30``
+- stock de seguridad: ``z * desviación * sqrt(días de entrega)``
+- punto de reorden: ``demanda * días de entrega + stock de seguridad``
+- pedido sugerido: lo que falta para cubrir el punto de reorden más un ciclo de revisión
+- estado: URGENTE si el stock se agota antes de que llegue un pedido hecho hoy,
+  PEDIR si está por debajo del punto de reorden, OK en otro caso
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+OK, PEDIR, URGENTE = 0, 1, 2
+ESTADOS = np.array(['OK', 'PEDIR', 'URGENTE'])
+
+DIAS_ENTREGA_POR_DEFECTO = 7
+DIAS_ENTREGA_PROVEEDOR = {'DentalPro': 5, 'MedSupply': 7, '3M Dental': 10}
+CICLO_REVISION = 30 # Días que debe cubrir un pedido además del tiempo de entrega
+Z_NIVEL_SERVICIO = 1.645 # 95 %
+VARIACION_SIN_HISTORIAL = 0.3 # Coeficiente de variación supuesto si no hay consumo registrado
+VIDA_MEDIA_HISTORIAL = 14 # Días para que una observación pese la mitad
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS inventario_consumo (
+    articulo TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    cantidad REAL NOT NULL,
+    PRIMARY KEY (articulo, fecha)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS inventario_consumo_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO inventario_consumo_version (id, version) VALUES (0, 0);
+"""
+SQL_REGISTRAR = """
+INSERT INTO inventario_consumo (articulo, fecha, cantidad) VALUES (?, ?, ?)
+ON CONFLICT (articulo, fecha) DO UPDATE SET cantidad = cantidad + excluded.cantidad
+"""
+SQL_DESDE = "SELECT articulo, fecha, cantidad FROM inventario_consumo WHERE fecha >= ?"
+SQL_HAY_CONSUMO = "SELECT EXISTS (SELECT 1 FROM inventario_consumo)"
+SQL_VERSION = "SELECT version FROM inventario_consumo_version WHERE id = 0"
+SQL_SUBIR_VERSION = "UPDATE inventario_consumo_version SET version = version + 1 WHERE id = 0"
+
+
+# ====================================================================================
+# --- MOTOR DE PRONÓSTICO ---
+# ====================================================================================
+def _pesos_exponenciales(dias, vida_media=VIDA_MEDIA_HISTORIAL):
+    """Pesos que suman 1, el día más reciente (último) con el mayor peso."""
+    pesos = 0.5 ** (np.arange(dias)[::-1] / vida_media)
+    return pesos / pesos.sum()
+
+
+def pronosticar(stock, uso_mensual, historial=None, dias_entrega=DIAS_ENTREGA_POR_DEFECTO,
+                ciclo_revision=CICLO_REVISION, z=Z_NIVEL_SERVICIO):
+    """Pronóstico de todo el catálogo. Devuelve un dict de arreglos con la forma de ``stock``.
+
+    ``historial`` es opcional, con forma ``stock.shape + (días,)`` y el día más
+    reciente al final; los artículos sin consumo registrado usan ``uso_mensual``.
+    """
+    stock = np.asarray(stock, dtype=np.float64)
+    uso_diario = np.asarray(uso_mensual, dtype=np.float64) / 30.0
+    dias_entrega = np.asarray(dias_entrega, dtype=np.float64)
+    if historial is not None and np.shape(historial)[-1] > 1:
+        historial = np.asarray(historial, dtype=np.float64)
+        pesos = _pesos_exponenciales(historial.shape[-1])
+        promedio = historial @ pesos
+        desviacion_hist = np.sqrt(np.maximum((historial - promedio[..., None]) ** 2 @ pesos, 0.0))
+        con_historial = historial.any(axis=-1)
+        demanda = np.where(con_historial, promedio, uso_diario)
+        desviacion = np.where(con_historial, desviacion_hist, uso_diario * VARIACION_SIN_HISTORIAL)
+    else:
+        demanda = uso_diario
+        desviacion = uso_diario * VARIACION_SIN_HISTORIAL
+
+    stock_seguridad = z * desviacion * np.sqrt(dias_entrega)
+    punto_reorden = demanda * dias_entrega + stock_seguridad
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias_cobertura = np.where(demanda > 0, stock / demanda, np.inf)
+    nivel_objetivo = punto_reorden + demanda * ciclo_revision
+    cantidad_sugerida = np.where(stock <= punto_reorden, np.ceil(np.maximum(nivel_objetivo - stock, 0.0)), 0.0)
+    estado = np.select(
+        [dias_cobertura <= dias_entrega, stock <= punto_reorden], [URGENTE, PEDIR], OK,
+    ).astype(np.int8)
+    return {
+        'demanda_diaria': demanda, 'desviacion': desviacion, 'stock_seguridad': stock_seguridad,
+        'punto_reorden': punto_reorden, 'dias_cobertura': dias_cobertura,
+        'cantidad_sugerida': cantidad_sugerida, 'estado': estado,
+    }
+
+
+def texto_prediccion(estado, cantidad_sugerida):
+    """Texto de la columna "Predicción IA" para cada artículo (vectorizado)."""
+    cantidades = np.char.mod('%d', cantidad_sugerida.astype(np.int64))
+    return np.where(
+        estado == URGENTE, np.char.add(np.char.add('¡PEDIDO URGENTE! Pedir ', cantidades), ' uds'),
+        np.where(estado == PEDIR, np.char.add(np.char.add('Pedir ', cantidades), ' uds'), 'OK'),
+    )
+
+
+def tabla_pronostico(inventario, consumo=None):
+    """DataFrame del catálogo (``{artículo: datos}``) con las columnas del pronóstico.
+
+    ``consumo`` es el historial opcional ``(artículos, días)`` en el mismo orden
+    que ``inventario``.
+    """
+    df = pd.DataFrame.from_dict(inventario, orient='index').drop(columns=['Predicción IA'], errors='ignore')
+    if df.empty:
+        return df
+    dias_entrega = df['Proveedor'].map(DIAS_ENTREGA_PROVEEDOR).fillna(DIAS_ENTREGA_POR_DEFECTO).to_numpy()
+    p = pronosticar(df['Stock'].to_numpy(), df['Uso Mensual'].to_numpy(), consumo, dias_entrega)
+    df['Días de Cobertura'] = np.round(p['dias_cobertura'], 1)
+    df['Punto de Reorden'] = np.ceil(p['punto_reorden']).astype(np.int64)
+    df['Cantidad Sugerida'] = p['cantidad_sugerida'].astype(np.int64)
+    df['Estado'] = pd.Categorical.from_codes(p['estado'], categories=ESTADOS)
+    df['Predicción IA'] = texto_prediccion(p['estado'], p['cantidad_sugerida'])
+    return df
+
+
+# ====================================================================================
+# --- HISTORIAL DE CONSUMO ---
+# ====================================================================================
+class HistorialConsumo:
+    """Consumo diario por artículo, en la base de datos de la clínica.
+
+    ``version()`` sube con cada ``registrar`` (de cualquier proceso) y es lo
+    que ``AlmacenClinica.versiones()`` expone como colección ``'consumo'``.
+    """
+
+    def __init__(self, base_datos):
+        self.pool = base_datos.pool
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+
+    def esta_vacio(self):
+        with self.pool.conexion() as conexion:
+            return not conexion.execute(SQL_HAY_CONSUMO).fetchone()[0]
+
+    def version(self):
+        with self.pool.conexion() as conexion:
+            return conexion.execute(SQL_VERSION).fetchone()[0]
+
+    def registrar(self, consumos):
+        """Suma consumos ``(artículo, fecha, cantidad)`` al día correspondiente."""
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_REGISTRAR, [(a, f.isoformat(), float(c)) for a, f, c in consumos])
+            conexion.execute(SQL_SUBIR_VERSION)
+
+    def matriz(self, articulos, dias, hoy):
+        """Arreglo ``(len(articulos), dias)`` con el consumo de los últimos ``dias`` (hoy al final)."""
+        inicio = hoy - datetime.timedelta(days=dias - 1)
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(SQL_DESDE, (inicio.isoformat(),)).fetchall()
+        matriz = np.zeros((len(articulos), dias))
+        if filas:
+            posicion = {articulo: i for i, articulo in enumerate(articulos)}
+            filas = [(posicion[a], (datetime.date.fromisoformat(f) - inicio).days, c) for a, f, c in filas if a in posicion]
+            if filas:
+                i, d, c = np.array(filas).T
+                d = d.astype(np.int64)
+                dentro = d < dias
+                np.add.at(matriz, (i[dentro].astype(np.int64), d[dentro]), c[dentro])
+        return matriz
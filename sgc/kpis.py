@@ -0,0 +1,161 @@
+"""Motor de KPIs incremental para el Panel de Control.
+
+Los contadores se actualizan al registrar pacientes o agendar citas (O(1) por
+fila, vectorizado por lote). Las ventanas deslizantes se mantienen con cubetas
+por día: al cambiar la fecha solo se rebalancean los días que entran o salen.
+"""
+import datetime
+import threading
+
+import numpy as np
+
+VENTANA_MES = 30
+VENTANA_SEMANA = 7
+
+_EPOCA = datetime.date(1970, 1, 1)
+
+# Posiciones en la cubeta diaria de citas (los importes viven en ``sgc.libro_mayor``)
+_CITAS, _COMPLETADAS, _CANCELADAS = range(3)
+
+
+def dia_ordinal(fecha):
+    """Días desde 1970-01-01 (mismo valor que ``datetime64[D]`` como entero)."""
+    return (fecha - _EPOCA).days
+
+
+class MotorKPI:
+    """Agregados acumulados de pacientes y citas. Se suscribe a ``AlmacenClinica``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # --- Cartera ---
+        self.total_pacientes = 0
+        self.pacientes_alto_riesgo = 0
+        self.consentimiento_pendiente = 0
+        self._pacientes_por_fuente = {}
+        self._registros_por_dia = {}
+        # --- Agenda ---
+        self.citas_pendientes = 0
+        self._citas_por_doctor = {}
+        self._citas_por_dia = {}
+        # --- Ventanas (dependen de la fecha) ---
+        self._hoy = None
+        self._completadas_antes_corte = 0
+        self._canceladas_antes_corte = 0
+        self._nuevos_antes_corte = 0
+        self._completadas_total = 0
+        self._canceladas_total = 0
+        self._citas_semana = 0
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        riesgo = tabla.columna('Riesgo IA')[inicio:fin]
+        aviso = tabla.columna('Aviso_Privacidad')[inicio:fin]
+        fuente = tabla.columna('Fuente')[inicio:fin]
+        dias = tabla.columna('Fecha_Registro')[inicio:fin].astype(np.int64)
+        cat_fuente = tabla.categoria('Fuente')
+        with self._lock:
+            self.total_pacientes += fin - inicio
+            self.pacientes_alto_riesgo += int((riesgo == tabla.categoria('Riesgo IA').codigo('Alto')).sum())
+            self.consentimiento_pendiente += int((aviso == tabla.categoria('Aviso_Privacidad').codigo('Pendiente')).sum())
+            for codigo, n in enumerate(np.bincount(fuente, minlength=len(cat_fuente.categorias))):
+                if n:
+                    nombre = cat_fuente.categorias[codigo]
+                    self._pacientes_por_fuente[nombre] = self._pacientes_por_fuente.get(nombre, 0) + int(n)
+            for dia, n in zip(*np.unique(dias, return_counts=True)):
+                dia, n = int(dia), int(n)
+                self._registros_por_dia[dia] = self._registros_por_dia.get(dia, 0) + n
+                if self._hoy is not None and dia <= self._hoy - VENTANA_MES:
+                    self._nuevos_antes_corte += n
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        dias = tabla.columna('Fecha')[inicio:fin].astype(np.int64)
+        estados = tabla.columna('Estado')[inicio:fin]
+        doctores = tabla.columna('Doctor')[inicio:fin]
+        cat_estado = tabla.categoria('Estado')
+        cat_doctor = tabla.categoria('Doctor')
+        completada = estados == cat_estado.codigo('Completada')
+        cancelada = estados == cat_estado.codigo('Cancelada')
+        with self._lock:
+            self.citas_pendientes += int((estados == cat_estado.codigo('Pendiente')).sum())
+            self._completadas_total += int(completada.sum())
+            self._canceladas_total += int(cancelada.sum())
+            for codigo, n in enumerate(np.bincount(doctores, minlength=len(cat_doctor.categorias))):
+                if n:
+                    nombre = cat_doctor.categorias[codigo]
+                    self._citas_por_doctor[nombre] = self._citas_por_doctor.get(nombre, 0) + int(n)
+            unicos, inverso = np.unique(dias, return_inverse=True)
+            citas = np.bincount(inverso)
+            completadas = np.bincount(inverso, weights=completada)
+            canceladas = np.bincount(inverso, weights=cancelada)
+            for k, dia in enumerate(unicos.tolist()):
+                cubeta = self._citas_por_dia.setdefault(dia, [0, 0, 0])
+                cubeta[_CITAS] += int(citas[k])
+                cubeta[_COMPLETADAS] += int(completadas[k])
+                cubeta[_CANCELADAS] += int(canceladas[k])
+                if self._hoy is None:
+                    continue
+                if dia <= self._hoy - VENTANA_MES:
+                    self._completadas_antes_corte += int(completadas[k])
+                    self._canceladas_antes_corte += int(canceladas[k])
+                if self._hoy <= dia < self._hoy + VENTANA_SEMANA:
+                    self._citas_semana += int(citas[k])
+
+    # --- Ventanas deslizantes ---
+    def _cubeta(self, dia):
+        return self._citas_por_dia.get(dia, (0, 0, 0))
+
+    def _sumar_corte(self, dia, signo=1):
+        cubeta = self._cubeta(dia)
+        self._completadas_antes_corte += signo * cubeta[_COMPLETADAS]
+        self._canceladas_antes_corte += signo * cubeta[_CANCELADAS]
+        self._nuevos_antes_corte += signo * self._registros_por_dia.get(dia, 0)
+
+    def _recalcular_ventanas(self, hoy):
+        corte = hoy - VENTANA_MES
+        self._completadas_antes_corte = self._canceladas_antes_corte = self._nuevos_antes_corte = 0
+        for dia, cubeta in self._citas_por_dia.items():
+            if dia <= corte:
+                self._completadas_antes_corte += cubeta[_COMPLETADAS]
+                self._canceladas_antes_corte += cubeta[_CANCELADAS]
+        self._nuevos_antes_corte = sum(n for dia, n in self._registros_por_dia.items() if dia <= corte)
+        self._citas_semana = sum(self._cubeta(dia)[_CITAS] for dia in range(hoy, hoy + VENTANA_SEMANA))
+
+    def _avanzar(self, hoy):
+        """Mueve las ventanas a ``hoy`` tocando solo los días que entran o salen."""
+        anterior = self._hoy
+        self._hoy = hoy
+        if anterior is None or not 0 < hoy - anterior <= VENTANA_MES:
+            self._recalcular_ventanas(hoy)
+            return
+        for dia in range(anterior - VENTANA_MES + 1, hoy - VENTANA_MES + 1):
+            self._sumar_corte(dia)
+        if hoy - anterior >= VENTANA_SEMANA:
+            self._citas_semana = sum(self._cubeta(dia)[_CITAS] for dia in range(hoy, hoy + VENTANA_SEMANA))
+            return
+        for dia in range(anterior, hoy):
+            self._citas_semana -= self._cubeta(dia)[_CITAS]
+        for dia in range(anterior + VENTANA_SEMANA, hoy + VENTANA_SEMANA):
+            self._citas_semana += self._cubeta(dia)[_CITAS]
+
+    # --- Lectura ---
+    def instantanea(self, hoy):
+        """Todos los KPIs de cartera y agenda para la fecha ``hoy``."""
+        dia = dia_ordinal(hoy)
+        with self._lock:
+            if dia != self._hoy:
+                self._avanzar(dia)
+            completadas_mes = self._completadas_total - self._completadas_antes_corte
+            canceladas_mes = self._canceladas_total - self._canceladas_antes_corte
+            return {
+                'total_pacientes': self.total_pacientes,
+                'citas_completadas_mes': completadas_mes,
+                'citas_canceladas_mes': canceladas_mes,
+                'citas_prox_7d': self._citas_semana,
+                'citas_pendientes': self.citas_pendientes,
+                'pacientes_alto_riesgo': self.pacientes_alto_riesgo,
+                'pacientes_nuevos_mes': self.total_pacientes - self._nuevos_antes_corte,
+                'consentimiento_pendiente': self.consentimiento_pendiente,
+                'doctor_mas_ocupado': max(self._citas_por_doctor, key=self._citas_por_doctor.get, default="N/A"),
+                'fuente_principal': max(self._pacientes_por_fuente, key=self._pacientes_por_fuente.get, default="N/A"),
+            }
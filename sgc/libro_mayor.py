@@ -0,0 +1,170 @@
+"""Libro mayor de la clínica: asientos en centavos enteros, solo se anexan.
+
+Cada alta de paciente y cada cita generan asientos en una de tres cuentas:
+
+- ``CARTERA``: valor del tratamiento principal del paciente, en su fecha de registro
+- ``AGENDADO``: valor de cada cita no cancelada, en la fecha de la cita
+- ``INGRESO``: valor de cada cita completada (lo cobrado), en la fecha de la cita
+
+Los montos se convierten una sola vez a centavos (``int``) al asentarse, así
+que los totales son exactos. Por cuenta se mantiene un árbol de Fenwick de
+sumas acumuladas por día (total de la clínica en cualquier rango de fechas en
+O(log días)) y, por paciente, sus días ordenados con la suma acumulada (rango
+en O(log asientos del paciente)).
+
+Se mantiene al día como suscriptor de ``AlmacenClinica``.
+"""
+import array
+import bisect
+import threading
+
+import numpy as np
+
+from sgc.kpis import dia_ordinal
+
+CARTERA = 0
+AGENDADO = 1
+INGRESO = 2
+CUENTAS = {CARTERA: 'Cartera', AGENDADO: 'Agendado', INGRESO: 'Ingreso'}
+
+CAPACIDAD_INICIAL = 1024 # Días del primer árbol
+
+
+def a_centavos(montos):
+    """Montos en pesos (arreglo) -> centavos ``int64``, con los medios centavos hacia afuera (1.005 -> 101).
+
+    ``monto * 100`` arrastra el error binario del monto (1.005 * 100 = 100.49999999999999);
+    redondearlo antes a 6 decimales recupera el medio centavo que se capturó.
+    """
+    centavos = np.round(np.asarray(montos, dtype=np.float64) * 100, 6)
+    return (np.sign(centavos) * np.floor(np.abs(centavos) + 0.5)).astype(np.int64)
+
+
+class _Fenwick:
+    """Sumas acumuladas por día; crece (al doble) hacia cualquier lado reconstruyéndose."""
+
+    def __init__(self):
+        self.por_dia = {}
+        self.total = 0
+        self._origen = None
+        self._n = 0
+        self._arbol = [0]
+
+    def sumar(self, dia, centavos):
+        self.por_dia[dia] = self.por_dia.get(dia, 0) + centavos
+        self.total += centavos
+        if self._origen is None or not self._origen <= dia < self._origen + self._n:
+            self._crecer(dia)
+            return # La reconstrucción ya incluye el asiento
+        i = dia - self._origen + 1
+        while i <= self._n:
+            self._arbol[i] += centavos
+            i += i & -i
+
+    def _crecer(self, dia):
+        if self._origen is None:
+            origen, fin = dia, dia + CAPACIDAD_INICIAL
+        else:
+            origen, fin = self._origen, self._origen + self._n
+            if dia < origen:
+                origen = min(dia, origen - self._n)
+            else:
+                fin = max(dia + 1, fin + self._n)
+        n = fin - origen
+        arbol = [0] * (n + 1)
+        for d, centavos in self.por_dia.items():
+            if origen <= d < fin:
+                arbol[d - origen + 1] += centavos
+        for i in range(1, n + 1): # Construcción en O(n)
+            padre = i + (i & -i)
+            if padre <= n:
+                arbol[padre] += arbol[i]
+        self._origen, self._n, self._arbol = origen, n, arbol
+
+    def hasta(self, dia):
+        """Suma de los días ``<= dia``."""
+        if self._origen is None:
+            return 0
+        i = min(dia - self._origen + 1, self._n)
+        total = 0
+        while i > 0:
+            total += self._arbol[i]
+            i -= i & -i
+        return total
+
+
+class LibroMayor:
+    """Asientos (cuenta, día, paciente, centavos) en orden de llegada, con totales por rango."""
+
+    def __init__(self):
+        self.dias = array.array('q')
+        self.centavos = array.array('q')
+        self.cuentas = array.array('b')
+        self.pacientes = []
+        self._clinica = {cuenta: _Fenwick() for cuenta in CUENTAS}
+        self._por_paciente = {} # (cuenta, ID) -> ([días ordenados], [suma acumulada, con 0 inicial])
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.centavos)
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        self._asentar(CARTERA, tabla.columna('Fecha_Registro')[inicio:fin].astype(np.int64),
+                      tabla.columna('ID')[inicio:fin], a_centavos(tabla.columna('Costo')[inicio:fin]))
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        estados = tabla.columna('Estado')[inicio:fin]
+        cat_estado = tabla.categoria('Estado')
+        dias = tabla.columna('Fecha')[inicio:fin].astype(np.int64)
+        ids = tabla.columna('ID Paciente')[inicio:fin]
+        centavos = a_centavos(tabla.columna('Costo_Cita')[inicio:fin])
+        agendada = estados != cat_estado.codigo('Cancelada')
+        completada = estados == cat_estado.codigo('Completada')
+        for cuenta, filas in ((AGENDADO, agendada), (INGRESO, completada)):
+            self._asentar(cuenta, dias[filas], ids[filas], centavos[filas])
+
+    def _asentar(self, cuenta, dias, pacientes, centavos):
+        """Anexa un lote de asientos de ``cuenta`` (arreglos de NumPy)."""
+        if not len(dias):
+            return
+        # El árbol de la clínica recibe un solo asiento por día del lote (sumas enteras exactas)
+        unicos, inverso = np.unique(dias, return_inverse=True)
+        por_dia = np.zeros(len(unicos), dtype=np.int64)
+        np.add.at(por_dia, inverso, centavos)
+        orden = np.argsort(dias, kind='stable') # Por fecha: en cada paciente casi siempre se anexa al final
+        with self._lock:
+            self.cuentas.extend([cuenta] * len(dias))
+            self.dias.extend(dias.tolist())
+            self.pacientes.extend(pacientes.tolist())
+            self.centavos.extend(centavos.tolist())
+            arbol = self._clinica[cuenta]
+            for dia, monto in zip(unicos.tolist(), por_dia.tolist()):
+                arbol.sumar(dia, monto)
+            for dia, id_paciente, monto in zip(dias[orden].tolist(), pacientes[orden].tolist(), centavos[orden].tolist()):
+                dias_paciente, acumulado = self._por_paciente.setdefault((cuenta, id_paciente), ([], [0]))
+                if not dias_paciente or dias_paciente[-1] <= dia:
+                    dias_paciente.append(dia)
+                    acumulado.append(acumulado[-1] + monto)
+                else: # Asiento con fecha anterior: se recalcula solo la cola del paciente
+                    i = bisect.bisect_right(dias_paciente, dia)
+                    dias_paciente.insert(i, dia)
+                    acumulado.insert(i + 1, acumulado[i] + monto)
+                    for j in range(i + 2, len(acumulado)):
+                        acumulado[j] += monto
+
+    # --- Consultas ---
+    def total(self, cuenta, desde=None, hasta=None, paciente=None):
+        """Centavos de ``cuenta`` con fecha en ``[desde, hasta]`` (``None``: sin límite), de la clínica o de ``paciente``."""
+        inicio = None if desde is None else dia_ordinal(desde)
+        fin = None if hasta is None else dia_ordinal(hasta)
+        with self._lock:
+            if inicio is not None and fin is not None and fin < inicio:
+                return 0
+            if paciente is None:
+                arbol = self._clinica[cuenta]
+                return (arbol.total if fin is None else arbol.hasta(fin)) - (0 if inicio is None else arbol.hasta(inicio - 1))
+            dias, acumulado = self._por_paciente.get((cuenta, paciente), ((), (0,)))
+            i = 0 if inicio is None else bisect.bisect_left(dias, inicio)
+            j = len(dias) if fin is None else bisect.bisect_right(dias, fin)
+            return acumulado[j] - acumulado[i] if j > i else 0
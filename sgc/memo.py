@@ -0,0 +1,84 @@
+"""Memoización de derivados (figuras, tablas, eventos) por versión de colección.
+
+Cada colección del almacén (pacientes, citas, inventario) lleva un contador de
+versión. Un derivado declara de qué colecciones depende; su entrada guarda las
+versiones con las que se calculó y solo se recalcula cuando alguna cambió.
+Las entradas se desalojan por LRU y se llevan estadísticas de aciertos y fallos.
+"""
+import collections
+import functools
+import threading
+
+CAPACIDAD = 128
+
+
+class Memoizador:
+    """Caché LRU ``(nombre, args) -> (versiones, valor)``.
+
+    ``versiones`` es una función que devuelve ``{colección: versión}``.
+    """
+
+    def __init__(self, versiones, capacidad=CAPACIDAD):
+        self._versiones = versiones
+        self.capacidad = capacidad
+        self._entradas = collections.OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0 # Fallos por versión vieja (no por ausencia)
+        self.desalojos = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, nombre, dependencias, funcion, *args):
+        """Valor de ``funcion(*args)``, recalculado solo si cambió alguna de ``dependencias``."""
+        actuales = self._versiones()
+        firma = tuple(actuales[d] for d in dependencias)
+        clave = (nombre, args)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == firma:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            if entrada is not None:
+                self.invalidaciones += 1
+        # Se calcula fuera del candado; si la versión cambia mientras tanto, la
+        # entrada queda con la firma anterior y se recalcula en la siguiente lectura.
+        valor = funcion(*args)
+        with self._lock:
+            self._entradas[clave] = (firma, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+        return valor
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas), 'capacidad': self.capacidad,
+                'aciertos': self.aciertos, 'fallos': self.fallos,
+                'invalidaciones': self.invalidaciones, 'desalojos': self.desalojos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            }
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+def memoizado(*dependencias):
+    """Decorador para derivados ``funcion(almacen, *args)``: se memoizan en ``almacen.memo``.
+
+    La clave usa el nombre calificado de la función (estable entre reruns de
+    Streamlit) y ``args``, que deben ser hashables.
+    """
+    def decorador(funcion):
+        nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(almacen, *args):
+            return almacen.memo.obtener(nombre, dependencias, functools.partial(funcion, almacen), *args)
+        return envoltura
+    return decorador
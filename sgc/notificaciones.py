@@ -0,0 +1,182 @@
+"""Cola de notificaciones de WhatsApp con trabajadores en segundo plano.
+
+Agendar una cita solo encola el mensaje y regresa de inmediato. Un pool de hilos
+entrega los mensajes a una pasarela intercambiable (HTTP hacia Twilio/Meta o el
+simulador local de ``sgc.stub_whatsapp``), con reintentos y espera exponencial.
+Los rechazos 4xx de la API no se reintentan. Cada mensaje conserva su estado
+para que la interfaz pueda consultarlo; de los ya terminados (entregados o
+fallidos) solo se guardan los ``retener`` más recientes.
+"""
+import collections
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+EN_COLA = "En cola"
+ENVIANDO = "Enviando"
+REINTENTANDO = "Reintentando"
+ENTREGADO = "Entregado"
+FALLIDO = "Fallido"
+
+
+class ErrorPasarela(Exception):
+    """La pasarela no pudo entregar el mensaje; ``reintentable`` es falso si la API lo rechazó."""
+
+    def __init__(self, mensaje, reintentable=True):
+        super().__init__(mensaje)
+        self.reintentable = reintentable
+
+
+# ====================================================================================
+# --- PASARELAS ---
+# ====================================================================================
+class PasarelaHTTP:
+    """Envía ``{"to", "body"}`` como JSON a un endpoint tipo Twilio/Meta."""
+
+    def __init__(self, url, token=None, timeout=5.0):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def enviar(self, telefono, texto):
+        cuerpo = json.dumps({"to": telefono, "body": texto}).encode('utf-8')
+        solicitud = urllib.request.Request(self.url, data=cuerpo, method='POST', headers={'Content-Type': 'application/json'})
+        if self.token:
+            solicitud.add_header('Authorization', f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(solicitud, timeout=self.timeout) as respuesta:
+                return json.loads(respuesta.read() or b'{}').get('id')
+        except urllib.error.HTTPError as e:
+            # 4xx: número o cuerpo inválido, token vencido... reenviar no lo arregla (salvo 408/429)
+            raise ErrorPasarela(f"HTTP {e.code}: {e.reason}", reintentable=not (400 <= e.code < 500) or e.code in (408, 429)) from e
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise ErrorPasarela(str(e)) from e
+
+
+class PasarelaSimulada:
+    """Pasarela en memoria con latencia y tasa de fallos configurables."""
+
+    def __init__(self, latencia=0.5, tasa_fallo=0.0):
+        self.latencia = latencia
+        self.tasa_fallo = tasa_fallo
+        self._contador = itertools.count(1)
+
+    def enviar(self, telefono, texto):
+        time.sleep(self.latencia)
+        if random.random() < self.tasa_fallo:
+            raise ErrorPasarela("Falla simulada de la pasarela")
+        return f"SIM-{next(self._contador)}"
+
+
+# ====================================================================================
+# --- COLA CON REINTENTOS ---
+# ====================================================================================
+class _ColaDiferida:
+    """Cola de prioridad por instante de disponibilidad (para la espera entre reintentos)."""
+
+    def __init__(self):
+        self._heap = []
+        self._orden = itertools.count()
+        self._condicion = threading.Condition()
+
+    def poner(self, elemento, listo_en=0.0):
+        with self._condicion:
+            heapq.heappush(self._heap, (listo_en, next(self._orden), elemento))
+            self._condicion.notify()
+
+    def tomar(self):
+        with self._condicion:
+            while True:
+                if self._heap:
+                    espera = self._heap[0][0] - time.monotonic()
+                    if espera <= 0:
+                        return heapq.heappop(self._heap)[2]
+                    self._condicion.wait(espera)
+                else:
+                    self._condicion.wait()
+
+
+class ColaNotificaciones:
+    """Encola mensajes y los entrega con ``trabajadores`` hilos en segundo plano."""
+
+    def __init__(self, pasarela, trabajadores=4, max_intentos=4, espera_base=0.5, espera_max=30.0, retener=10_000):
+        self.pasarela = pasarela
+        self.max_intentos = max_intentos
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.retener = retener
+        self._cola = _ColaDiferida()
+        self._mensajes = {}
+        self._terminados = collections.deque() # IDs entregados o fallidos, del más antiguo al más reciente
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._hilos = [
+            threading.Thread(target=self._trabajar, name=f"whatsapp-{i}", daemon=True)
+            for i in range(trabajadores)
+        ]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def encolar(self, telefono, texto):
+        """Registra el mensaje y regresa su ID sin esperar la entrega."""
+        with self._lock:
+            id_mensaje = next(self._ids)
+            self._mensajes[id_mensaje] = {
+                'ID': id_mensaje, 'Telefono': telefono, 'Texto': texto, 'Estado': EN_COLA,
+                'Intentos': 0, 'Error': None, 'ID Pasarela': None,
+                'Creado': time.time(), 'Entregado': None,
+            }
+        self._cola.poner(id_mensaje)
+        return id_mensaje
+
+    def estado(self, id_mensaje):
+        """Copia del estado actual del mensaje (o ``None`` si no existe o ya se descartó)."""
+        with self._lock:
+            mensaje = self._mensajes.get(id_mensaje)
+            return dict(mensaje) if mensaje else None
+
+    def pendientes(self):
+        with self._lock:
+            return sum(1 for m in self._mensajes.values() if m['Estado'] not in (ENTREGADO, FALLIDO))
+
+    def _actualizar(self, id_mensaje, **cambios):
+        with self._lock:
+            self._mensajes[id_mensaje].update(cambios)
+
+    def _terminar(self, id_mensaje, **cambios):
+        """Último estado del mensaje; descarta los terminados más antiguos que excedan ``retener``."""
+        with self._lock:
+            self._mensajes[id_mensaje].update(cambios)
+            self._terminados.append(id_mensaje)
+            while len(self._terminados) > self.retener:
+                del self._mensajes[self._terminados.popleft()]
+
+    def _trabajar(self):
+        while True:
+            id_mensaje = self._cola.tomar()
+            try:
+                self._entregar(id_mensaje)
+            except Exception as e: # Un error inesperado no debe matar al trabajador
+                self._terminar(id_mensaje, Estado=FALLIDO, Error=f"{type(e).__name__}: {e}")
+
+    def _entregar(self, id_mensaje):
+        mensaje = self.estado(id_mensaje)
+        intentos = mensaje['Intentos'] + 1
+        self._actualizar(id_mensaje, Estado=ENVIANDO, Intentos=intentos)
+        try:
+            id_pasarela = self.pasarela.enviar(mensaje['Telefono'], mensaje['Texto'])
+        except ErrorPasarela as e:
+            if not e.reintentable or intentos >= self.max_intentos:
+                self._terminar(id_mensaje, Estado=FALLIDO, Error=str(e))
+                return
+            # Espera exponencial con jitter completo
+            espera = random.uniform(0, min(self.espera_max, self.espera_base * 2 ** (intentos - 1)))
+            self._actualizar(id_mensaje, Estado=REINTENTANDO, Error=str(e))
+            self._cola.poner(id_mensaje, time.monotonic() + espera)
+            return
+        self._terminar(id_mensaje, Estado=ENTREGADO, Error=None, **{'ID Pasarela': id_pasarela, 'Entregado': time.time()})
@@ -0,0 +1,113 @@
+"""Perfilado por rerun: tramos de tiempo anidados (página, secciones) por sesión.
+
+Uso en el script de Streamlit::
+
+    perfil.iniciar(pagina)
+    with perfil.tramo('inicializar_datos'):
+        inicializar_datos()
+    with perfil.tramo('render_panel_control'):
+        perfil.seccion('KPIs')      # cierra la sección anterior y abre esta
+        ...
+    perfil.terminar()
+
+Las secciones son marcas secuenciales dentro del tramo abierto, así que no hace
+falta reindentar el código de cada página. Desactivado, ``tramo`` devuelve un
+contexto nulo compartido y ``seccion`` solo revisa una bandera.
+"""
+import collections
+import contextlib
+import datetime
+import json
+import time
+
+HISTORIAL = 20 # Reruns que se conservan por sesión
+
+_NULO = contextlib.nullcontext()
+
+
+class Perfilador:
+    """Últimos ``maximo`` reruns de una sesión, cada uno con sus tramos (ruta, nivel, desde_ms, ms)."""
+
+    def __init__(self, maximo=HISTORIAL):
+        self.activo = False
+        self.ejecuciones = collections.deque(maxlen=maximo)
+        self._actual = None
+        self._pila = [] # [nombre, inicio, sección abierta o None]
+
+    # --- Un rerun ---
+    def iniciar(self, etiqueta):
+        if not self.activo:
+            self._actual = None
+            return
+        self._pila.clear()
+        self._actual = {
+            'inicio': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'etiqueta': etiqueta, 't0': time.perf_counter(), 'tramos': [],
+        }
+
+    def terminar(self):
+        if self._actual is None:
+            return
+        while self._pila: # Tramos que quedaron abiertos (st.stop, st.rerun...)
+            self._cerrar()
+        ejecucion = self._actual
+        ejecucion['total_ms'] = (time.perf_counter() - ejecucion.pop('t0')) * 1000
+        ejecucion['tramos'].sort(key=lambda t: (t['desde_ms'], t['nivel']))
+        self.ejecuciones.append(ejecucion)
+        self._actual = None
+
+    # --- Tramos ---
+    def tramo(self, nombre):
+        """Contexto que mide ``nombre`` (anidable); nulo si el perfilado está apagado."""
+        if self._actual is None:
+            return _NULO
+        return self._tramo(nombre)
+
+    @contextlib.contextmanager
+    def _tramo(self, nombre):
+        self._abrir(nombre)
+        nivel = len(self._pila)
+        try:
+            yield
+        finally:
+            while len(self._pila) >= nivel:
+                self._cerrar()
+
+    def seccion(self, nombre):
+        """Marca el inicio de la sección ``nombre`` del tramo abierto (termina la anterior)."""
+        if self._actual is None or not self._pila:
+            return
+        padre = self._pila[-1]
+        if padre[2] is not None:
+            self._registrar(padre[2][0], len(self._pila) + 1, padre[2][1])
+        padre[2] = (nombre, time.perf_counter())
+
+    def _abrir(self, nombre):
+        self._pila.append([nombre, time.perf_counter(), None])
+
+    def _cerrar(self):
+        nombre, inicio, seccion = self._pila[-1]
+        if seccion is not None:
+            self._registrar(seccion[0], len(self._pila) + 1, seccion[1])
+        self._registrar(nombre, len(self._pila), inicio)
+        self._pila.pop()
+
+    def _registrar(self, nombre, nivel, inicio):
+        ruta = '/'.join([t[0] for t in self._pila[:nivel - 1]] + [nombre])
+        self._actual['tramos'].append({
+            'ruta': ruta, 'nivel': nivel, 'desde_ms': (inicio - self._actual['t0']) * 1000,
+            'ms': (time.perf_counter() - inicio) * 1000,
+        })
+
+    # --- Consulta y exportación ---
+    def tabla(self):
+        """``{ruta: [ms por rerun]}`` (``None`` donde el tramo no corrió), en orden de aparición."""
+        rutas = {}
+        for i, ejecucion in enumerate(self.ejecuciones):
+            for tramo in ejecucion['tramos']:
+                rutas.setdefault(tramo['ruta'], [None] * len(self.ejecuciones))[i] = tramo['ms']
+        return rutas
+
+    def exportar_jsonl(self):
+        """Un objeto JSON por rerun (inicio, etiqueta, total_ms, tramos)."""
+        return ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in self.ejecuciones)
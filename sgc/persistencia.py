@@ -0,0 +1,231 @@
+"""Almacenamiento compartido en SQLite (modo WAL) para todas las sesiones.
+
+Un solo archivo de base de datos por proceso servidor, con un pool de conexiones
+reutilizables. Las sentencias SQL son constantes del módulo, por lo que la caché
+de sentencias preparadas de ``sqlite3`` las compila una sola vez por conexión, y
+las escrituras se hacen por lotes (``executemany`` dentro de una transacción).
+"""
+import contextlib
+import datetime
+import os
+import queue
+import sqlite3
+
+RUTA_POR_DEFECTO = os.environ.get(
+    'SGC_DB', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sgc.db')
+)
+
+# --- Mapeo columna del almacén -> columna SQL ---
+COLUMNAS_PACIENTES = (
+    ('ID', 'id'), ('Nombre', 'nombre'), ('Historial', 'historial'), ('Riesgo IA', 'riesgo_ia'),
+    ('Telefono', 'telefono'), ('Servicio', 'servicio'), ('Costo', 'costo'),
+    ('Fecha_Registro', 'fecha_registro'), ('Tratamientos_Pasados', 'tratamientos_pasados'),
+    ('Fuente', 'fuente'), ('Aviso_Privacidad', 'aviso_privacidad'),
+)
+COLUMNAS_CITAS = (
+    ('ID Paciente', 'id_paciente'), ('Doctor', 'doctor'), ('Fecha', 'fecha'), ('Hora', 'hora'),
+    ('Estado', 'estado'), ('Servicio', 'servicio'), ('Costo_Cita', 'costo_cita'),
+)
+COLUMNAS_INVENTARIO = (
+    ('Stock', 'stock'), ('Uso Mensual', 'uso_mensual'), ('Predicción IA', 'prediccion_ia'),
+    ('Costo_Unitario', 'costo_unitario'), ('Proveedor', 'proveedor'),
+)
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS pacientes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    nombre TEXT NOT NULL,
+    historial TEXT,
+    riesgo_ia TEXT,
+    telefono TEXT,
+    servicio TEXT,
+    costo REAL,
+    fecha_registro TEXT,
+    tratamientos_pasados INTEGER,
+    fuente TEXT,
+    aviso_privacidad TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_pacientes_nombre ON pacientes (nombre);
+
+CREATE TABLE IF NOT EXISTS citas (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_paciente TEXT NOT NULL,
+    doctor TEXT,
+    fecha TEXT NOT NULL,
+    hora TEXT,
+    estado TEXT,
+    servicio TEXT,
+    costo_cita REAL
+);
+CREATE INDEX IF NOT EXISTS ix_citas_fecha ON citas (fecha);
+CREATE INDEX IF NOT EXISTS ix_citas_paciente ON citas (id_paciente, fecha);
+CREATE INDEX IF NOT EXISTS ix_citas_doctor ON citas (doctor, fecha);
+
+CREATE TABLE IF NOT EXISTS inventario (
+    articulo TEXT PRIMARY KEY,
+    stock INTEGER,
+    uso_mensual INTEGER,
+    prediccion_ia TEXT,
+    costo_unitario REAL,
+    proveedor TEXT
+);
+"""
+
+
+def _sql_insertar(tabla, columnas):
+    nombres = ', '.join(sql for _, sql in columnas)
+    marcas = ', '.join('?' for _ in columnas)
+    return f"INSERT INTO {tabla} ({nombres}) VALUES ({marcas})"
+
+
+def _sql_leer(tabla, columnas):
+    nombres = ', '.join(sql for _, sql in columnas)
+    return f"SELECT seq, {nombres} FROM {tabla} WHERE seq > ? ORDER BY seq"
+
+
+SQL_INSERTAR_PACIENTE = _sql_insertar('pacientes', COLUMNAS_PACIENTES)
+SQL_INSERTAR_CITA = _sql_insertar('citas', COLUMNAS_CITAS)
+SQL_INSERTAR_INVENTARIO = "INSERT OR REPLACE INTO inventario (articulo, stock, uso_mensual, prediccion_ia, costo_unitario, proveedor) VALUES (?, ?, ?, ?, ?, ?)"
+SQL_LEER_PACIENTES = _sql_leer('pacientes', COLUMNAS_PACIENTES)
+SQL_LEER_CITAS = _sql_leer('citas', COLUMNAS_CITAS)
+SQL_LEER_INVENTARIO = "SELECT articulo, stock, uso_mensual, prediccion_ia, costo_unitario, proveedor FROM inventario ORDER BY articulo"
+SQL_ULTIMO_PACIENTE = "SELECT COALESCE(MAX(seq), 0) FROM pacientes"
+SQL_EXISTE_PACIENTE = "SELECT 1 FROM pacientes WHERE id = ?"
+
+
+def _a_sql(valor):
+    """Fechas como texto ISO; el resto tal cual."""
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()[:10]
+    if hasattr(valor, 'item'): # Escalares de NumPy
+        return _a_sql(valor.item())
+    return valor
+
+
+def _de_sql(nombre, valor):
+    if valor is not None and nombre in ('Fecha', 'Fecha_Registro'):
+        return datetime.date.fromisoformat(valor)
+    return valor
+
+
+# ====================================================================================
+# --- POOL DE CONEXIONES ---
+# ====================================================================================
+class PoolConexiones:
+    """Pool fijo de conexiones SQLite en modo WAL compartido entre hilos."""
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, tamano=4, timeout=30.0):
+        self.ruta = ruta
+        self._libres = queue.LifoQueue()
+        for _ in range(tamano):
+            self._libres.put(self._abrir(timeout))
+
+    def _abrir(self, timeout):
+        conexion = sqlite3.connect(
+            self.ruta, timeout=timeout, check_same_thread=False,
+            isolation_level=None, cached_statements=256,
+        )
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        return conexion
+
+    @contextlib.contextmanager
+    def conexion(self):
+        conexion = self._libres.get()
+        try:
+            yield conexion
+        finally:
+            self._libres.put(conexion)
+
+    @contextlib.contextmanager
+    def transaccion(self):
+        """``BEGIN IMMEDIATE``: toma el candado de escritura al inicio (también entre procesos)."""
+        with self.conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexion
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+
+    def cerrar(self):
+        while not self._libres.empty():
+            self._libres.get_nowait().close()
+
+
+# ====================================================================================
+# --- BASE DE DATOS DE LA CLÍNICA ---
+# ====================================================================================
+class BaseDatos:
+    """Lecturas incrementales y escrituras por lote de pacientes, citas e inventario."""
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, tamano_pool=4):
+        self.pool = PoolConexiones(ruta, tamano_pool)
+        with self.pool.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+
+    def esta_vacia(self):
+        with self.pool.conexion() as conexion:
+            return conexion.execute(SQL_ULTIMO_PACIENTE).fetchone()[0] == 0
+
+    # --- Escrituras por lote ---
+    def insertar_pacientes(self, pacientes):
+        """Inserta un lote; asigna ``ID`` (P001, P002...) a los que no lo traen. Devuelve los ``ID``.
+
+        Los ``ID`` explícitos (p. ej. importados) pueden ocupar un ``P###`` que
+        tocaría por secuencia: ese se salta y se usa el siguiente libre.
+        """
+        with self.pool.transaccion() as conexion:
+            siguiente = conexion.execute(SQL_ULTIMO_PACIENTE).fetchone()[0] + 1
+            del_lote = {p['ID'] for p in pacientes if p.get('ID')}
+            filas = []
+            for paciente in pacientes:
+                if not paciente.get('ID'):
+                    while f"P{siguiente:03d}" in del_lote or conexion.execute(SQL_EXISTE_PACIENTE, (f"P{siguiente:03d}",)).fetchone():
+                        siguiente += 1
+                    paciente = dict(paciente, ID=f"P{siguiente:03d}")
+                    del_lote.add(paciente['ID'])
+                siguiente += 1
+                filas.append([_a_sql(paciente.get(nombre)) for nombre, _ in COLUMNAS_PACIENTES])
+            conexion.executemany(SQL_INSERTAR_PACIENTE, filas)
+        return [fila[0] for fila in filas]
+
+    def insertar_citas(self, citas):
+        filas = [[_a_sql(cita.get(nombre)) for nombre, _ in COLUMNAS_CITAS] for cita in citas]
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_INSERTAR_CITA, filas)
+
+    def guardar_inventario(self, inventario):
+        filas = [
+            [articulo] + [_a_sql(datos.get(nombre)) for nombre, _ in COLUMNAS_INVENTARIO]
+            for articulo, datos in inventario.items()
+        ]
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(SQL_INSERTAR_INVENTARIO, filas)
+
+    # --- Lecturas incrementales (solo lo nuevo desde ``desde_seq``) ---
+    def _leer(self, sql, columnas, desde_seq):
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(sql, (desde_seq,)).fetchall()
+        return [
+            {nombre: _de_sql(nombre, valor) for (nombre, _), valor in zip(columnas, fila[1:])}
+            for fila in filas
+        ], (filas[-1][0] if filas else desde_seq)
+
+    def leer_pacientes(self, desde_seq=0):
+        """Pacientes con ``seq > desde_seq`` y el último ``seq`` leído."""
+        return self._leer(SQL_LEER_PACIENTES, COLUMNAS_PACIENTES, desde_seq)
+
+    def leer_citas(self, desde_seq=0):
+        return self._leer(SQL_LEER_CITAS, COLUMNAS_CITAS, desde_seq)
+
+    def leer_inventario(self):
+        with self.pool.conexion() as conexion:
+            filas = conexion.execute(SQL_LEER_INVENTARIO).fetchall()
+        return {
+            fila[0]: {nombre: valor for (nombre, _), valor in zip(COLUMNAS_INVENTARIO, fila[1:])}
+            for fila in filas
+        }
@@ -0,0 +1,69 @@
+"""Vistas por paciente para el portal: próximas citas y consultas pagadas.
+
+Cada cita se inserta, al agendarse, en la lista ordenada por (fecha, hora)
+de su paciente (y en la de pagadas si está completada). Una petición del
+portal solo toca las filas de ese paciente: las próximas citas salen de una
+búsqueda binaria por la fecha de hoy. Los montos pagados viven en
+``sgc.libro_mayor``.
+
+Se mantiene al día como suscriptor de ``AlmacenClinica``.
+"""
+import bisect
+import threading
+
+import numpy as np
+
+from sgc.kpis import dia_ordinal
+
+COMPLETADA = 'Completada'
+
+
+class VistasPortal:
+    """Citas ordenadas y consultas pagadas de cada paciente."""
+
+    def __init__(self):
+        self._citas = None
+        self._agenda = {} # ID -> [(día, hora, fila)] ordenada
+        self._pagadas = {} # ID -> [(día, hora, fila)] de citas completadas, ordenada
+        self._lock = threading.Lock()
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        pass
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        self._citas = tabla
+        ids = tabla.columna('ID Paciente')[inicio:fin].tolist()
+        dias = tabla.columna('Fecha')[inicio:fin].astype(np.int64).tolist()
+        horas = tabla.columna('Hora')[inicio:fin].tolist()
+        estados = tabla.columna('Estado')[inicio:fin].tolist()
+        completada = tabla.categoria('Estado').categorias.index(COMPLETADA)
+        with self._lock:
+            for fila, (id_paciente, dia, hora, estado) in enumerate(zip(ids, dias, horas, estados), start=inicio):
+                clave = (dia, hora or '', fila)
+                _insertar(self._agenda.setdefault(id_paciente, []), clave)
+                if estado == completada:
+                    _insertar(self._pagadas.setdefault(id_paciente, []), clave)
+
+    # --- Consultas (solo las filas del paciente) ---
+    def proximas(self, id_paciente, hoy):
+        """Citas del paciente desde ``hoy`` (inclusive), de la más próxima a la más lejana."""
+        with self._lock:
+            agenda = self._agenda.get(id_paciente, [])
+            filas = [fila for *_, fila in agenda[bisect.bisect_left(agenda, (dia_ordinal(hoy),)):]]
+        return [self._citas.fila(fila) for fila in filas]
+
+    def pagadas(self, id_paciente, limite=None):
+        """Citas completadas del paciente, la más reciente primero."""
+        with self._lock:
+            pagadas = self._pagadas.get(id_paciente, [])
+            filas = [fila for *_, fila in reversed(pagadas[-limite:] if limite else pagadas)]
+        return [self._citas.fila(fila) for fila in filas]
+
+
+def _insertar(lista, clave):
+    """Inserta en orden; las citas suelen llegar en orden, así que casi siempre es un ``append``."""
+    if not lista or lista[-1] <= clave:
+        lista.append(clave)
+    else:
+        bisect.insort(lista, clave)
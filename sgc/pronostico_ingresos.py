@@ -0,0 +1,166 @@
+"""Pronóstico de ingresos diarios a partir de las citas completadas.
+
+La serie diaria se arma con un ``bincount`` sobre la fecha de las citas
+``Completada`` (``Costo_Cita`` como peso) y se ajusta un Holt-Winters aditivo
+con temporada semanal. Los parámetros se eligen por mínimo error de un paso en
+una rejilla pequeña que se evalúa de una vez con NumPy (el ciclo es sobre los
+días, no sobre las combinaciones). Con menos de dos semanas de historial se usa
+el estacional ingenuo (repetir la última semana).
+
+``PronosticoIngresos`` se suscribe al almacén y guarda el último pronóstico con
+la versión de los datos: solo se vuelve a ajustar cuando llegan citas
+completadas nuevas (o cambia el día).
+"""
+import itertools
+import threading
+
+import numpy as np
+
+from sgc.kpis import dia_ordinal
+
+TEMPORADA = 7
+HORIZONTE = 30
+DIAS_HISTORIAL = 180
+Z_INTERVALO = 1.96 # Banda del 95 %
+
+# Rejilla de (alfa, beta, gama) evaluada en paralelo
+REJILLA = np.array(list(itertools.product([0.05, 0.1, 0.2, 0.4], [0.0, 0.02, 0.1], [0.05, 0.15, 0.3])))
+
+
+# ====================================================================================
+# --- SERIES DIARIAS ---
+# ====================================================================================
+def ingresos_diarios(dias, importes, desde, hasta):
+    """Suma de ``importes`` por día ordinal en ``[desde, hasta]`` (los días sin citas valen 0)."""
+    dias = np.asarray(dias, dtype=np.int64)
+    dentro = (dias >= desde) & (dias <= hasta)
+    return np.bincount(dias[dentro] - desde, weights=np.asarray(importes, dtype=np.float64)[dentro], minlength=hasta - desde + 1)
+
+
+def promedio_movil(serie, ventana):
+    """Promedio de los últimos ``ventana`` días (ventanas parciales al inicio), vía suma acumulada."""
+    acumulado = np.concatenate(([0.0], np.cumsum(serie)))
+    fin = np.arange(1, len(serie) + 1)
+    inicio = np.maximum(fin - ventana, 0)
+    return (acumulado[fin] - acumulado[inicio]) / (fin - inicio)
+
+
+# ====================================================================================
+# --- MODELOS ---
+# ====================================================================================
+def estacional_ingenuo(serie, horizonte=HORIZONTE, temporada=TEMPORADA):
+    """Repite la última temporada. Devuelve ``(pronóstico, desviación del error)``."""
+    serie = np.asarray(serie, dtype=np.float64)
+    if len(serie) == 0:
+        return np.zeros(horizonte), 0.0
+    temporada = min(temporada, len(serie))
+    errores = serie[temporada:] - serie[:-temporada]
+    return np.resize(serie[-temporada:], horizonte), float(errores.std()) if len(errores) else 0.0
+
+
+def holt_winters(serie, horizonte=HORIZONTE, temporada=TEMPORADA, rejilla=REJILLA):
+    """Holt-Winters aditivo ajustado por rejilla. Devuelve ``(pronóstico, desviación, parámetros)``.
+
+    Todas las combinaciones de ``rejilla`` avanzan juntas como vectores; se
+    queda la de menor error cuadrático de un paso.
+    """
+    serie = np.asarray(serie, dtype=np.float64)
+    alfa, beta, gama = (rejilla[:, i][:, None] for i in range(3))
+    k = len(rejilla)
+    nivel = np.full((k, 1), serie[:temporada].mean())
+    tendencia = np.full((k, 1), (serie[temporada:2 * temporada].mean() - serie[:temporada].mean()) / temporada)
+    estacion = np.tile(serie[:temporada] - nivel[0, 0], (k, 1))
+    errores = np.empty((k, len(serie) - temporada))
+    for t in range(temporada, len(serie)):
+        s = t % temporada
+        previsto = nivel + tendencia + estacion[:, s:s + 1]
+        errores[:, t - temporada] = serie[t] - previsto[:, 0]
+        nivel_anterior = nivel
+        nivel = alfa * (serie[t] - estacion[:, s:s + 1]) + (1 - alfa) * (nivel + tendencia)
+        tendencia = beta * (nivel - nivel_anterior) + (1 - beta) * tendencia
+        estacion[:, s:s + 1] = gama * (serie[t] - nivel) + (1 - gama) * estacion[:, s:s + 1]
+    mejor = int(np.argmin((errores ** 2).mean(axis=1)))
+    pasos = np.arange(1, horizonte + 1)
+    indices = (len(serie) + pasos - 1) % temporada
+    pronostico = nivel[mejor, 0] + pasos * tendencia[mejor, 0] + estacion[mejor, indices]
+    return pronostico, float(errores[mejor].std()), dict(zip(('alfa', 'beta', 'gama'), rejilla[mejor].tolist()))
+
+
+def pronosticar(serie, horizonte=HORIZONTE, temporada=TEMPORADA):
+    """Pronóstico con banda del 95 %; Holt-Winters si hay al menos dos temporadas de historial.
+
+    Los días anteriores al primer ingreso no cuentan como historial.
+    """
+    serie = np.asarray(serie, dtype=np.float64)
+    serie = serie[int(np.argmax(serie > 0)):] if np.any(serie) else serie[:0]
+    if len(serie) >= 2 * temporada:
+        pronostico, desviacion, parametros = holt_winters(serie, horizonte, temporada)
+        modelo = 'Holt-Winters'
+    else:
+        pronostico, desviacion = estacional_ingenuo(serie, horizonte, temporada)
+        parametros, modelo = {}, 'Estacional ingenuo'
+    pronostico = np.maximum(pronostico, 0.0)
+    banda = Z_INTERVALO * desviacion * np.sqrt(np.arange(1, horizonte + 1))
+    return {
+        'pronostico': pronostico,
+        'inferior': np.maximum(pronostico - banda, 0.0),
+        'superior': pronostico + banda,
+        'modelo': modelo,
+        'parametros': parametros,
+    }
+
+
+# ====================================================================================
+# --- PRONÓSTICO CACHEADO (SUSCRIPTOR DEL ALMACÉN) ---
+# ====================================================================================
+class PronosticoIngresos:
+    """Último pronóstico por ``(versión, día)``; la versión sube solo con citas completadas nuevas."""
+
+    def __init__(self, dias_historial=DIAS_HISTORIAL, horizonte=HORIZONTE):
+        self.dias_historial = dias_historial
+        self.horizonte = horizonte
+        self.version = 0
+        self.ajustes = 0 # Veces que se ajustó el modelo (para medir la caché)
+        self._tabla = None
+        self._cache_clave = None
+        self._cache = None
+        self._lock = threading.Lock()
+
+    # --- Suscripción al almacén ---
+    def al_registrar_pacientes(self, tabla, inicio, fin):
+        pass
+
+    def al_agendar_citas(self, tabla, inicio, fin):
+        completada = tabla.categoria('Estado').codigo('Completada')
+        with self._lock:
+            self._tabla = tabla
+            if (tabla.columna('Estado')[inicio:fin] == completada).any():
+                self.version += 1
+
+    # --- Lectura ---
+    def pronostico(self, hoy):
+        """Historial diario (hasta ``hoy``) y pronóstico de los días siguientes."""
+        dia = dia_ordinal(hoy)
+        with self._lock:
+            if self._cache_clave != (self.version, dia):
+                self._cache = self._calcular(dia)
+                self._cache_clave = (self.version, dia)
+                self.ajustes += 1
+            return self._cache
+
+    def _calcular(self, dia):
+        desde = dia - self.dias_historial + 1
+        if self._tabla is None:
+            serie = np.zeros(self.dias_historial)
+        else:
+            completadas = self._tabla.columna('Estado') == self._tabla.categoria('Estado').codigo('Completada')
+            serie = ingresos_diarios(
+                self._tabla.columna('Fecha')[completadas].astype(np.int64),
+                self._tabla.columna('Costo_Cita')[completadas], desde, dia,
+            )
+        resultado = pronosticar(serie, self.horizonte)
+        resultado['dias'] = np.arange(desde, dia + 1).astype('datetime64[D]')
+        resultado['dias_pronostico'] = np.arange(dia + 1, dia + 1 + self.horizonte).astype('datetime64[D]')
+        resultado['historial'] = serie
+        resultado['promedio_7d'] = promedio_movil(serie, TEMPORADA)
+        return resultado
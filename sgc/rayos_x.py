@@ -0,0 +1,224 @@
+"""Ingesta y análisis de radiografías fuera del hilo de la interfaz.
+
+1. ``AnalizadorRayosX.ingresar`` anexa la carga por bloques al archivo de
+   imágenes (``sgc.archivo_imagenes``) mientras calcula su SHA-256; dos cargas
+   de la misma imagen ocupan un solo registro.
+2. ``procesar_imagen`` (en un proceso del pool) lee la imagen por ``mmap``, la
+   decodifica en escala de grises, genera la miniatura y los mosaicos con NumPy
+   y corre el modelo. La miniatura se archiva también, para las galerías.
+3. Un hilo propio recibe los resultados del pool y los guarda en SQLite por
+   hash: volver a analizar la misma imagen no repite el trabajo.
+
+El "modelo" es un sustituto que solo usa CPU (busca zonas radiolúcidas por
+mosaico); sirve para medir imágenes por segundo por núcleo, no para diagnosticar.
+"""
+import concurrent.futures
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import queue
+import threading
+
+import numpy as np
+from PIL import Image
+
+from sgc.archivo_imagenes import ArchivoImagenes, leer_ubicacion
+
+LADO_MINIATURA = 256
+LADO_MOSAICO = 128
+PERCENTIL_OSCURO = 1.0 # Píxeles más oscuros que este percentil de la imagen
+UMBRAL_HALLAZGO = 8.0 # Desviaciones (MAD) de la fracción oscura sobre la mediana de los mosaicos
+MAX_HALLAZGOS = 5
+
+# Numeración FDI de izquierda a derecha de una panorámica (vista del odontólogo)
+PIEZAS_SUPERIORES = [18, 17, 16, 15, 14, 13, 12, 11, 21, 22, 23, 24, 25, 26, 27, 28]
+PIEZAS_INFERIORES = [48, 47, 46, 45, 44, 43, 42, 41, 31, 32, 33, 34, 35, 36, 37, 38]
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS rx_analisis (
+    hash TEXT PRIMARY KEY,
+    resultado TEXT NOT NULL,
+    creado TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+SQL_GUARDAR = "INSERT OR REPLACE INTO rx_analisis (hash, resultado, creado) VALUES (?, ?, ?)"
+SQL_LEER = "SELECT resultado FROM rx_analisis WHERE hash = ?"
+
+
+# ====================================================================================
+# --- PROCESAMIENTO CON NUMPY ---
+# ====================================================================================
+def cargar_gris(datos):
+    """Imagen (bytes PNG/JPG) en escala de grises como ``float32`` en [0, 1]."""
+    with Image.open(io.BytesIO(datos)) as imagen:
+        return np.asarray(imagen.convert('L'), dtype=np.float32) / 255.0
+
+
+def miniatura(imagen, lado=LADO_MINIATURA):
+    """Reducción por promedio de bloques de ``f x f`` píxeles (lado mayor <= ``lado``)."""
+    factor = max(1, -(-max(imagen.shape) // lado))
+    alto, ancho = imagen.shape[0] // factor, imagen.shape[1] // factor
+    recorte = imagen[:alto * factor, :ancho * factor]
+    return recorte.reshape(alto, factor, ancho, factor).mean(axis=(1, 3))
+
+
+def mosaicos(imagen, lado=LADO_MOSAICO):
+    """Vista ``(filas, columnas, lado, lado)`` de la imagen (relleno con la media en los bordes)."""
+    alto, ancho = imagen.shape
+    filas, columnas = -(-alto // lado), -(-ancho // lado)
+    if (filas * lado, columnas * lado) != imagen.shape:
+        imagen = np.pad(imagen, ((0, filas * lado - alto), (0, columnas * lado - ancho)), constant_values=imagen.mean())
+    return imagen.reshape(filas, lado, columnas, lado).swapaxes(1, 2)
+
+
+def _pieza(fila, columna, filas, columnas):
+    piezas = PIEZAS_SUPERIORES if (fila + 0.5) / filas < 0.5 else PIEZAS_INFERIORES
+    return piezas[min(len(piezas) - 1, int((columna + 0.5) / columnas * len(piezas)))]
+
+
+def modelo_sustituto(imagen):
+    """Marca mosaicos con una concentración anómala de píxeles muy oscuros (radiolucidez).
+
+    En una imagen sana los píxeles del percentil más oscuro se reparten entre
+    todos los mosaicos; una lesión los concentra en pocos. El puntaje es la
+    distancia robusta (mediana/MAD) de la fracción oscura de cada mosaico.
+    """
+    bloques = mosaicos(imagen)
+    filas, columnas = bloques.shape[:2]
+    oscuro = np.percentile(imagen[::4, ::4], PERCENTIL_OSCURO)
+    fraccion = (bloques <= oscuro).mean(axis=(2, 3))
+    mediana = np.median(fraccion)
+    mad = np.median(np.abs(fraccion - mediana)) * 1.4826 + 1e-3
+    puntaje = (fraccion - mediana) / mad
+    candidatos = np.argsort(puntaje, axis=None)[::-1][:MAX_HALLAZGOS]
+    hallazgos = []
+    for indice in candidatos:
+        fila, columna = divmod(int(indice), columnas)
+        if puntaje[fila, columna] < UMBRAL_HALLAZGO:
+            break
+        confianza = float(1.0 / (1.0 + np.exp(-(puntaje[fila, columna] - UMBRAL_HALLAZGO) / UMBRAL_HALLAZGO)))
+        hallazgos.append({
+            'pieza': _pieza(fila, columna, filas, columnas), 'mosaico': [fila, columna],
+            'hallazgo': 'Posible radiolucidez (caries o reabsorción ósea)', 'confianza': round(0.5 + confianza / 2, 3),
+        })
+    return hallazgos
+
+
+def procesar_imagen(ubicacion):
+    """Trabajo completo de una radiografía; corre dentro de un proceso del pool.
+
+    Devuelve ``(resultado, miniatura_png)``.
+    """
+    imagen = cargar_gris(leer_ubicacion(ubicacion))
+    png = io.BytesIO()
+    Image.fromarray((miniatura(imagen) * 255).astype(np.uint8)).save(png, format='PNG')
+    resultado = {
+        'alto': imagen.shape[0], 'ancho': imagen.shape[1],
+        'mosaicos': int(np.prod(mosaicos(imagen).shape[:2])),
+        'hallazgos': modelo_sustituto(imagen),
+    }
+    return resultado, png.getvalue()
+
+
+# ====================================================================================
+# --- ANALIZADOR (POOL DE PROCESOS + CACHÉ POR HASH) ---
+# ====================================================================================
+class AnalizadorRayosX:
+    """Ingresa radiografías y las analiza en un pool de procesos, con caché en SQLite por hash."""
+
+    def __init__(self, base_datos, archivo=None, procesos=None):
+        self.pool_bd = base_datos.pool
+        self.archivo = archivo or ArchivoImagenes(base_datos)
+        with self.pool_bd.conexion() as conexion:
+            conexion.executescript(ESQUEMA_SQL)
+        # forkserver/spawn: no se hereda el estado de los hilos del servidor web
+        metodo = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._procesos = concurrent.futures.ProcessPoolExecutor(procesos or os.cpu_count(), mp_context=multiprocessing.get_context(metodo))
+        self._en_curso = {} # hash -> Future
+        self.errores = {} # hash -> mensaje del último análisis fallido (usar ``error``)
+        self._lock = threading.Lock()
+        # Los callbacks del pool corren en su hilo de administración: solo encolan
+        self._terminados = queue.SimpleQueue()
+        self._hilo = threading.Thread(target=self._guardar_siempre, name='rayos-x', daemon=True)
+        self._hilo.start()
+
+    def ingresar(self, archivo, id_paciente=None, analizar=True):
+        """Archiva la carga, la vincula al paciente y (por defecto) encola su análisis.
+
+        Devuelve el hash de la imagen.
+        """
+        hash_imagen = self.archivo.agregar(archivo)
+        if id_paciente is not None:
+            self.archivo.vincular(id_paciente, hash_imagen)
+        if analizar:
+            self.analizar(hash_imagen)
+        return hash_imagen
+
+    def resultado(self, hash_imagen):
+        """Resultado guardado o ``None`` si la imagen no se ha analizado."""
+        with self.pool_bd.conexion() as conexion:
+            fila = conexion.execute(SQL_LEER, (hash_imagen,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def en_proceso(self, hash_imagen):
+        with self._lock:
+            return hash_imagen in self._en_curso
+
+    def error(self, hash_imagen):
+        """Mensaje del último análisis fallido de la imagen (o ``None``)."""
+        with self._lock:
+            return self.errores.get(hash_imagen)
+
+    def analizar(self, hash_imagen):
+        """Encola el análisis (sin bloquear) y devuelve un ``Future`` con el resultado."""
+        with self._lock:
+            if hash_imagen in self._en_curso:
+                return self._en_curso[hash_imagen]
+        guardado = self.resultado(hash_imagen)
+        if guardado is not None:
+            futuro = concurrent.futures.Future()
+            futuro.set_result(guardado)
+            return futuro
+        with self._lock:
+            if hash_imagen not in self._en_curso:
+                ubicacion = self.archivo.ubicacion(hash_imagen)
+                if ubicacion is None:
+                    raise KeyError(hash_imagen)
+                salida = concurrent.futures.Future()
+                self._en_curso[hash_imagen] = salida
+                trabajo = self._procesos.submit(procesar_imagen, ubicacion)
+                trabajo.add_done_callback(lambda f, h=hash_imagen, s=salida: self._terminados.put((h, f, s)))
+            return self._en_curso[hash_imagen]
+
+    def _guardar_siempre(self):
+        while True:
+            terminado = self._terminados.get()
+            if terminado is None:
+                return
+            self._terminar(*terminado)
+
+    def _terminar(self, hash_imagen, trabajo, salida):
+        """Archiva la miniatura y guarda el resultado; luego resuelve el ``Future`` devuelto."""
+        try:
+            resultado, png = trabajo.result()
+            resultado['miniatura'] = self.archivo.agregar_bytes(png)
+            self.archivo.asignar_miniatura(hash_imagen, resultado['miniatura'])
+            with self.pool_bd.transaccion() as conexion:
+                conexion.execute(SQL_GUARDAR, (hash_imagen, json.dumps(resultado), datetime.datetime.now().isoformat(timespec='seconds')))
+        except Exception as e:
+            with self._lock:
+                self.errores[hash_imagen] = str(e)
+                self._en_curso.pop(hash_imagen, None)
+            salida.set_exception(e)
+            return
+        with self._lock:
+            self.errores.pop(hash_imagen, None)
+            self._en_curso.pop(hash_imagen, None)
+        salida.set_result(resultado)
+
+    def cerrar(self):
+        self._procesos.shutdown(wait=True)
+        self._terminados.put(None) # Los callbacks ya encolaron todo lo pendiente
+        self._hilo.join()
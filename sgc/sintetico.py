@@ -0,0 +1,166 @@
+"""Generador determinista de datos sintéticos a escala de cadena de clínicas.
+
+Produce pacientes, citas, inventario y consumo con distribuciones plausibles
+(misma semilla -> mismos datos) en lotes, para poblar la base de datos con
+10 mil a 1 millón de filas sin tener todo en memoria a la vez:
+
+- pacientes: registro en los últimos 5 años con crecimiento, riesgo 70/20/10,
+  servicio principal y costo con ruido log-normal, 8 % sin aviso firmado
+- citas: 85 % pasadas (último año) y 15 % en las próximas 8 semanas, solo en
+  días hábiles y en horarios de la jornada publicada (``sgc.disponibilidad``);
+  los pacientes frecuentes concentran más citas
+- inventario: uso mensual gamma, stock entre 0.1 y 2 meses de uso
+"""
+import datetime
+
+import numpy as np
+
+from sgc.disponibilidad import DIAS_HABILES, horarios
+from sgc.inventario import HistorialConsumo
+
+LOTE = 50_000
+SEMILLA = 360
+
+NOMBRES = ['Ana', 'Luis', 'Sofía', 'Carlos', 'María', 'José', 'Lucía', 'Miguel', 'Valeria', 'Jorge',
+           'Fernanda', 'Diego', 'Camila', 'Andrés', 'Daniela', 'Ricardo', 'Paula', 'Javier', 'Mariana', 'Héctor']
+APELLIDOS = ['García', 'Martínez', 'Hernández', 'López', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+             'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Vera', 'Morales', 'Reyes', 'Jiménez', 'Ruiz', 'Díaz']
+HISTORIALES = (['Ninguno', 'Hipertensión', 'Diabetes Tipo 2', 'Alergia Penicilina', 'Asma', 'Cardiopatía'],
+               [0.62, 0.14, 0.1, 0.07, 0.05, 0.02])
+RIESGOS = (['Bajo', 'Medio', 'Alto'], [0.7, 0.2, 0.1])
+FUENTES = (['Recomendación', 'Web', 'Chatbot', 'Manual'], [0.35, 0.3, 0.2, 0.15])
+# (servicio, precio base, peso como servicio principal / como cita)
+SERVICIOS = [('Limpieza', 800, 0.34), ('Valoración', 800, 0.2), ('Resina', 900, 0.18),
+             ('Endodoncia', 4500, 0.1), ('Ortodoncia (Ajuste)', 1500, 0.12), ('Corona', 7500, 0.06)]
+DOCTORES = ['Dr. Salas', 'Dra. Vega']
+PESO_DIA_SEMANA = np.isin(np.arange(7), DIAS_HABILES) / len(DIAS_HABILES) # Solo días hábiles, todos iguales
+HORARIOS = np.asarray(horarios(), dtype=object) # Inicios de la jornada publicada, cada ``GRANO``
+PROVEEDORES = ['DentalPro', 'MedSupply', '3M Dental']
+ARTICULOS = ['Guantes (Caja)', 'Anestesia (ml)', 'Resina A2 (Jeringa)', 'Cubrebocas (Caja)', 'Eyector (Bolsa)',
+             'Fresa de Diamante', 'Ionómero (Kit)', 'Hilo Retractor', 'Gasas (Paquete)', 'Lima Endodóntica']
+
+
+def _elegir(azar, catalogo, n):
+    valores, pesos = catalogo
+    return np.asarray(valores, dtype=object)[azar.choice(len(valores), n, p=pesos)]
+
+
+def _fechas(dias):
+    """Ordinales (días desde 1970) a ``datetime.date``."""
+    return np.asarray(dias, dtype='datetime64[D]').astype(object)
+
+
+def _doctores(n_citas):
+    """Doctores de la cadena: 2 en la clínica de demostración, ~1 por cada 20 mil citas a escala."""
+    extra = max(0, n_citas // 20_000 - len(DOCTORES))
+    return DOCTORES + [f"{'Dra.' if i % 2 else 'Dr.'} {APELLIDOS[i % len(APELLIDOS)]} {i // len(APELLIDOS) + 1}" for i in range(extra)]
+
+
+# ====================================================================================
+# --- GENERADORES POR LOTE ---
+# ====================================================================================
+def pacientes(n, hoy=None, semilla=SEMILLA, lote=LOTE):
+    """Lotes (listas de dicts) de ``n`` pacientes con ID ``P001``... ``Pn``."""
+    hoy = hoy or datetime.date.today()
+    fin = np.datetime64(hoy, 'D').astype(np.int64)
+    servicios, precios, pesos = zip(*SERVICIOS)
+    for inicio in range(0, n, lote):
+        azar = np.random.default_rng([semilla, 1, inicio])
+        k = min(lote, n - inicio)
+        # Crecimiento: más registros recientes (densidad ~ lineal en los últimos 5 años)
+        registro = fin - (5 * 365 * (1 - np.sqrt(azar.random(k)))).astype(np.int64)
+        servicio = azar.choice(len(servicios), k, p=np.array(pesos) / sum(pesos))
+        costo = (np.array(precios)[servicio] * azar.lognormal(0.0, 0.25, k)).round(-1)
+        antiguedad = (fin - registro) / 365
+        columnas = {
+            'ID': [f"P{i:03d}" for i in range(inicio + 1, inicio + k + 1)],
+            'Nombre': (np.asarray(NOMBRES, dtype=object)[azar.integers(0, len(NOMBRES), k)] + ' '
+                       + np.asarray(APELLIDOS, dtype=object)[azar.integers(0, len(APELLIDOS), k)]).tolist(),
+            'Historial': _elegir(azar, HISTORIALES, k).tolist(),
+            'Riesgo IA': _elegir(azar, RIESGOS, k).tolist(),
+            'Telefono': [f"55{t:08d}" for t in azar.integers(0, 10 ** 8, k).tolist()],
+            'Servicio': np.asarray(servicios, dtype=object)[servicio].tolist(),
+            'Costo': costo.tolist(),
+            'Fecha_Registro': _fechas(registro).tolist(),
+            'Tratamientos_Pasados': azar.poisson(1 + 2 * antiguedad).tolist(),
+            'Fuente': _elegir(azar, FUENTES, k).tolist(),
+            'Aviso_Privacidad': np.where(azar.random(k) < 0.92, 'Firmado', 'Pendiente').tolist(),
+        }
+        yield [dict(zip(columnas, fila)) for fila in zip(*columnas.values())]
+
+
+def citas(n, n_pacientes, hoy=None, semilla=SEMILLA, lote=LOTE):
+    """Lotes de ``n`` citas repartidas entre ``n_pacientes`` pacientes."""
+    hoy = hoy or datetime.date.today()
+    dia_hoy = np.datetime64(hoy, 'D').astype(np.int64)
+    lunes = dia_hoy - (dia_hoy + 3) % 7 # 1970-01-01 fue jueves
+    servicios, precios, pesos = zip(*SERVICIOS)
+    doctores = np.asarray(_doctores(n), dtype=object)
+    for inicio in range(0, n, lote):
+        azar = np.random.default_rng([semilla, 2, inicio])
+        k = min(lote, n - inicio)
+        futura = azar.random(k) < 0.15
+        # Semana (52 hacia atrás u 8 hacia adelante) + día hábil
+        dia = lunes + np.where(futura, 7 * azar.integers(0, 9, k), -7 * azar.integers(0, 53, k))
+        dia = dia + azar.choice(7, k, p=PESO_DIA_SEMANA)
+        dia = np.where(futura & (dia < dia_hoy), dia + 7, dia)
+        dia = np.where(~futura & (dia >= dia_hoy), dia - 7, dia)
+        paciente = (n_pacientes * azar.random(k) ** 2).astype(np.int64) + 1 # Pacientes frecuentes (IDs bajos)
+        servicio = azar.choice(len(servicios), k, p=np.array(pesos) / sum(pesos))
+        estado = np.where(
+            futura, np.where(azar.random(k) < 0.6, 'Confirmada', 'Pendiente'),
+            np.where(azar.random(k) < 0.88, 'Completada', 'Cancelada'),
+        )
+        columnas = {
+            'ID Paciente': [f"P{i:03d}" for i in paciente.tolist()],
+            'Doctor': doctores[azar.integers(0, len(doctores), k)].tolist(),
+            'Fecha': _fechas(dia).tolist(),
+            'Hora': HORARIOS[azar.integers(0, len(HORARIOS), k)].tolist(),
+            'Estado': estado.tolist(),
+            'Servicio': np.asarray(servicios, dtype=object)[servicio].tolist(),
+            'Costo_Cita': np.array(precios, dtype=np.float64)[servicio].tolist(),
+        }
+        yield [dict(zip(columnas, fila)) for fila in zip(*columnas.values())]
+
+
+def inventario(n, semilla=SEMILLA):
+    """Catálogo ``{artículo: datos}`` de ``n`` artículos."""
+    azar = np.random.default_rng([semilla, 3])
+    uso = np.maximum(azar.gamma(2.0, 30.0, n).round(), 1)
+    stock = (uso * azar.uniform(0.1, 2.0, n)).round()
+    costo = azar.lognormal(5.0, 1.0, n).round(2)
+    proveedor = azar.integers(0, len(PROVEEDORES), n)
+    nombres = [ARTICULOS[i] if i < len(ARTICULOS) else f"{ARTICULOS[i % len(ARTICULOS)]} #{i // len(ARTICULOS)}" for i in range(n)]
+    return {
+        nombre: {'Stock': int(s), 'Uso Mensual': int(u), 'Costo_Unitario': float(c), 'Proveedor': PROVEEDORES[p]}
+        for nombre, s, u, c, p in zip(nombres, stock.tolist(), uso.tolist(), costo.tolist(), proveedor.tolist())
+    }
+
+
+def consumo(catalogo, dias=90, hoy=None, semilla=SEMILLA):
+    """Consumo diario ``(artículo, fecha, cantidad)`` de los últimos ``dias`` (Poisson alrededor del uso)."""
+    hoy = hoy or datetime.date.today()
+    azar = np.random.default_rng([semilla, 4])
+    uso = np.array([datos['Uso Mensual'] for datos in catalogo.values()], dtype=np.float64)
+    cantidades = azar.poisson(uso[:, None] / 30, (len(uso), dias))
+    fechas = [hoy - datetime.timedelta(days=d) for d in range(dias)]
+    return [
+        (articulo, fechas[d], cantidad)
+        for articulo, fila in zip(catalogo, cantidades.tolist())
+        for d, cantidad in enumerate(fila) if cantidad
+    ]
+
+
+# ====================================================================================
+# --- POBLAR UNA BASE DE DATOS ---
+# ====================================================================================
+def poblar(base_datos, n_pacientes, n_citas, n_articulos=500, hoy=None, semilla=SEMILLA, lote=LOTE):
+    """Escribe el conjunto sintético completo en ``base_datos`` (vacía), lote por lote."""
+    hoy = hoy or datetime.date.today()
+    for filas in pacientes(n_pacientes, hoy, semilla, lote):
+        base_datos.insertar_pacientes(filas)
+    for filas in citas(n_citas, n_pacientes, hoy, semilla, lote):
+        base_datos.insertar_citas(filas)
+    catalogo = inventario(n_articulos, semilla)
+    base_datos.guardar_inventario(catalogo)
+    HistorialConsumo(base_datos).registrar(consumo(catalogo, hoy=hoy, semilla=semilla))
@@ -0,0 +1,113 @@
+"""Endpoint local que imita la API de facturación de Aspel.
+
+``AspelSimulado`` contiene la lógica (folios y deduplicación por clave de
+idempotencia) y ``ServidorAspelSimulado`` la expone por HTTP:
+
+    python -m sgc.stub_aspel --puerto 8766 --latencia 0.05 --tasa-fallo 0.1
+
+``POST /facturas/lote`` recibe ``{"facturas": [...]}`` y responde
+``{"resultados": [{"clave_idempotencia", "folio", "duplicada"}]}``.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sgc.aspel import ErrorAspel
+
+
+class AspelSimulado:
+    """Emite folios y regresa el mismo folio si la clave de idempotencia ya se facturó."""
+
+    def __init__(self, latencia_lote=0.0, latencia_factura=0.0, tasa_fallo=0.0, tasa_respuesta_perdida=0.0, folio_inicial=1236):
+        self.latencia_lote = latencia_lote
+        self.latencia_factura = latencia_factura
+        self.tasa_fallo = tasa_fallo
+        self.tasa_respuesta_perdida = tasa_respuesta_perdida # Factura emitida pero la respuesta no llega
+        self.facturas = {} # clave -> factura emitida
+        self.duplicadas = 0
+        self._folios = itertools.count(folio_inicial)
+        self._lock = threading.Lock()
+
+    def facturar_lote(self, facturas):
+        time.sleep(self.latencia_lote + self.latencia_factura * len(facturas))
+        if random.random() < self.tasa_fallo:
+            raise ErrorAspel("Aspel no disponible (simulado)")
+        resultados = []
+        with self._lock:
+            for factura in facturas:
+                clave = factura['clave_idempotencia']
+                emitida = self.facturas.get(clave)
+                duplicada = emitida is not None
+                self.duplicadas += duplicada
+                if not duplicada:
+                    emitida = dict(factura, folio=f"F-{next(self._folios)}")
+                    self.facturas[clave] = emitida
+                resultados.append({'clave_idempotencia': clave, 'folio': emitida['folio'], 'duplicada': duplicada})
+        if random.random() < self.tasa_respuesta_perdida:
+            raise ErrorAspel("Tiempo de espera agotado tras facturar (simulado)")
+        return resultados
+
+    def total_facturado(self):
+        with self._lock:
+            return sum(f['monto'] for f in self.facturas.values())
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_POST(self):
+        largo = int(self.headers.get('Content-Length', 0))
+        facturas = json.loads(self.rfile.read(largo) or b'{}').get('facturas', [])
+        try:
+            resultados = self.server.aspel.facturar_lote(facturas)
+        except ErrorAspel as e:
+            self._responder(503, {'error': str(e)})
+            return
+        self._responder(200, {'resultados': resultados})
+
+
+class ServidorAspelSimulado(ThreadingHTTPServer):
+    """Expone un ``AspelSimulado`` por HTTP en ``127.0.0.1``."""
+    daemon_threads = True
+
+    def __init__(self, puerto=0, aspel=None):
+        super().__init__(('127.0.0.1', puerto), _Manejador)
+        self.aspel = aspel or AspelSimulado()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/facturas/lote"
+
+    def iniciar_en_hilo(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local de la API de Aspel")
+    parser.add_argument('--puerto', type=int, default=8766)
+    parser.add_argument('--latencia', type=float, default=0.05, help="Latencia por lote (s)")
+    parser.add_argument('--tasa-fallo', type=float, default=0.0)
+    args = parser.parse_args()
+    servidor = ServidorAspelSimulado(args.puerto, AspelSimulado(args.latencia, tasa_fallo=args.tasa_fallo))
+    print(f"Simulador de Aspel escuchando en {servidor.url}")
+    servidor.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Servidor HTTP local que imita la API de mensajes de Twilio/Meta.
+
+Sirve para probar y medir la cola de notificaciones sin conexión:
+
+    python -m sgc.stub_whatsapp --puerto 8765 --latencia 0.05 --tasa-fallo 0.1
+
+``POST /messages`` con ``{"to", "body"}`` responde ``{"id", "status"}``, un 400
+si falta ``to`` o un 503 simulado según ``--tasa-fallo``.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass # Silencioso: se usa en benchmarks
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_POST(self):
+        largo = int(self.headers.get('Content-Length', 0))
+        mensaje = json.loads(self.rfile.read(largo) or b'{}')
+        servidor = self.server
+        time.sleep(servidor.latencia)
+        if not mensaje.get('to'):
+            self._responder(400, {'error': 'Falta el número de destino'})
+            return
+        if random.random() < servidor.tasa_fallo:
+            self._responder(503, {'error': 'Servicio no disponible (simulado)'})
+            return
+        with servidor.lock:
+            servidor.recibidos.append(mensaje)
+            id_mensaje = f"wamid.{next(servidor.contador)}"
+        self._responder(200, {'id': id_mensaje, 'status': 'sent'})
+
+
+class ServidorWhatsAppSimulado(ThreadingHTTPServer):
+    """``ThreadingHTTPServer`` con latencia/tasa de fallo y registro de lo recibido."""
+    daemon_threads = True
+
+    def __init__(self, puerto=0, latencia=0.0, tasa_fallo=0.0):
+        super().__init__(('127.0.0.1', puerto), _Manejador)
+        self.latencia = latencia
+        self.tasa_fallo = tasa_fallo
+        self.recibidos = []
+        self.contador = itertools.count(1)
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/messages"
+
+    def iniciar_en_hilo(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local de la API de WhatsApp")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.05)
+    parser.add_argument('--tasa-fallo', type=float, default=0.0)
+    args = parser.parse_args()
+    servidor = ServidorWhatsAppSimulado(args.puerto, args.latencia, args.tasa_fallo)
+    print(f"Simulador de WhatsApp escuchando en {servidor.url}")
+    servidor.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
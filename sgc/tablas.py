@@ -0,0 +1,40 @@
+"""Tablas grandes del lado del servidor: orden, paginación y estilos vectorizados.
+
+Solo la página visible se copia, se estiliza y se envía al navegador; el
+orden se resuelve con un ``argsort`` estable sobre la columna elegida (las
+filas empatadas conservan su orden original en ambos sentidos).
+"""
+import numpy as np
+import pandas as pd
+
+
+def paginar(df, pagina, tamano, orden=None, descendente=False):
+    """Filas de la ``pagina`` (desde 1) de ``df`` ordenado por la columna ``orden``."""
+    n = len(df)
+    inicio = (pagina - 1) * tamano
+    if orden is None:
+        return df.iloc[inicio:inicio + tamano]
+    columna = df[orden]
+    if isinstance(columna.dtype, pd.CategoricalDtype):
+        valores = columna.cat.codes.to_numpy() # Orden de las categorías, no alfabético
+    else:
+        valores = columna.to_numpy()
+    if descendente:
+        # Estable de mayor a menor: se ordena al revés y se regresa a las posiciones originales
+        indices = n - 1 - np.argsort(valores[::-1], kind='stable')[::-1]
+    else:
+        indices = np.argsort(valores, kind='stable')
+    return df.take(indices[inicio:min(inicio + tamano, n)])
+
+
+def estilos_por_categoria(columna, estilos, neutro=''):
+    """CSS por celda de una columna categórica: ``estilos[código]`` para todas a la vez.
+
+    Las celdas vacías (código -1) reciben ``neutro``, no el último estilo.
+    """
+    tabla = np.asarray(list(estilos) + [neutro], dtype=object) # El -1 indexa a ``neutro``
+    return tabla[columna.cat.codes.to_numpy()]
+
+
+def total_paginas(n, tamano):
+    return max(1, -(-n // tamano))
@@ -0,0 +1,194 @@
+"""Motor de triage e intención del chatbot (una sola pasada por mensaje).
+
+Todas las palabras clave y sinónimos se compilan en una única expresión regular
+con un grupo por intención; las respuestas de opción ("1", "leve", "constante"...)
+se resuelven con un diccionario de coincidencia exacta. El flujo de la
+conversación es una tabla de transiciones declarativa evaluada en orden.
+"""
+import re
+import unicodedata
+
+from sgc.disponibilidad import DIAS_SEMANA, HORARIO_ATENCION
+
+# --- Estados de la conversación ---
+INIT = "INIT"
+TRIAGE_DOLOR = "TRIAGE_DOLOR"
+OFERTA_CITA = "OFERTA_CITA"
+URGENCIA = "URGENCIA"
+
+# --- Acciones que ejecuta quien llama al motor ---
+ALERTAR_URGENCIA = "alertar_urgencia"
+OFRECER_CITAS = "ofrecer_citas"
+AGENDAR_CITA = "agendar_cita"
+
+# --- Intenciones detectadas por subcadena (cualquier parte del mensaje) ---
+PALABRAS_CLAVE = {
+    'URGENCIA': ['emergencia', 'urgencia', 'insoportable', 'sangrado', 'sangra', 'hinchazon', 'inflamado', 'inflamada'],
+    'DOLOR': ['dolor', 'duele', 'muela'],
+    'MOLESTIA': ['molestia'],
+    'HORARIO': ['horario', 'abren', 'cierran'],
+    'GRACIAS': ['gracias'],
+}
+
+# --- Intenciones que solo cuentan si el mensaje completo es la respuesta ---
+RESPUESTAS_EXACTAS = {
+    'SEVERIDAD': {'1': 1, 'leve': 1, 'ocasional': 1, '2': 2, 'constante': 2, 'agudo': 2},
+    'OPCION': {'1': 1, '2': 2, '3': 3},
+}
+
+# --- Horarios ofrecidos: los próximos libres según ``sgc.disponibilidad`` ---
+OPCIONES = 3
+
+RESPUESTAS = {
+    'urgencia': "**Eso suena como una urgencia.** Por favor, llame de inmediato al **442-123-4567** para atención prioritaria. Estoy alertando al personal en este momento.",
+    'preguntar_severidad': "Lamento escuchar eso. Para ayudarte mejor, ¿el dolor es **1) Leve y ocasional** o **2) Constante y agudo**?",
+    'ofrecer_citas': "Entendido. Lo mejor es una valoración. Déjame verificar la disponibilidad... \n\n¡Listo! Tengo {n} opciones disponibles:\n"
+                     "{opciones}\n\n¿Alguna de estas opciones te funciona? (Solo escribe {numeros})",
+    'sin_horarios': "Entendido. Lo mejor es una valoración, pero no tengo horarios libres en línea por ahora. Por favor, llama al **442-123-4567** para agendar.",
+    'horario_ocupado': "Lo siento, ese horario se acaba de ocupar. ",
+    'confirmar_cita': "¡Perfecto! Tu cita está **CONFIRMADA** para el **{cita}**. \n\nRecibirás un mensaje de **WhatsApp** en los próximos 2 minutos con la confirmación oficial y la dirección. \n\n¿Hay algo más en lo que pueda ayudarte?",
+    'horario': f"Nuestros horarios de atención son de {HORARIO_ATENCION}.",
+    'gracias': "¡Un placer ayudarte! Estamos para servirte.",
+    'no_entendi': "No entendí tu consulta. Puedo ayudarte a agendar una cita por dolor de muela o a responder preguntas sobre nuestros horarios.",
+}
+
+# --- Tabla de transiciones: (estado o '*', intención, acción, respuesta, nuevo estado) ---
+# Se evalúa en orden: la primera regla que aplica gana.
+TRANSICIONES = [
+    ('*', 'URGENCIA', ALERTAR_URGENCIA, 'urgencia', URGENCIA),
+    ('*', 'DOLOR', None, 'preguntar_severidad', TRIAGE_DOLOR),
+    (INIT, 'MOLESTIA', None, 'preguntar_severidad', TRIAGE_DOLOR),
+    (TRIAGE_DOLOR, 'SEVERIDAD', OFRECER_CITAS, 'ofrecer_citas', OFERTA_CITA),
+    (OFERTA_CITA, 'OPCION', AGENDAR_CITA, 'confirmar_cita', INIT),
+    ('*', 'HORARIO', None, 'horario', INIT),
+    ('*', 'GRACIAS', None, 'gracias', INIT),
+]
+SIN_COINCIDENCIA = (None, 'no_entendi', INIT)
+
+
+_SIN_ACENTOS = str.maketrans('áéíóúüàèìòù', 'aeiouuaeiou')
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos ("Miércoles" -> "miercoles")."""
+    texto = texto.strip().lower()
+    if texto.isascii():
+        return texto
+    texto = texto.translate(_SIN_ACENTOS)
+    if texto.isascii():
+        return texto
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _regex_trie(palabras):
+    """Alternación con prefijos comunes factorizados (``dol|due`` -> ``d(?:ol|ue)``).
+
+    Así el motor de ``re`` descarta cada posición con una sola clase de
+    caracteres en vez de probar todas las palabras una por una.
+    """
+    trie = {}
+    for palabra in palabras:
+        nodo = trie
+        for c in palabra:
+            nodo = nodo.setdefault(c, {})
+        nodo[''] = {}
+
+    def _patron(nodo):
+        fin = '' in nodo
+        ramas = [re.escape(c) + _patron(hijo) for c, hijo in sorted(nodo.items()) if c]
+        if not ramas:
+            return ''
+        if len(ramas) == 1 and all(len(c) == 1 for c in nodo if c):
+            cuerpo = ramas[0]
+            cuerpo = f"(?:{cuerpo})" if fin and len(cuerpo) > 1 else cuerpo
+        elif all(len(r) == 1 for r in ramas):
+            cuerpo = f"[{''.join(ramas)}]"
+        else:
+            cuerpo = f"(?:{'|'.join(ramas)})"
+        return cuerpo + '?' if fin else cuerpo
+
+    return _patron(trie)
+
+
+def etiqueta_horario(horario):
+    """``'Martes 20/10 17:00 (Dra. Vega)'``."""
+    fecha = horario['Fecha']
+    return f"{DIAS_SEMANA[fecha.weekday()]} {fecha.day:02d}/{fecha.month:02d} {horario['Hora']} ({horario['Doctor']})"
+
+
+def cita_de_horario(horario):
+    """Cita del horario elegido en el chatbot, lista para ``AlmacenClinica.reservar_cita``."""
+    return dict(horario, **{
+        'ID Paciente': 'P_EXTERNO', 'Estado': 'Confirmada', 'Servicio': 'Valoración por Dolor (Chatbot)', 'Costo_Cita': 800,
+    })
+
+
+class MotorTriage:
+    """Clasifica mensajes y aplica la tabla de transiciones del chatbot."""
+
+    def __init__(self, palabras_clave=PALABRAS_CLAVE, respuestas_exactas=RESPUESTAS_EXACTAS, transiciones=TRANSICIONES):
+        # Todas las palabras clave en una sola expresión; la palabra encontrada indica la intención
+        self._intencion_de = {normalizar(p): intencion for intencion, palabras in palabras_clave.items() for p in palabras}
+        self._patron = re.compile(_regex_trie(self._intencion_de))
+        self._exactas = {}
+        for intencion, valores in respuestas_exactas.items():
+            for texto, valor in valores.items():
+                self._exactas.setdefault(normalizar(texto), {})[intencion] = valor
+        # Reglas aplicables por estado, ya en orden de prioridad
+        estados = {estado for estado, *_ in transiciones if estado != '*'} | {INIT, URGENCIA}
+        self._reglas = {
+            estado: [regla[1:] for regla in transiciones if regla[0] in ('*', estado)]
+            for estado in estados
+        }
+        self._reglas_comodin = [regla[1:] for regla in transiciones if regla[0] == '*']
+
+    def intenciones(self, texto):
+        """``{intención: valor}`` detectadas en el mensaje (valor ``None`` para palabras clave)."""
+        texto = normalizar(texto)
+        encontradas = dict(self._exactas.get(texto, {}))
+        for palabra in self._patron.findall(texto):
+            encontradas.setdefault(self._intencion_de[palabra], None)
+        return encontradas
+
+    def procesar(self, estado, texto, ofertas=(), buscar_horarios=None):
+        """Respuesta, nuevo estado, acción a ejecutar y horarios de la conversación.
+
+        ``ofertas`` son los horarios que se le ofrecieron a esta conversación;
+        ``buscar_horarios()`` da los nuevos solo cuando toca ofrecerlos. El
+        resultado trae ``ofertas`` (vigentes para el nuevo estado) y, al
+        agendar, la ``opcion`` y el ``horario`` elegidos.
+        """
+        intenciones = self.intenciones(texto)
+        for intencion, accion, respuesta, nuevo_estado in self._reglas.get(estado, self._reglas_comodin):
+            if intencion in intenciones:
+                valor = intenciones[intencion]
+                if accion != AGENDAR_CITA or valor <= len(ofertas): # Solo opciones que se ofrecieron
+                    break
+        else:
+            accion, respuesta, nuevo_estado = SIN_COINCIDENCIA
+            valor = None
+        if accion == OFRECER_CITAS:
+            return self.ofrecer(buscar_horarios)
+        resultado = {'respuesta': RESPUESTAS[respuesta], 'estado': nuevo_estado, 'accion': accion, 'opcion': None,
+                     'horario': None, 'ofertas': list(ofertas) if nuevo_estado == OFERTA_CITA else []}
+        if accion == AGENDAR_CITA:
+            resultado['opcion'], resultado['horario'] = valor, ofertas[valor - 1]
+            resultado['respuesta'] = resultado['respuesta'].format(cita=etiqueta_horario(resultado['horario']))
+        return resultado
+
+    def ofrecer(self, buscar_horarios, prefijo=''):
+        """Ofrece los próximos horarios libres (o remite al teléfono si no hay)."""
+        ofertas = list(buscar_horarios()) if buscar_horarios is not None else []
+        if not ofertas:
+            return {'respuesta': prefijo + RESPUESTAS['sin_horarios'], 'estado': INIT, 'accion': None,
+                    'opcion': None, 'horario': None, 'ofertas': []}
+        respuesta = RESPUESTAS['ofrecer_citas'].format(
+            n=len(ofertas), opciones="\n".join(f"**{n}. {etiqueta_horario(h)}**" for n, h in enumerate(ofertas, start=1)),
+            numeros=", ".join(str(n) for n in range(1, len(ofertas))) + f" o {len(ofertas)}" if len(ofertas) > 1 else "1",
+        )
+        return {'respuesta': prefijo + respuesta, 'estado': OFERTA_CITA, 'accion': OFRECER_CITAS,
+                'opcion': None, 'horario': None, 'ofertas': ofertas}
+
+
+MOTOR = MotorTriage()
@@ -0,0 +1,231 @@
+"""Webhook asíncrono del chatbot de pacientes (WhatsApp).
+
+Expone el mismo triage y agendamiento de la página "Chatbot de Pacientes" fuera
+de Streamlit, con un ``asyncio`` de un solo hilo que atiende miles de
+conversaciones a la vez. El estado de cada conversación vive en
+``ConversacionesTTL`` y se descarta tras ``--ttl`` segundos sin mensajes:
+
+    python -m sgc.webhook_chatbot --puerto 8767 --ttl 1800
+
+``POST /webhook`` recibe ``{"from", "body"}`` y responde ``{"to", "body", "estado"}``;
+``GET /salud`` devuelve contadores del servicio.
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import time
+
+from sgc import triage
+from sgc.disponibilidad import ConflictoAgenda, MotorDisponibilidad
+
+MAX_ENCABEZADOS = 16 * 1024
+MAX_CUERPO = 64 * 1024
+RAZONES = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}
+
+
+# ====================================================================================
+# --- ESTADO DE CONVERSACIONES ---
+# ====================================================================================
+class ConversacionesTTL:
+    """Estado (y horarios ofrecidos) por teléfono con expiración por inactividad y tope de conversaciones.
+
+    El ``OrderedDict`` se mantiene ordenado por último acceso, así que las
+    conversaciones vencidas siempre están al frente y purgarlas es O(vencidas).
+    Solo se usa desde el hilo del event loop (sin lock).
+    """
+
+    def __init__(self, ttl=1800.0, maximo=100_000, reloj=time.monotonic):
+        self.ttl = ttl
+        self.maximo = maximo
+        self.reloj = reloj
+        self._datos = collections.OrderedDict() # telefono -> (estado, ofertas, último acceso)
+        self.expiradas = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def _purgar(self, ahora):
+        while self._datos:
+            telefono, (*_, acceso) = next(iter(self._datos.items()))
+            if ahora - acceso < self.ttl and len(self._datos) <= self.maximo:
+                break
+            del self._datos[telefono]
+            self.expiradas += 1
+
+    def conversacion(self, telefono):
+        """``(estado, horarios ofrecidos)`` de la conversación."""
+        ahora = self.reloj()
+        self._purgar(ahora)
+        estado, ofertas, _ = self._datos.get(telefono, (triage.INIT, [], ahora))
+        return estado, ofertas
+
+    def guardar(self, telefono, estado, ofertas=()):
+        ahora = self.reloj()
+        self._datos[telefono] = (estado, list(ofertas), ahora)
+        self._datos.move_to_end(telefono)
+        self._purgar(ahora)
+
+
+# ====================================================================================
+# --- SERVICIO ---
+# ====================================================================================
+class ServicioChatbot:
+    """Aplica ``triage.MOTOR`` por conversación y ejecuta sus acciones.
+
+    Los horarios ofrecidos salen de la disponibilidad del almacén y las citas se
+    reservan en ``almacen`` (``AlmacenClinica``) en un hilo aparte para no
+    bloquear el event loop con SQLite. Sin almacén se ofrecen los horarios de
+    una agenda vacía y las citas solo se cuentan.
+    """
+
+    def __init__(self, almacen=None, conversaciones=None, motor=triage.MOTOR):
+        self.almacen = almacen
+        if almacen is not None:
+            self.disponibilidad = almacen.disponibilidad
+        else:
+            from sgc.almacen import ESQUEMA_CITAS
+            self.disponibilidad = MotorDisponibilidad(ESQUEMA_CITAS['Doctor'][1])
+        self.conversaciones = conversaciones or ConversacionesTTL()
+        self.motor = motor
+        self.metricas = collections.Counter()
+
+    def _buscar_horarios(self):
+        return self.disponibilidad.proximos(triage.OPCIONES, datetime.datetime.now())
+
+    async def atender(self, telefono, texto):
+        estado, ofertas = self.conversaciones.conversacion(telefono)
+        resultado = self.motor.procesar(estado, texto, ofertas, self._buscar_horarios)
+        self.metricas['mensajes'] += 1
+        if resultado['accion'] == triage.ALERTAR_URGENCIA:
+            self.metricas['urgencias'] += 1
+        elif resultado['accion'] == triage.AGENDAR_CITA:
+            try:
+                if self.almacen is not None:
+                    await asyncio.to_thread(self.almacen.reservar_cita, triage.cita_de_horario(resultado['horario']), 'WhatsApp')
+                self.metricas['citas'] += 1
+            except ConflictoAgenda: # Otra conversación ganó el horario
+                self.metricas['conflictos'] += 1
+                resultado = self.motor.ofrecer(self._buscar_horarios, triage.RESPUESTAS['horario_ocupado'])
+        self.conversaciones.guardar(telefono, resultado['estado'], resultado['ofertas'])
+        return resultado
+
+    def salud(self):
+        return dict(self.metricas, conversaciones_activas=len(self.conversaciones),
+                    conversaciones_expiradas=self.conversaciones.expiradas)
+
+
+# ====================================================================================
+# --- SERVIDOR HTTP ---
+# ====================================================================================
+class ServidorWebhook:
+    """HTTP/1.1 mínimo con keep-alive sobre ``asyncio.start_server``."""
+
+    def __init__(self, servicio, puerto=0, host='127.0.0.1'):
+        self.servicio = servicio
+        self.host = host
+        self.puerto = puerto
+        self._servidor = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.puerto}/webhook"
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(
+            self._conexion, self.host, self.puerto, limit=MAX_ENCABEZADOS, backlog=4096)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self
+
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+
+    async def _conexion(self, lector, escritor):
+        try:
+            while True:
+                try:
+                    cabecera = await lector.readuntil(b'\r\n\r\n')
+                except asyncio.LimitOverrunError:
+                    await self._responder(escritor, 413, {'error': 'Encabezados demasiado grandes'}, False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                linea, *lineas = cabecera.decode('latin-1').split('\r\n')
+                metodo, ruta, *_ = linea.split(' ') + ['', '']
+                encabezados = {}
+                for l in lineas:
+                    nombre, _, valor = l.partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+                largo = int(encabezados.get('content-length') or 0)
+                if largo > MAX_CUERPO:
+                    await self._responder(escritor, 413, {'error': 'Mensaje demasiado grande'}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b''
+                seguir = encabezados.get('connection', '').lower() != 'close'
+                codigo, respuesta = await self._despachar(metodo, ruta, cuerpo)
+                await self._responder(escritor, codigo, respuesta, seguir)
+                if not seguir:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass # Cliente desconectado o petición malformada: se cierra la conexión
+        finally:
+            escritor.close()
+
+    async def _despachar(self, metodo, ruta, cuerpo):
+        if metodo == 'GET' and ruta == '/salud':
+            return 200, self.servicio.salud()
+        if metodo != 'POST' or ruta != '/webhook':
+            return 404, {'error': 'Ruta no encontrada'}
+        try:
+            mensaje = json.loads(cuerpo)
+            telefono, texto = str(mensaje['from']), str(mensaje['body'])
+        except (ValueError, KeyError, TypeError):
+            return 400, {'error': 'Se esperaba JSON con "from" y "body"'}
+        resultado = await self.servicio.atender(telefono, texto)
+        return 200, {'to': telefono, 'body': resultado['respuesta'], 'estado': resultado['estado']}
+
+    async def _responder(self, escritor, codigo, cuerpo, seguir):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        escritor.write(
+            f"HTTP/1.1 {codigo} {RAZONES[codigo]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(datos)}\r\nConnection: {'keep-alive' if seguir else 'close'}\r\n\r\n".encode('latin-1')
+            + datos
+        )
+        await escritor.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook asíncrono del chatbot de pacientes")
+    parser.add_argument('--puerto', type=int, default=8767)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--ttl', type=float, default=1800.0, help="Segundos de inactividad antes de olvidar una conversación")
+    parser.add_argument('--sin-bd', action='store_true', help="No agendar en la base de datos de la clínica")
+    args = parser.parse_args()
+
+    almacen = None
+    if not args.sin_bd:
+        from sgc.almacen import AlmacenClinica
+        from sgc.auditoria import BitacoraAuditoria
+        from sgc.persistencia import BaseDatos
+        almacen = AlmacenClinica(BaseDatos(), auditoria=BitacoraAuditoria()) # Misma bitácora que la app (varios procesos)
+    servicio = ServicioChatbot(almacen, ConversacionesTTL(args.ttl))
+
+    async def _correr():
+        servidor = await ServidorWebhook(servicio, args.puerto, args.host).iniciar()
+        print(f"Webhook del chatbot escuchando en {servidor.url}")
+        await servidor.servir()
+
+    try:
+        asyncio.run(_correr())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
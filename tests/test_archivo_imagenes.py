@@ -0,0 +1,41 @@
+"""Archivo de imágenes: subidas simultáneas de la misma imagen ocupan un solo registro del pack."""
+import os
+import threading
+import time
+
+from sgc.archivo_imagenes import CABECERA, ArchivoImagenes
+from sgc.persistencia import BaseDatos
+
+
+def test_subidas_simultaneas_de_la_misma_imagen(tmp_path, monkeypatch):
+    ruta_bd, carpeta = str(tmp_path / 'clinica.db'), str(tmp_path / 'img')
+    archivos = [ArchivoImagenes(BaseDatos(ruta_bd), carpeta) for _ in range(4)] # Como procesos distintos
+    fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: (time.sleep(0.1), fsync(fd))) # La copia tarda: las subidas se empalman
+
+    datos = os.urandom(50_000)
+    hashes = []
+    hilos = [threading.Thread(target=lambda a=a: hashes.append(a.agregar_bytes(datos))) for a in archivos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(set(hashes)) == 1
+    assert os.path.getsize(archivos[0].ruta_pack(0)) == CABECERA.size + len(datos)
+    assert all(a.leer(hashes[0]) == datos for a in archivos)
+    for archivo in archivos:
+        archivo.cerrar()
+        archivo.pool.cerrar()
+
+
+def test_cerrar_libera_los_mapas_de_un_pack_que_crecio(tmp_path):
+    archivo = ArchivoImagenes(BaseDatos(str(tmp_path / 'clinica.db')), str(tmp_path / 'img'))
+    primera = archivo.agregar_bytes(b'a' * 1000)
+    archivo.leer(primera)
+    segunda = archivo.agregar_bytes(b'b' * 1000)
+    assert archivo.leer(segunda) == b'b' * 1000 # Se vuelve a mapear el pack, más grande
+    viejo = archivo._reemplazados[0]
+    archivo.cerrar()
+    assert viejo.closed and not archivo._reemplazados
+    archivo.pool.cerrar()
@@ -0,0 +1,21 @@
+"""Bandeja de Aspel: reenviar la misma captura del formulario no registra un segundo cobro."""
+from sgc.aspel import BandejaAspel, clave_cobro, nueva_clave
+from sgc.persistencia import BaseDatos
+
+
+def test_doble_envio_de_la_misma_captura(tmp_path):
+    base_datos = BaseDatos(str(tmp_path / 'clinica.db'))
+    bandeja = BandejaAspel(base_datos)
+    nonce = nueva_clave() # Como la página: uno por captura del formulario
+
+    for _ in range(2): # Doble clic / rerun con los mismos datos
+        clave = clave_cobro('P001', 4500.0, 'Endodoncia', nonce)
+        bandeja.registrar_cobro('Ana García', 4500.0, 'Endodoncia', id_paciente='P001', clave_idempotencia=clave)
+    assert bandeja.totales()['por_estado']['Pendiente'] == (1, 4500.0)
+    assert bandeja.contiene(clave)
+
+    # Editar el formulario da otra captura (otro nonce): es un cargo nuevo
+    otra = clave_cobro('P001', 4500.0, 'Endodoncia', nueva_clave())
+    bandeja.registrar_cobro('Ana García', 4500.0, 'Endodoncia', id_paciente='P001', clave_idempotencia=otra)
+    assert bandeja.totales()['por_estado']['Pendiente'] == (2, 9000.0)
+    base_datos.pool.cerrar()
@@ -0,0 +1,36 @@
+"""Bitácora de auditoría: un grupo que no se puede escribir despierta a ``vaciar`` y queda a la vista en ``error``."""
+import pytest
+
+from sgc import auditoria
+from sgc.auditoria import BitacoraAuditoria
+
+
+@pytest.fixture
+def bitacora(tmp_path, monkeypatch):
+    monkeypatch.setattr(auditoria, 'ESPERA_ERROR', 0.0)
+    bitacora = BitacoraAuditoria(str(tmp_path))
+    yield bitacora
+    bitacora.cerrar(timeout=5)
+
+
+@pytest.mark.parametrize('falla', [OSError("No space left on device"), TypeError("bug")])
+def test_falla_de_escritura_no_cuelga_vaciar(bitacora, monkeypatch, falla):
+    escribir = bitacora._escribir
+    intentos = []
+
+    def _fallar(registros):
+        intentos.append(len(registros))
+        raise falla
+
+    monkeypatch.setattr(bitacora, '_escribir', _fallar)
+    bitacora.registrar('consulta_expediente', 'P001', 'Recepción')
+    assert bitacora.vaciar(timeout=5) is False
+    assert type(falla).__name__ in bitacora.error
+    assert bitacora.estadisticas['perdidos'] == 1
+    assert len(intentos) == (auditoria.INTENTOS_ERROR if isinstance(falla, OSError) else 1)
+
+    # El escritor sigue vivo; el error queda a la vista porque se perdió un registro
+    monkeypatch.setattr(bitacora, '_escribir', escribir)
+    bitacora.registrar('consulta_expediente', 'P002', 'Recepción')
+    assert bitacora.vaciar(timeout=5) is False
+    assert bitacora.punta()['seq'] == 1 and bitacora.verificar()['error'] is None
@@ -0,0 +1,48 @@
+"""Importación masiva seguida de altas por formulario: los ``ID`` asignados no chocan con los importados."""
+import datetime
+import io
+
+import pytest
+
+from sgc.almacen import AlmacenClinica
+from sgc.carga_masiva import COSTO_MINIMO, importar
+from sgc.persistencia import BaseDatos
+
+PACIENTE = {'Nombre': 'C', 'Historial': 'Ninguno', 'Riesgo IA': 'Bajo', 'Telefono': '5500000000', 'Servicio': 'Limpieza',
+            'Costo': 800, 'Fecha_Registro': datetime.date(2026, 1, 5), 'Tratamientos_Pasados': 0, 'Fuente': 'Web',
+            'Aviso_Privacidad': 'Firmado'}
+
+
+@pytest.fixture(params=['sqlite', 'memoria'])
+def almacen(request, tmp_path):
+    if request.param == 'memoria':
+        yield AlmacenClinica()
+        return
+    base_datos = BaseDatos(str(tmp_path / 'clinica.db'))
+    yield AlmacenClinica(base_datos)
+    base_datos.pool.cerrar()
+
+
+def test_alta_despues_de_importar_ids_explicitos(almacen):
+    almacen.registrar_paciente(dict(PACIENTE, ID='P001', Nombre='A'))
+    resumen = importar(almacen, 'pacientes', io.BytesIO("ID,Nombre,Costo\nP003,B,800\nP002,D,800\n".encode()), 'csv')
+    assert resumen['importadas'] == 2
+
+    almacen.registrar_paciente(dict(PACIENTE, Nombre='C'))
+    almacen.registrar_pacientes([dict(PACIENTE, Nombre='E'), dict(PACIENTE, Nombre='F', ID='P005')])
+
+    ids = almacen.pacientes.columna('ID').tolist()
+    assert len(ids) == len(set(ids)) == 6
+    assert almacen.indices.paciente_por_nombre('C')['ID'] == 'P004'
+    assert almacen.indices.paciente_por_nombre('E')['ID'] == 'P006'
+
+
+def test_pacientes_sin_costo_se_rechazan(almacen):
+    # Un costo vacío o menor al mínimo haría fallar el cobro en Aspel (``number_input`` con ``min_value``)
+    resumen = importar(almacen, 'pacientes', io.BytesIO('Nombre,Costo\nA,\nB,50\nC,"$1,200"\n'.encode()), 'csv')
+    assert (resumen['importadas'], resumen['rechazadas']) == (1, 2)
+    assert [motivo for _, motivo in resumen['errores']] == ["Costo vacío", f"Costo inválido (mínimo ${COSTO_MINIMO})"]
+    assert almacen.pacientes.columna('Costo').tolist() == [1200.0]
+
+    with pytest.raises(ValueError, match="Costo"):
+        importar(almacen, 'pacientes', io.BytesIO("Nombre\nD\n".encode()), 'csv')
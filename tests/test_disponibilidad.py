@@ -0,0 +1,120 @@
+"""Motor de disponibilidad: empalmes, crecimiento del árbol, días hábiles, anticipación y mezcla de doctores."""
+import datetime
+import random
+
+import pytest
+
+from sgc.almacen import ESQUEMA_CITAS, TablaColumnar
+from sgc.disponibilidad import ANTICIPACION, CELDAS, GRANO, ConflictoAgenda, MotorDisponibilidad, horarios
+from sgc.kpis import dia_ordinal
+
+LUNES = datetime.date(2026, 10, 19)
+VIERNES = LUNES + datetime.timedelta(days=4)
+
+
+def _agendar(motor, citas):
+    """Anexa ``(doctor, fecha, 'HH:MM')`` como el almacén y avisa al motor."""
+    tabla = TablaColumnar(ESQUEMA_CITAS, len(citas))
+    tabla.extender([{'ID Paciente': 'P001', 'Doctor': doctor, 'Fecha': fecha, 'Hora': hora, 'Estado': 'Confirmada',
+                     'Servicio': 'Limpieza', 'Costo_Cita': 800} for doctor, fecha, hora in citas])
+    motor.al_agendar_citas(tabla, 0, len(tabla))
+
+
+def _proximos(motor, n, desde, doctor=None):
+    """``proximos`` con ``ahora`` fijo lejos en el pasado (sin anticipación de por medio)."""
+    libres = motor.proximos(n, desde, doctor, ahora=datetime.datetime(2000, 1, 1))
+    return [(h['Doctor'], h['Fecha'], h['Hora']) for h in libres]
+
+
+def _llenar(fecha, doctor='Dr. Salas'):
+    return [(doctor, fecha, hora) for hora in horarios(paso=60)]
+
+
+def test_empalmes_en_los_bordes_de_las_celdas():
+    motor = MotorDisponibilidad()
+    _agendar(motor, [('Dr. Salas', LUNES, '10:00')]) # Ocupa 10:00-11:00
+    for hora in ('09:00', '11:00', '18:00'):
+        motor.validar({'Doctor': 'Dr. Salas', 'Fecha': LUNES, 'Hora': hora})
+    motor.validar({'Doctor': 'Dra. Vega', 'Fecha': LUNES, 'Hora': '10:00'}) # Otro doctor
+    for hora in ('09:15', '10:00', '10:45'):
+        with pytest.raises(ConflictoAgenda, match="empalma"):
+            motor.validar({'Doctor': 'Dr. Salas', 'Fecha': LUNES, 'Hora': hora})
+    for hora in ('08:45', '18:15', '10:10'): # Antes de abrir, termina después de cerrar, fuera del grano
+        with pytest.raises(ConflictoAgenda, match="no es un horario válido"):
+            motor.validar({'Doctor': 'Dr. Salas', 'Fecha': LUNES, 'Hora': hora})
+
+
+def test_reserva_antes_del_origen_hace_crecer_el_arbol_a_la_izquierda():
+    motor = MotorDisponibilidad()
+    _agendar(motor, [('Dr. Salas', LUNES + datetime.timedelta(weeks=20), '09:00')])
+    agenda = motor._agendas['Dr. Salas']
+    origen = agenda._origen
+    _agendar(motor, _llenar(LUNES))
+    assert agenda._origen <= dia_ordinal(LUNES) < origen
+    assert _proximos(motor, 1, datetime.datetime.combine(LUNES, datetime.time(7)), 'Dr. Salas') == \
+        [('Dr. Salas', LUNES + datetime.timedelta(days=1), '09:00')]
+
+
+def test_dia_lleno_pasa_al_siguiente_dia_habil():
+    motor = MotorDisponibilidad()
+    _agendar(motor, _llenar(VIERNES))
+    desde = datetime.datetime.combine(VIERNES, datetime.time(7))
+    assert _proximos(motor, 1, desde, 'Dr. Salas') == [('Dr. Salas', VIERNES + datetime.timedelta(days=3), '09:00')]
+    # Después de la última celda del día también se pasa al siguiente hábil
+    tarde = datetime.datetime.combine(LUNES, datetime.time(18, 15))
+    assert _proximos(motor, 1, tarde, 'Dr. Salas') == [('Dr. Salas', LUNES + datetime.timedelta(days=1), '09:00')]
+
+
+def test_fines_de_semana_y_dias_cerrados():
+    cerrado = VIERNES + datetime.timedelta(days=3) # Lunes festivo
+    motor = MotorDisponibilidad(dias_cerrados=[cerrado])
+    _agendar(motor, _llenar(VIERNES))
+    desde = datetime.datetime.combine(VIERNES + datetime.timedelta(days=1), datetime.time(7)) # Sábado
+    assert _proximos(motor, 1, desde, 'Dr. Salas') == [('Dr. Salas', cerrado + datetime.timedelta(days=1), '09:00')]
+    for fecha in (VIERNES + datetime.timedelta(days=1), cerrado):
+        with pytest.raises(ConflictoAgenda, match="no atiende"):
+            motor.validar({'Doctor': 'Dr. Salas', 'Fecha': fecha, 'Hora': '10:00'})
+
+
+def test_anticipacion_desde_ahora():
+    motor = MotorDisponibilidad(['Dr. Salas'])
+    ahora = datetime.datetime.combine(LUNES, datetime.time(10, 10))
+    libres = motor.proximos(1, datetime.datetime.combine(LUNES, datetime.time(7)), ahora=ahora)
+    assert ANTICIPACION == datetime.timedelta(hours=2)
+    assert (libres[0]['Fecha'], libres[0]['Hora']) == (LUNES, '12:15') # 12:10 redondeado a la celda siguiente
+    tarde = datetime.datetime.combine(LUNES, datetime.time(17, 30)) # 19:30: ya cerró, sigue el martes
+    libres = motor.proximos(1, tarde, ahora=tarde)
+    assert (libres[0]['Fecha'], libres[0]['Hora']) == (LUNES + datetime.timedelta(days=1), '09:00')
+
+
+def test_dos_doctores_intercalados():
+    motor = MotorDisponibilidad()
+    _agendar(motor, [('Dr. Salas', LUNES, '09:00'), ('Dra. Vega', LUNES, '09:00'), ('Dra. Vega', LUNES, '10:00')])
+    desde = datetime.datetime.combine(LUNES, datetime.time(7))
+    assert _proximos(motor, 5, desde) == [
+        ('Dr. Salas', LUNES, '10:00'), ('Dr. Salas', LUNES, '11:00'), ('Dra. Vega', LUNES, '11:00'),
+        ('Dr. Salas', LUNES, '12:00'), ('Dra. Vega', LUNES, '12:00'),
+    ]
+
+
+def test_contra_busqueda_lineal():
+    """Reservas al azar (también antes del origen) contra recorrer día por día y celda por celda."""
+    azar = random.Random(7)
+    motor = MotorDisponibilidad()
+    ocupado = {}
+    for _ in range(40):
+        citas = []
+        for _ in range(azar.randint(1, 30)):
+            fecha = LUNES + datetime.timedelta(days=azar.randint(-60, 60))
+            hora = azar.choice(horarios())
+            citas.append(('Dr. Salas', fecha, hora))
+            inicio = horarios().index(hora)
+            ocupado.setdefault(fecha, set()).update(range(inicio, inicio + 60 // GRANO))
+        _agendar(motor, citas)
+        desde = datetime.datetime.combine(LUNES + datetime.timedelta(days=azar.randint(-70, 70)), datetime.time(azar.randint(7, 19)))
+        fecha, celda = desde.date(), max(0, -(-((desde.hour - 9) * 60) // GRANO))
+        while not (fecha.weekday() < 5 and any(
+                not ocupado.get(fecha, set()) & set(range(c, c + 60 // GRANO)) for c in range(celda, CELDAS - 60 // GRANO + 1))):
+            fecha, celda = fecha + datetime.timedelta(days=1), 0
+        celda = next(c for c in range(celda, CELDAS) if not ocupado.get(fecha, set()) & set(range(c, c + 60 // GRANO)))
+        assert _proximos(motor, 1, desde, 'Dr. Salas') == [('Dr. Salas', fecha, horarios()[celda])]
@@ -0,0 +1,28 @@
+"""El pronóstico memoizado se recalcula cuando cambia el historial de consumo, no solo el catálogo."""
+import datetime
+
+from sgc.almacen import AlmacenClinica
+from sgc.inventario import HistorialConsumo
+from sgc.memo import memoizado
+from sgc.persistencia import BaseDatos
+
+HOY = datetime.date(2026, 1, 5)
+
+
+@memoizado('inventario', 'consumo')
+def _consumo_total(almacen, hoy):
+    return float(almacen.consumo.matriz(list(almacen.inventario), 30, hoy).sum())
+
+
+def test_consumo_de_otro_proceso_invalida_el_memo(tmp_path):
+    ruta = str(tmp_path / 'clinica.db')
+    almacen = AlmacenClinica(BaseDatos(ruta))
+    almacen.guardar_inventario({'Guantes (Caja)': {'Stock': 15, 'Uso Mensual': 50, 'Costo_Unitario': 180, 'Proveedor': 'DentalPro'}})
+    assert _consumo_total(almacen, HOY) == 0.0
+
+    otra = BaseDatos(ruta) # Otro proceso (u otra sesión) registra consumo
+    HistorialConsumo(otra).registrar([('Guantes (Caja)', HOY, 3)])
+    otra.pool.cerrar()
+    almacen.sincronizar()
+    assert _consumo_total(almacen, HOY) == 3.0
+    almacen.base_datos.pool.cerrar()
@@ -0,0 +1,58 @@
+"""Libro mayor: totales por rango (árbol de Fenwick y acumulados por paciente) contra sumar asiento por asiento."""
+import datetime
+import decimal
+import random
+
+import pytest
+
+from sgc.almacen import ESQUEMA_CITAS, TablaColumnar
+from sgc.libro_mayor import AGENDADO, INGRESO, LibroMayor, a_centavos
+
+HOY = datetime.date(2026, 10, 19)
+ESTADOS = ['Completada', 'Confirmada', 'Pendiente', 'Cancelada']
+
+
+def _centavos(monto):
+    """Referencia: el monto como se capturó, redondeado a centavos con medios hacia afuera."""
+    return int(decimal.Decimal(repr(monto)).scaleb(2).quantize(decimal.Decimal(1), decimal.ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize('monto, esperado', [
+    (0.005, 1), (1.005, 101), (2.675, 268), (0.125, 13), (1.015, 102), (0.0049, 0), (-1.005, -101), (4500, 450000),
+])
+def test_medio_centavo_hacia_afuera(monto, esperado):
+    assert a_centavos([monto]).tolist() == [esperado] == [_centavos(monto)]
+
+
+def test_totales_contra_suma_ingenua():
+    azar = random.Random(11)
+    libro = LibroMayor()
+    asientos = [] # (cuenta, fecha, paciente, centavos)
+    for _ in range(30): # Lotes con fechas desordenadas, también antes del primer día visto
+        citas = [{
+            'ID Paciente': f"P{azar.randint(1, 8):03d}", 'Doctor': 'Dr. Salas',
+            'Fecha': HOY + datetime.timedelta(days=azar.randint(-3000, 3000)), 'Hora': '10:00',
+            'Estado': azar.choice(ESTADOS), 'Servicio': 'Limpieza',
+            'Costo_Cita': float(f"{azar.randint(0, 5000)}.{azar.randint(0, 99):02d}{azar.choice(('', '5'))}"), # Como se capturó
+        } for _ in range(azar.randint(1, 40))]
+        tabla = TablaColumnar(ESQUEMA_CITAS, len(citas))
+        tabla.extender(citas)
+        libro.al_agendar_citas(tabla, 0, len(tabla))
+        for cita in citas:
+            fila = (cita['Fecha'], cita['ID Paciente'], _centavos(cita['Costo_Cita']))
+            if cita['Estado'] != 'Cancelada':
+                asientos.append((AGENDADO, *fila))
+            if cita['Estado'] == 'Completada':
+                asientos.append((INGRESO, *fila))
+
+    def ingenuo(cuenta, desde, hasta, paciente):
+        return sum(c for a, f, p, c in asientos if a == cuenta and (desde is None or f >= desde)
+                   and (hasta is None or f <= hasta) and paciente in (None, p))
+
+    assert len(libro) == len(asientos)
+    for _ in range(500):
+        desde, hasta = (HOY + datetime.timedelta(days=azar.randint(-3500, 3500)) if azar.random() < 0.8 else None
+                        for _ in range(2))
+        cuenta = azar.choice((AGENDADO, INGRESO))
+        paciente = azar.choice((None, f"P{azar.randint(1, 9):03d}"))
+        assert libro.total(cuenta, desde, hasta, paciente) == ingenuo(cuenta, desde, hasta, paciente)
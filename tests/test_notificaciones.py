@@ -0,0 +1,45 @@
+"""Cola de WhatsApp: los 4xx no se reintentan, un error inesperado no detiene a los trabajadores y los terminados se podan."""
+import time
+
+from sgc.notificaciones import ENTREGADO, FALLIDO, ColaNotificaciones, PasarelaHTTP
+from sgc.stub_whatsapp import ServidorWhatsAppSimulado
+
+
+def _esperar(cola):
+    limite = time.monotonic() + 10
+    while cola.pendientes() and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+class _PasarelaRota:
+    def enviar(self, telefono, texto):
+        if telefono == 'x':
+            raise KeyError('bug')
+        return 'ok'
+
+
+def test_rechazo_4xx_sin_reintentos():
+    servidor = ServidorWhatsAppSimulado().iniciar_en_hilo()
+    cola = ColaNotificaciones(PasarelaHTTP(servidor.url), trabajadores=1, espera_base=0.01)
+    id_mensaje = cola.encolar('', "Sin destino")
+    _esperar(cola)
+    servidor.shutdown()
+    estado = cola.estado(id_mensaje)
+    assert estado['Estado'] == FALLIDO and estado['Intentos'] == 1 and '400' in estado['Error']
+
+
+def test_error_inesperado_no_detiene_al_trabajador():
+    cola = ColaNotificaciones(_PasarelaRota(), trabajadores=1)
+    fallido = cola.encolar('x', "Hola")
+    entregado = cola.encolar('5500000000', "Hola")
+    _esperar(cola)
+    assert cola.estado(fallido)['Estado'] == FALLIDO and 'KeyError' in cola.estado(fallido)['Error']
+    assert cola.estado(entregado)['Estado'] == ENTREGADO
+
+
+def test_poda_de_terminados():
+    cola = ColaNotificaciones(_PasarelaRota(), trabajadores=2, retener=5)
+    ids = [cola.encolar('5500000000', f"#{i}") for i in range(20)]
+    _esperar(cola)
+    assert len(cola._mensajes) == 5
+    assert sum(cola.estado(i) is not None for i in ids) == 5
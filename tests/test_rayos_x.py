@@ -0,0 +1,43 @@
+"""Análisis de radiografías: los resultados y los errores se guardan fuera del hilo del pool de procesos."""
+import io
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sgc.archivo_imagenes import ArchivoImagenes
+from sgc.persistencia import BaseDatos
+from sgc.rayos_x import AnalizadorRayosX
+
+
+@pytest.fixture
+def analizador(tmp_path):
+    base_datos = BaseDatos(str(tmp_path / 'clinica.db'))
+    analizador = AnalizadorRayosX(base_datos, ArchivoImagenes(base_datos, str(tmp_path / 'img')), procesos=1)
+    yield analizador
+    analizador.cerrar()
+    base_datos.pool.cerrar()
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.fromarray((np.random.default_rng(1).random((300, 400)) * 255).astype(np.uint8)).save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def test_resultado_y_error(analizador):
+    hilos = []
+    guardar = analizador.archivo.asignar_miniatura
+    analizador.archivo.asignar_miniatura = lambda *a: (hilos.append(threading.current_thread().name), guardar(*a))
+
+    hash_rx = analizador.ingresar(_png())
+    resultado = analizador.analizar(hash_rx).result(timeout=60)
+    assert analizador.resultado(hash_rx) == resultado and not analizador.en_proceso(hash_rx)
+    assert hilos == ['rayos-x']
+
+    roto = analizador.ingresar(io.BytesIO(b'no es una imagen'), analizar=False)
+    with pytest.raises(Exception):
+        analizador.analizar(roto).result(timeout=60)
+    assert analizador.error(roto) and not analizador.en_proceso(roto)
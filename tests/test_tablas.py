@@ -0,0 +1,17 @@
+"""Tablas paginadas: orden estable en ambos sentidos y estilo neutro para las celdas vacías."""
+import numpy as np
+import pandas as pd
+
+from sgc.tablas import estilos_por_categoria, paginar
+
+
+def test_descendente_conserva_el_orden_de_los_empates():
+    df = pd.DataFrame({'Articulo': list('abcdef'), 'Stock': [2, 1, 2, 3, 1, 2]})
+    assert paginar(df, 1, 10, 'Stock', descendente=True)['Articulo'].tolist() == list('dacfbe')
+    assert paginar(df, 1, 10, 'Stock')['Articulo'].tolist() == list('beacfd')
+    assert paginar(df, 2, 4, 'Stock', descendente=True)['Articulo'].tolist() == list('be')
+
+
+def test_categoria_vacia_recibe_estilo_neutro():
+    columna = pd.Series(pd.Categorical(['OK', None, 'URGENTE', np.nan], categories=['OK', 'PEDIR', 'URGENTE']))
+    assert estilos_por_categoria(columna, ['verde', 'ambar', 'rojo']).tolist() == ['verde', '', 'rojo', '']